@@ -7,22 +7,48 @@ Forked from najia@1.2.4 with performance optimization and static ShiYao table.
 - 架构完善：统一日志配置和配置验证
 - 代码质量：增强类型注解，避免循环导入
 - 时间维度：月建日辰、月令旺衰、月破、旬空、六神
+
+导入本包不加载任何子模块，也不访问文件系统；下列公开名称与子模块在首次访问时导入。
 """
+from importlib import import_module
 
 __author__ = """bopowang"""
 __email__ = 'ibopo@126.com'
 __version__ = '2.0.2'
 
-from .najia import Najia
-from . import const
-from .time_analysis import (
-    calc_yue_ling,
-    is_yue_po,
-    get_xun_kong,
-    is_xun_kong,
-    calc_liu_shen,
-)
-from .lunar_utils import (
-    date_to_yue_ri_chen,
-    lunar_month_day_to_yue_ri_chen,
+# 公开名称 -> 所在子模块
+_LAZY_ATTRS = {
+    'Najia': 'najia',
+    'calc_yue_ling': 'time_analysis',
+    'is_yue_po': 'time_analysis',
+    'get_xun_kong': 'time_analysis',
+    'is_xun_kong': 'time_analysis',
+    'calc_liu_shen': 'time_analysis',
+    'date_to_yue_ri_chen': 'lunar_utils',
+    'lunar_month_day_to_yue_ri_chen': 'lunar_utils',
+}
+
+# 可通过 najia.<name> 直接访问的子模块
+_LAZY_MODULES = (
+    'aio', 'archive', 'batch', 'casting', 'columnar', 'compact', 'config', 'const', 'ganzhi', 'guaci',
+    'hexagram_table', 'instrument', 'lunar_utils', 'najia', 'occurrence', 'query', 'renderer', 'result',
+    'serialize', 'server', 'sweep', 'time_analysis', 'utils',
 )
+
+__all__ = list(_LAZY_ATTRS) + ['const']
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        value = getattr(import_module(f'.{_LAZY_ATTRS[name]}', __name__), name)
+    elif name in _LAZY_MODULES:
+        value = import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | set(_LAZY_MODULES))
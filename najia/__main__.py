@@ -1,14 +1,17 @@
-import random
+import json
+import os
 import sys
-from typing import List, Optional, Union
+from typing import Any, Iterator, List, Optional, TextIO, Union
 
 import click
 
 from . import __version__
 from . import Najia
+from .casting import METHODS, Caster
+from .utils import parse_params
 
 
-@click.command()
+@click.group(invoke_without_command=True)
 @click.help_option('-h', '--help')
 @click.version_option(
     __version__,
@@ -25,13 +28,18 @@ from . import Najia
 @click.option('-c', '--guaci', is_flag=True, help='是否显示卦辞.')
 @click.option('-d', '--date', default=None, help='日期 YYYY-MM-DD hh:mm.')
 @click.option('--day', default=None, help='日干支.')
-def main(params: Optional[Union[str, List[int]]], gender: str, lunar: bool,
-         date: Optional[str], title: str, guaci: bool, day: Optional[str], verbose: int):
+@click.option('-m', '--method', default='coin', type=click.Choice(METHODS), help='未给出参数时的起卦方法.')
+@click.option('-s', '--seed', default=None, type=int, help='起卦随机种子.')
+@click.pass_context
+def main(ctx: click.Context, params: Optional[Union[str, List[int]]], gender: str, lunar: bool,
+         date: Optional[str], title: str, guaci: bool, day: Optional[str], method: str, seed: Optional[int],
+         verbose: int):
+    if ctx.invoked_subcommand is not None:
+        return 0
+
     if params is None:
-        params = [random.randint(1, 4) for _ in range(6)]
-    elif isinstance(params, str):
-        params = [int(x) for x in params.replace(',', '')]
-    params = [int(str(x).replace('0', '4')) for x in params]
+        params = Caster(method, seed).cast()
+    params = parse_params(params)
 
     gua = Najia(verbose).compile(
         params=params,
@@ -48,5 +56,111 @@ def main(params: Optional[Union[str, List[int]]], gender: str, lunar: bool,
     return 0
 
 
+def _read_records(stream: TextIO) -> Iterator[Any]:
+    """逐行读取 JSONL 请求记录，空行跳过，无法解析的行原样交给批处理记录错误"""
+    for line in stream:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield line
+            continue
+
+        try:
+            if isinstance(record, dict) and record.get('params') is not None:
+                record['params'] = parse_params(record['params'])
+            elif isinstance(record, (list, str)):
+                record = parse_params(record)
+        except ValueError:
+            pass
+
+        yield record
+
+
+@main.command('batch')
+@click.help_option('-h', '--help')
+@click.option('-i', '--input', 'input_file', type=click.File('r', encoding='utf-8'), default='-',
+              help='JSONL 请求文件，默认标准输入.')
+@click.option('-o', '--output', 'output_file', type=click.File('w', encoding='utf-8'), default='-',
+              help='结果输出文件，默认标准输出.')
+@click.option('-w', '--workers', default=None, type=int, help='并发工作进程数，默认 CPU 核数.')
+@click.option('-e', '--executor', default='processes',
+              type=click.Choice(['processes', 'threads', 'sequential']), help='执行方式.')
+@click.option('-f', '--format', 'fmt', default='json', type=click.Choice(['json', 'text']), help='输出格式.')
+@click.option('-c', '--guaci', is_flag=True, help='是否包含卦辞.')
+@click.option('-v', '--verbose', count=True, help='卦爻样式（text 格式）')
+@click.option('--unordered', is_flag=True, help='按完成顺序输出.')
+def batch(input_file: TextIO, output_file: TextIO, workers: Optional[int], executor: str, fmt: str,
+          guaci: bool, verbose: int, unordered: bool):
+    """批量排盘：每行一条 JSON 请求，如 {"params": [1,2,3,4,1,2], "date": "2024-01-01 10:00"}"""
+    from .batch import BatchProcessor
+    from .serialize import dumps
+
+    processor = BatchProcessor(max_workers=workers or os.cpu_count() or 1, executor=executor)
+    renderer = Najia(verbose)
+    errors = 0
+
+    for item in processor.iter_batch(_read_records(input_file), guaci=guaci, ordered=not unordered):
+        if not item.ok:
+            errors += 1
+
+        if fmt == 'json':
+            output_file.write(dumps(item.to_dict()) + '\n')
+        elif item.ok:
+            renderer.result = item.result
+            output_file.write(renderer.render() + '\n')
+        else:
+            output_file.write(f'# {item.index}: {item.error}\n')
+
+    output_file.flush()
+
+    if errors:
+        click.echo(f'{errors} record(s) failed', err=True)
+
+    return 0
+
+
+@main.command('cast')
+@click.help_option('-h', '--help')
+@click.option('-n', '--count', default=1, type=click.IntRange(min=0), help='卦数.')
+@click.option('-m', '--method', default='coin', type=click.Choice(METHODS), help='起卦方法.')
+@click.option('-s', '--seed', default=None, type=int, help='随机种子.')
+@click.option('-d', '--date', default=None, help='附加到每条请求的日期 YYYY-MM-DD hh:mm.')
+@click.option('-o', '--output', 'output_file', type=click.File('w', encoding='utf-8'), default='-',
+              help='输出文件，默认标准输出.')
+def cast(count: int, method: str, seed: Optional[int], date: Optional[str], output_file: TextIO):
+    """随机起卦：每行输出一条 JSON 请求，可直接交给 batch 子命令"""
+    from .serialize import dumps
+
+    for params in Caster(method, seed).iter_casts(count):
+        output_file.write(dumps(params if date is None else {'params': params, 'date': date}) + '\n')
+
+    output_file.flush()
+
+    return 0
+
+
+@main.command('serve')
+@click.help_option('-h', '--help')
+@click.option('--host', default='127.0.0.1', help='监听地址.')
+@click.option('--port', default=8000, type=int, help='监听端口.')
+@click.option('-w', '--workers', default=1, type=int, help='工作进程数.')
+@click.option('--max-body', default=1 << 20, type=int, help='请求体大小上限（字节）.')
+@click.option('--max-batch', default=1000, type=int, help='单次批量请求的记录数上限.')
+def serve(host: str, port: int, workers: int, max_body: int, max_batch: int):
+    """启动 HTTP 服务：GET /health，GET|POST /compile，POST /batch"""
+    from .server import serve as run
+
+    def ready(server) -> None:
+        click.echo(f'najia serving on {server.url} ({workers} worker(s))', err=True)
+
+    run(host=host, port=port, workers=workers, max_body=max_body, max_batch=max_batch, ready=ready)
+
+    return 0
+
+
 if __name__ == '__main__':
     sys.exit(main())  # pragma: no cover
@@ -0,0 +1,209 @@
+"""
+asyncio 接口
+
+排盘是 CPU 计算，直接在事件循环中调用 Najia.compile 会阻塞循环。这里把计算交给
+线程池或进程池执行：
+- compile_async：单次排盘，可指定执行器与超时；
+- AsyncBatchProcessor：异步批量排盘，async for 逐条产出 BatchItemResult。
+  同时在执行器中的任务数受 max_concurrency 限制，只有空出名额时才提交下一条，
+  大批量任务不会占满执行器队列，与交互请求共用执行器时后者仍能及时得到调度。
+
+取消调用方任务或单条超时时，尚未开始执行的任务会一并取消；已在执行器中运行的单条计算
+无法中断，其结果被丢弃，所占名额在计算结束后释放。
+"""
+import asyncio
+import weakref
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, List, Optional, Union
+
+from .batch import EXECUTORS, BatchItemResult, _compile_one, _compile_records, _warm_up
+from .result import HexagramResult
+
+
+async def compile_async(params: List[int], date: Optional[str] = None, gender: Optional[str] = None,
+                        title: Optional[str] = None, guaci: bool = False, *,
+                        executor: Optional[Executor] = None,
+                        timeout: Optional[float] = None) -> HexagramResult:
+    """
+    异步排盘
+    :param params: 爻位参数列表
+    :param date: 日期
+    :param gender: 性别
+    :param title: 标题
+    :param guaci: 是否包含卦象文本
+    :param executor: 执行器（线程池或进程池），默认使用事件循环的默认线程池
+    :param timeout: 超时时间(秒)，超时抛出 asyncio.TimeoutError
+    :return: 排盘结果
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, _compile_one, params, date, gender, title, guaci)
+
+    return await asyncio.wait_for(future, timeout)
+
+
+async def _aiter(records: Union[Iterable[Any], AsyncIterable[Any]]) -> AsyncIterator[Any]:
+    """同步或异步可迭代对象统一为异步迭代"""
+    if hasattr(records, '__aiter__'):
+        async for record in records:
+            yield record
+    else:
+        for record in records:
+            yield record
+
+
+def _release_later(loop: asyncio.AbstractEventLoop, semaphore: asyncio.Semaphore) -> None:
+    """在执行器线程中归还名额；事件循环已关闭时名额随循环失效，无需归还"""
+    if loop.is_closed():
+        return
+
+    try:
+        loop.call_soon_threadsafe(semaphore.release)
+    except RuntimeError:
+        # 检查之后循环才关闭
+        pass
+
+
+class AsyncBatchProcessor:
+    """异步批量处理工具类"""
+
+    def __init__(self, max_workers: int = 4, executor: Union[str, Executor] = 'threads',
+                 max_concurrency: Optional[int] = None, item_timeout: Optional[float] = None):
+        """
+        :param max_workers: 自建执行器的工作线程（进程）数
+        :param executor: threads / processes，或外部传入的执行器（不负责关闭）
+        :param max_concurrency: 同时在途的最大任务数，默认 max_workers
+        :param item_timeout: 单条任务的期限(秒)，自提交起计时，超时记为错误
+        """
+        if isinstance(executor, str) and executor not in EXECUTORS[:2]:
+            raise ValueError(f"executor must be one of {EXECUTORS[:2]} or an Executor, got {executor!r}")
+
+        self.max_workers = max_workers
+        self.executor = executor
+        self.max_concurrency = max(1, max_concurrency or max_workers)
+        self.item_timeout = item_timeout
+        self._pool: Optional[Executor] = executor if isinstance(executor, Executor) else None
+        # 每个事件循环一个信号量（asyncio.Semaphore 绑定创建它的循环），循环回收后自动移除
+        self._semaphores: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = \
+            weakref.WeakKeyDictionary()
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.executor == 'processes':
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_up)
+            else:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        return self._pool
+
+    def _get_semaphore(self, loop: asyncio.AbstractEventLoop) -> asyncio.Semaphore:
+        """当前事件循环的并发名额（同一实例可在多次 asyncio.run 中使用，上限按循环计）"""
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+
+        return semaphore
+
+    async def _call(self, fn, *args) -> Any:
+        """
+        占用一个并发名额，在执行器中调用 fn；超过 item_timeout 抛出 asyncio.TimeoutError。
+        超时或被取消时若任务已在执行器中运行，名额在其实际结束后才释放，
+        保证执行器中同时运行的任务数不超过 max_concurrency。
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._get_semaphore(loop)
+        await semaphore.acquire()
+
+        future = None
+        try:
+            # 提交本身也可能失败（如执行器已关闭），同样要归还名额
+            future = self._get_pool().submit(fn, *args)
+            wrapped = asyncio.wrap_future(future)
+            done, _ = await asyncio.wait({wrapped}, timeout=self.item_timeout)
+            if not done:
+                raise asyncio.TimeoutError()
+            return wrapped.result()
+        finally:
+            if future is None or future.done() or future.cancel():
+                semaphore.release()
+            else:
+                future.add_done_callback(lambda _: _release_later(loop, semaphore))
+                # 结果被丢弃，避免 "exception was never retrieved" 警告
+                wrapped.add_done_callback(lambda f: f.cancelled() or f.exception())
+
+    async def compile(self, params: List[int], date: Optional[str] = None, gender: Optional[str] = None,
+                      title: Optional[str] = None, guaci: bool = False) -> HexagramResult:
+        """
+        异步排盘（与批量任务共享并发上限）
+        :return: 排盘结果，超过 item_timeout 抛出 asyncio.TimeoutError
+        """
+        return await self._call(_compile_one, params, date, gender, title, guaci)
+
+    async def _run_record(self, index: int, record: Any, guaci: bool) -> BatchItemResult:
+        """在执行器中编译一条记录，超时或异常记为错误（取消除外）"""
+        try:
+            return (await self._call(_compile_records, [(index, record)], guaci))[0]
+        except asyncio.TimeoutError:
+            return BatchItemResult(index, error=f"Error processing params {record}: timed out after {self.item_timeout}s")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            return BatchItemResult(index, error=f"Error processing params {record}: {str(e)}")
+
+    async def aiter_batch(self,
+                          records: Union[Iterable[Any], AsyncIterable[Any]],
+                          guaci: bool = False,
+                          ordered: bool = True) -> AsyncIterator[BatchItemResult]:
+        """
+        异步流式批量处理，输入可以是同步或异步可迭代对象
+        :param records: 请求记录（字典或爻位参数序列）
+        :param guaci: 是否包含卦象文本（记录中的 guaci 键优先）
+        :param ordered: True 按输入顺序产出，False 按完成顺序产出
+        :return: BatchItemResult 异步生成器
+        """
+        source = _aiter(records).__aiter__()
+        pending = deque()
+        index = 0
+        exhausted = False
+
+        async def fill() -> None:
+            nonlocal index, exhausted
+            while not exhausted and len(pending) < self.max_concurrency:
+                try:
+                    record = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    return
+                pending.append(asyncio.ensure_future(self._run_record(index, record, guaci)))
+                index += 1
+
+        try:
+            await fill()
+            while pending:
+                if ordered:
+                    task = pending.popleft()
+                else:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    task = next(t for t in pending if t in done)
+                    pending.remove(task)
+
+                item = await task
+                await fill()
+                yield item
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def close(self) -> None:
+        """关闭自建的执行器（外部传入的执行器不关闭）"""
+        if self._pool is not None and not isinstance(self.executor, Executor):
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(None, pool.shutdown)
+
+    async def __aenter__(self) -> 'AsyncBatchProcessor':
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
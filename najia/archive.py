@@ -0,0 +1,288 @@
+"""
+二进制归档
+
+排盘结果完全由爻位参数与公历时间（及其解析出的日历信息）决定，可压缩为定长记录：
+
+    偏移  类型     字段
+    0     int64    公历时间的 UTC 微秒时间戳
+    8     int32    公历时间的 UTC 偏移秒数
+    12    uint16   低 12 位为爻位参数（每爻 2 位，取值减 1），第 12 位为卦辞标志
+    14    uint8×4  年、月、日、时柱的六十甲子序号
+    18    uint8    月建地支序号（日历信息）
+    19    uint8    月建地支序号（结果的 yue_zhi），0xFF 表示无
+    20    uint8    日辰六十甲子序号（结果的 ri_chen），0xFF 表示无
+
+每条 21 字节（小端），文件以 16 字节文件头开始（魔数 NJAR、版本号、记录长度）。
+旬空由日柱推出，卦名、六亲、伏神、变卦等由静态卦象表查出，卦辞按需读取，均不落盘。
+
+ArchiveReader 以只读方式 mmap 文件，按下标 O(1) 访问，读取时才解码为 HexagramResult
+（或更轻的 CompactHexagramResult）；顺序遍历用 struct.iter_unpack 批量解码。
+
+    with ArchiveWriter('casts.njar') as writer:
+        writer.write(Najia().compile(params, date=...).result)
+
+    with ArchiveReader('casts.njar') as reader:
+        result = reader[1000]
+        for compact in reader.iter_compact():
+            ...
+"""
+import mmap
+import os
+import struct
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Union
+
+from . import ganzhi
+from .compact import CompactHexagramResult
+from .const import ZHIS, ZHIS_DICT
+from .hexagram_table import get_table
+from .lunar_utils import CalendarInfo
+from .result import HexagramResult
+
+MAGIC = b'NJAR'
+VERSION = 1
+
+HEADER = struct.Struct('<4sHH8x')
+RECORD = struct.Struct('<qiH7B')
+
+# 卦辞标志位
+_GUACI_FLAG = 1 << 12
+_PARAMS_MASK = _GUACI_FLAG - 1
+
+# 月建、日辰缺省值
+_NONE = 0xFF
+
+# 顺序遍历时每次解码的记录数
+_SCAN_BLOCK = 4096
+
+# 干支 -> 六十甲子序号
+_GANZHI_INDEX = {ganzhi.ganzhi(i): i for i in range(60)}
+
+Result = Union[HexagramResult, CompactHexagramResult]
+
+
+def _ganzhi_index(value: str) -> int:
+    try:
+        return _GANZHI_INDEX[value]
+    except KeyError:
+        raise ValueError(f'invalid ganzhi: {value!r}')
+
+
+def _zhi_index(value: str) -> int:
+    try:
+        return ZHIS_DICT[value]
+    except KeyError:
+        raise ValueError(f'invalid zhi: {value!r}')
+
+
+def pack(result: Result) -> bytes:
+    """
+    结果编码为定长记录
+    :param result: HexagramResult 或 CompactHexagramResult
+    :return: RECORD.size 字节
+    :raises ValueError: 参数不是 1~4，或结果的农历信息与公历时间不一致
+    """
+    if isinstance(result, HexagramResult):
+        result = CompactHexagramResult.from_result(result)
+
+    static = result.static
+    if static.key is None:
+        raise ValueError(f'params must be 6 values in 1~4: {static.params}')
+
+    cal = result.calendar
+    return RECORD.pack(
+        result.solar_us,
+        result.solar_offset,
+        static.key | (_GUACI_FLAG if result.guaci else 0),
+        _ganzhi_index(cal.year),
+        _ganzhi_index(cal.month),
+        _ganzhi_index(cal.day),
+        _ganzhi_index(cal.hour),
+        _zhi_index(cal.month_zhi),
+        _NONE if result.yue_zhi is None else _zhi_index(result.yue_zhi),
+        _NONE if result.ri_chen is None else _ganzhi_index(result.ri_chen),
+    )
+
+
+@lru_cache(maxsize=4096)
+def _calendar(year: int, month: int, day: int, hour: int, month_zhi: int) -> CalendarInfo:
+    """由四柱序号还原日历信息（相同四柱共享同一实例）"""
+    day_gz = ganzhi.ganzhi(day)
+    return CalendarInfo(
+        year=ganzhi.ganzhi(year),
+        month=ganzhi.ganzhi(month),
+        day=day_gz,
+        hour=ganzhi.ganzhi(hour),
+        xkong=ganzhi.xun_kong(day),
+        month_zhi=ZHIS[month_zhi],
+        day_gz=day_gz,
+    )
+
+
+def _decode(solar_us: int, solar_offset: int, bits: int, year: int, month: int, day: int, hour: int,
+            month_zhi: int, yue_zhi: int, ri_chen: int, table: List) -> CompactHexagramResult:
+    return CompactHexagramResult(
+        table[bits & _PARAMS_MASK],
+        solar_us,
+        solar_offset,
+        _calendar(year, month, day, hour, month_zhi),
+        None if yue_zhi == _NONE else ZHIS[yue_zhi],
+        None if ri_chen == _NONE else ganzhi.ganzhi(ri_chen),
+        bool(bits & _GUACI_FLAG),
+    )
+
+
+def unpack(data: bytes) -> CompactHexagramResult:
+    """
+    定长记录解码
+    :param data: RECORD.size 字节
+    :return: 紧凑结果
+    """
+    return _decode(*RECORD.unpack(data), get_table())
+
+
+class ArchiveWriter(object):
+    """归档写入（追加模式下可向已有归档继续写入）"""
+
+    def __init__(self, path: Union[str, Path], append: bool = False):
+        """
+        :param path: 文件路径
+        :param append: 追加到已有归档（文件不存在时新建）
+        """
+        self.path = Path(path)
+        self.count = 0
+
+        if append and self.path.exists() and self.path.stat().st_size:
+            _check_header(self.path)
+            self._file = open(self.path, 'r+b')
+            # 丢弃上次异常中断时写了一半的记录，保证新记录对齐
+            size = self._file.seek(0, os.SEEK_END)
+            self._file.truncate(size - (size - HEADER.size) % RECORD.size)
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(self.path, 'wb')
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size))
+
+    def write(self, result: Result) -> None:
+        """写入一条结果"""
+        self._file.write(pack(result))
+        self.count += 1
+
+    def write_many(self, results: Iterable[Result]) -> int:
+        """
+        写入多条结果
+        :return: 写入条数
+        """
+        n = 0
+        for result in results:
+            self.write(result)
+            n += 1
+
+        return n
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _check_header(path: Path) -> None:
+    with open(path, 'rb') as f:
+        _parse_header(f.read(HEADER.size), path)
+
+
+def _parse_header(data: bytes, path: Path) -> None:
+    if len(data) < HEADER.size:
+        raise ValueError(f'not a najia archive: {path}')
+
+    magic, version, record_size = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError(f'not a najia archive: {path}')
+    if version != VERSION or record_size != RECORD.size:
+        raise ValueError(f'unsupported archive version {version} (record size {record_size}): {path}')
+
+
+class ArchiveReader(object):
+    """归档读取（只读 mmap，按下标随机访问）"""
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        :param path: 文件路径
+        :raises ValueError: 不是归档文件或版本不支持
+        """
+        self.path = Path(path)
+        self._file = open(self.path, 'rb')
+        self._mmap: Optional[mmap.mmap] = None
+        try:
+            _parse_header(self._file.read(HEADER.size), self.path)
+            size = os.fstat(self._file.fileno()).st_size
+            # 末尾未写完整的记录忽略
+            self._count = (size - HEADER.size) // RECORD.size
+            if self._count:
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(f'archive index out of range: {index}')
+
+        return index
+
+    def compact(self, index: int) -> CompactHexagramResult:
+        """第 index 条记录（紧凑结果）"""
+        offset = HEADER.size + self._index(index) * RECORD.size
+        return _decode(*RECORD.unpack_from(self._mmap, offset), get_table())
+
+    def __getitem__(self, index: int) -> HexagramResult:
+        """第 index 条记录（完整结果）"""
+        return self.compact(index).to_result()
+
+    def iter_compact(self, start: int = 0, stop: Optional[int] = None) -> Iterator[CompactHexagramResult]:
+        """
+        顺序解码为紧凑结果
+        :param start: 起始下标
+        :param stop: 结束下标（不含），默认到末尾
+        """
+        stop = self._count if stop is None else min(stop, self._count)
+        if start >= stop:
+            return
+
+        table = get_table()
+        for block in range(max(start, 0), stop, _SCAN_BLOCK):
+            # 按块复制出字节串再批量解码（不持有 mmap 的缓冲区导出，读取器可随时关闭）
+            begin = HEADER.size + block * RECORD.size
+            data = self._mmap[begin:begin + min(_SCAN_BLOCK, stop - block) * RECORD.size]
+            for fields in RECORD.iter_unpack(data):
+                yield _decode(*fields, table)
+
+    def __iter__(self) -> Iterator[HexagramResult]:
+        for compact in self.iter_compact():
+            yield compact.to_result()
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
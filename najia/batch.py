@@ -1,14 +1,349 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Iterable, Iterator, Mapping
+from collections import deque
 from dataclasses import dataclass
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from itertools import islice
 import logging
+import math
+import re
+import threading
 import time
 
+from . import instrument
 from .result import HexagramResult
 from .log import setup_logger
 
 logger = setup_logger(__name__)
 
+# 执行方式：线程池 / 进程池 / 顺序执行
+EXECUTORS = ('threads', 'processes', 'sequential')
+
+# 单条任务：(params, date, gender, title)
+BatchItem = Tuple[List[int], Optional[str], Optional[str], Optional[str]]
+
+
+def _warm_up() -> None:
+    """进程池初始化：每个工作进程预先构建静态卦表与节令表，只做一次"""
+    from . import ganzhi
+    from .hexagram_table import get_table
+
+    get_table()
+    ganzhi._table()
+
+
+def _compile_one(params: List[int], date: Optional[str] = None, gender: Optional[str] = None,
+                 title: Optional[str] = None, guaci: bool = False) -> HexagramResult:
+    """编译单个卦象，出错时抛出异常"""
+    from .najia import Najia
+
+    najia = Najia()
+    najia.compile(
+        params=params,
+        date=date,
+        gender=gender,
+        title=title,
+        guaci=guaci
+    )
+    return najia.result
+
+
+class _SharedCompiler(object):
+    """
+    批内共享编译：结果只由爻位参数、日历小时桶（四柱、旬空、月建日辰）与卦辞标志决定，
+    同一桶内的请求只构建一次，之后返回共享结果的独立副本并替换公历时间（见 _copy_result）。
+    桶数超过 max_size 时清空重来，流式处理时内存有上限；线程间可共用同一实例，
+    桶的查找与插入在锁内进行，构建在锁外（不同桶并行构建）；同一桶同时只有一个线程构建，
+    其余线程等待其结果，computed 计数与执行方式无关。
+    """
+
+    def __init__(self, max_size: int = 4096):
+        """
+        :param max_size: 缓存的桶数上限，0 表示不共享
+        """
+        self.max_size = max_size
+        self.computed = 0
+        self._buckets: Dict[Any, HexagramResult] = {}
+        # 正在构建的桶
+        self._pending: Dict[Any, Future] = {}
+        self._lock = threading.Lock()
+
+    def compile(self, params: List[int], date: Optional[str] = None, guaci: bool = False) -> HexagramResult:
+        """编译单个卦象，出错时抛出异常"""
+        from .najia import Najia
+
+        timer = instrument.timer()
+        static, solar, cal, yue_zhi, ri_chen = Najia()._resolve(params, date, timer=timer)
+        solar = solar.isoformat()
+
+        key = None
+        if self.max_size:
+            try:
+                key = (tuple(params), cal, yue_zhi, ri_chen, guaci)
+                hash(key)
+            except TypeError:
+                key = None
+
+        if key is None:
+            result = Najia._build_result(params, static, solar, cal, yue_zhi, ri_chen, guaci, timer)
+            with self._lock:
+                self.computed += 1
+        else:
+            with self._lock:
+                shared = self._buckets.get(key)
+                pending = self._pending.get(key) if shared is None else None
+                owner = shared is None and pending is None
+                if owner:
+                    pending = self._pending[key] = Future()
+
+            if owner:
+                try:
+                    shared = Najia._build_result(params, static, solar, cal, yue_zhi, ri_chen, guaci, timer)
+                except BaseException as e:
+                    with self._lock:
+                        del self._pending[key]
+                    pending.set_exception(e)
+                    raise
+
+                with self._lock:
+                    del self._pending[key]
+                    self.computed += 1
+                    if len(self._buckets) >= self.max_size:
+                        self._buckets.clear()
+                    self._buckets[key] = shared
+                pending.set_result(shared)
+            elif shared is None:
+                shared = pending.result()
+
+            # 缓存中的结果不直接交出，调用方修改返回值不影响之后共享同一桶的结果
+            result = _copy_result(shared, solar)
+
+        if timer:
+            timer.total('compile')
+
+        return result
+
+
+def _shallow(obj: Any) -> Any:
+    """数据类实例的浅复制（比 copy.copy、dataclasses.replace 快）"""
+    new = object.__new__(type(obj))
+    new.__dict__.update(obj.__dict__)
+    return new
+
+
+def _copy_result(result: HexagramResult, solar: Optional[str] = None) -> HexagramResult:
+    """
+    共享结果的独立副本：列表、字典字段逐个复制，修改一个位置的结果不影响其他位置
+    :param result: 共享结果
+    :param solar: 替换的公历时间，默认不变
+    """
+    new = _shallow(result)
+    new.params = list(result.params)
+    new.qin6 = list(result.qin6)
+    new.qinx = list(result.qinx)
+    new.god6 = list(result.god6)
+    new.dong = list(result.dong)
+    new.lunar = {k: dict(v) if isinstance(v, dict) else v for k, v in result.lunar.items()}
+    if solar is not None:
+        new.solar = solar
+    if result.bian is not None:
+        new.bian = bian = _shallow(result.bian)
+        bian.qin6, bian.qinx = list(bian.qin6), list(bian.qinx)
+    if result.hide is not None:
+        new.hide = hide = _shallow(result.hide)
+        hide.qin6, hide.qinx, hide.seat = list(hide.qin6), list(hide.qinx), list(hide.seat)
+    for name in ('yue_ling', 'yue_po', 'xun_kong', 'liu_shen'):
+        value = getattr(result, name)
+        if value is not None:
+            setattr(new, name, list(value))
+
+    return new
+
+
+def _request_key(params: Any, date: Any, guaci: bool) -> Optional[Tuple[Any, ...]]:
+    """
+    去重键 (爻位参数, 日期, 卦辞标志)；性别、标题不影响排盘结果，不参与区分。
+    无法哈希的输入返回 None（不去重）
+    """
+    try:
+        key = (tuple(params), date, guaci)
+        hash(key)
+    except TypeError:
+        return None
+
+    return key
+
+
+def _dedup(items: Sequence[BatchItem], guaci: bool) -> Tuple[List[BatchItem], List[int]]:
+    """
+    合并完全相同的请求
+    :return: (去重后的任务, 每条输入对应的去重后序号)
+    """
+    unique: List[BatchItem] = []
+    slots: List[int] = []
+    seen: Dict[Any, int] = {}
+    for item in items:
+        key = _request_key(item[0], item[1], guaci)
+        slot = seen.get(key) if key is not None else None
+        if slot is None:
+            slot = len(unique)
+            unique.append(item)
+            if key is not None:
+                seen[key] = slot
+        slots.append(slot)
+
+    return unique, slots
+
+
+# 日期字符串开头的 年-月-日 时（无论是否带时区，与 arrow 解析后的本地年月日时一致）
+_DATE_PREFIX = re.compile(r'(\d{4})-(\d{2})-(\d{2})(?:[T ](\d{2}))?')
+
+
+def _calendar_bucket(date: Any) -> Tuple[int, ...]:
+    """
+    日历桶：(年, 月, 日, 时)，不调用 arrow，只读取日期字符串开头的数字。
+    无日期（当前时间）为 (0,)，无法识别的格式为 (1,)，只影响分组，不影响结果
+    """
+    if date is None:
+        return (0,)
+
+    match = _DATE_PREFIX.match(date) if isinstance(date, str) else None
+    if match is None:
+        return (1,)
+
+    year, month, day, hour = match.groups()
+    return int(year), int(month), int(day), int(hour or 0)
+
+
+def plan_chunks(items: Sequence[BatchItem], size: int) -> Tuple[List[List[int]], int]:
+    """
+    按日历局部性划分任务：同一日历小时桶的任务排在一起，桶按日期排序（同一天的各时辰相邻），
+    再按桶边界装入不超过 size 条的分块（超过 size 的桶才拆开），同一桶尽量落在同一工作线程（进程）上，
+    日历、时间分析等按日、按小时的缓存连续命中
+    :param items: 任务列表
+    :param size: 分块大小
+    :return: (分块列表，每块为任务序号列表, 桶数)
+    """
+    buckets: Dict[Tuple[int, ...], List[int]] = {}
+    for i, item in enumerate(items):
+        buckets.setdefault(_calendar_bucket(item[1]), []).append(i)
+
+    chunks: List[List[int]] = []
+    current: List[int] = []
+    for key in sorted(buckets):
+        indices = buckets[key]
+        if current and len(current) + len(indices) > size:
+            chunks.append(current)
+            current = []
+        while len(indices) > size:
+            chunks.append(indices[:size])
+            indices = indices[size:]
+        current.extend(indices)
+    if current:
+        chunks.append(current)
+
+    return chunks, len(buckets)
+
+
+# 单条结果：(结果, 错误信息)
+Outcome = Tuple[Optional[HexagramResult], Optional[str]]
+
+
+def _try_compile(compiler: _SharedCompiler, item: BatchItem, guaci: bool) -> Outcome:
+    params, date = item[0], item[1]
+    try:
+        return compiler.compile(params, date, guaci), None
+    except Exception as e:
+        return None, f"Error processing params {params}: {str(e)}"
+
+
+def _compile_chunk(items: Sequence[BatchItem], guaci: bool, share: bool = True) -> Tuple[List[Outcome], int]:
+    """
+    在工作进程中编译一组卦象
+    :return: (与输入顺序一致的 (结果, 错误信息) 列表, 实际构建的结果数)
+    """
+    compiler = _SharedCompiler() if share else _SharedCompiler(0)
+    return [_try_compile(compiler, item, guaci) for item in items], compiler.computed
+
+
+def _compile_chunk_shared(compiler: _SharedCompiler, items: Sequence[BatchItem], guaci: bool) -> List[Outcome]:
+    """在工作线程中用共用的编译器编译一组卦象"""
+    return [_try_compile(compiler, item, guaci) for item in items]
+
+
+@dataclass
+class BatchItemResult:
+    """流式批量处理的单条结果（成功时 result 非空，失败时 error 非空）"""
+    index: int                                # 在输入中的序号
+    result: Optional[HexagramResult] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        if self.error is not None:
+            return {'index': self.index, 'error': self.error}
+
+        return {'index': self.index, 'result': self.result.to_dict()}
+
+
+def _normalize_record(record: Any, guaci: bool) -> Tuple[BatchItem, bool]:
+    """
+    请求记录转为 (params, date, gender, title) 与 guaci 标志。
+    记录可以是包含 params/date/gender/title/guaci 键的字典，或直接是爻位参数序列。
+    """
+    if isinstance(record, Mapping):
+        if record.get('params') is None:
+            raise ValueError('record has no params')
+
+        item = (record['params'], record.get('date'), record.get('gender'), record.get('title'))
+        return item, bool(record.get('guaci', guaci))
+
+    return (record, None, None, None), guaci
+
+
+def _compile_records(records: Sequence[Tuple[int, Any]], guaci: bool,
+                     compiler: Optional[_SharedCompiler] = None, share: bool = True) -> List[BatchItemResult]:
+    """
+    编译一组带序号的请求记录，单条失败不影响其余记录。
+    share 为 True 时组内完全相同的请求只编译一次（之后的位置得到独立副本），同一日历小时桶内的请求共享构建（见 _SharedCompiler）
+    :param compiler: 共享编译器（线程间共用），默认每次调用新建
+    """
+    if compiler is None:
+        compiler = _SharedCompiler() if share else _SharedCompiler(0)
+    share = compiler.max_size > 0
+    seen: Dict[Any, HexagramResult] = {}
+    out = []
+    for index, record in records:
+        try:
+            (params, date, gender, title), flag = _normalize_record(record, guaci)
+            key = _request_key(params, date, flag) if share else None
+            result = seen.get(key) if key is not None else None
+            if result is None:
+                result = compiler.compile(params, date, flag)
+                if key is not None:
+                    seen[key] = result
+            else:
+                result = _copy_result(result)
+            out.append(BatchItemResult(index, result=result))
+        except Exception as e:
+            params = record.get('params') if isinstance(record, Mapping) else record
+            out.append(BatchItemResult(index, error=f"Error processing params {params}: {str(e)}"))
+
+    return out
+
+
+def _chunked(iterable: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """按 size 条一组惰性切分可迭代对象"""
+    it = iter(iterable)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
 
 @dataclass
 class BatchResult:
@@ -18,6 +353,19 @@ class BatchResult:
     error_count: int
     errors: List[str]
     processing_time: float
+    # 去重统计
+    request_count: int = 0     # 输入条数
+    unique_count: int = 0      # 合并完全相同的请求后的条数
+    computed_count: int = 0    # 实际构建的结果数（同一日历小时桶内共享）
+    bucket_count: int = 0      # 日历小时桶数（按日历局部性分组时）
+
+    @property
+    def saved_ratio(self) -> float:
+        """去重节省的构建比例"""
+        if not self.request_count:
+            return 0.0
+
+        return 1 - self.computed_count / self.request_count
 
     def to_dict(self) -> Dict[str, Any]:
         """转换为字典"""
@@ -26,11 +374,24 @@ class BatchResult:
             'success_count': self.success_count,
             'error_count': self.error_count,
             'errors': self.errors,
-            'processing_time': self.processing_time
+            'processing_time': self.processing_time,
+            'dedup': {
+                'requests': self.request_count,
+                'unique': self.unique_count,
+                'computed': self.computed_count,
+                'buckets': self.bucket_count,
+            },
         }
 
-    def to_json(self) -> str:
-        """转换为JSON字符串"""
+    def to_json(self, compact: bool = False) -> str:
+        """
+        转换为JSON字符串
+        :param compact: 紧凑格式（无缩进、无多余空格，见 serialize.py）
+        """
+        if compact:
+            from .serialize import dumps
+            return dumps(self.to_dict())
+
         import json
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
 
@@ -38,29 +399,44 @@ class BatchResult:
 class BatchProcessor:
     """批量处理工具类"""
 
-    def __init__(self, max_workers: int = 4, timeout: int = 30):
+    def __init__(self, max_workers: int = 4, timeout: int = 30, executor: str = 'threads',
+                 chunk_size: Optional[int] = None, dedup: bool = True, locality: bool = True):
         """
         初始化批量处理器
-        :param max_workers: 最大并发工作线程数
-        :param timeout: 超时时间(秒)
+        :param max_workers: 最大并发工作线程（进程）数
+        :param timeout: 超时时间(秒)，按每个分块计
+        :param executor: 执行方式 threads / processes / sequential
+        :param chunk_size: 线程池、进程池模式下每次提交的任务数，默认按工作线程（进程）数自动划分
+        :param dedup: 合并重复请求：完全相同的请求只计算一次，同一日历小时桶内只构建一次，
+                      结果按位置分发（重复位置上是相互独立的副本，修改一个位置不影响其他位置）
+        :param locality: 按日历局部性分组：同一日历小时桶的任务放在同一分块中计算（见 plan_chunks），
+                         结果仍按输入顺序返回
         """
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}, got {executor!r}")
+
         self.max_workers = max_workers
         self.timeout = timeout
+        self.executor = executor
+        self.chunk_size = chunk_size
+        self.dedup = dedup
+        self.locality = locality
 
-    def process_batch(self,
-                     params_list: List[List[int]],
-                     dates: Optional[List[str]] = None,
-                     genders: Optional[List[str]] = None,
-                     titles: Optional[List[str]] = None,
-                     guaci: bool = False) -> BatchResult:
+    def _chunk_size(self, n: int) -> int:
+        """分块大小：默认每个工作线程（进程）约分到 4 块"""
+        if self.chunk_size:
+            return max(1, self.chunk_size)
+
+        return max(1, math.ceil(n / (self.max_workers * 4)))
+
+    def _compiler(self) -> _SharedCompiler:
+        return _SharedCompiler() if self.dedup else _SharedCompiler(0)
+
+    def _run(self, params_list: List[List[int]], dates: Optional[List[str]], genders: Optional[List[str]],
+             titles: Optional[List[str]], guaci: bool, compute) -> BatchResult:
         """
-        批量处理爻位参数
-        :param params_list: 爻位参数列表的列表
-        :param dates: 日期列表
-        :param genders: 性别列表
-        :param titles: 标题列表
-        :param guaci: 是否包含卦象文本
-        :return: 批量处理结果
+        去重、计算、按输入位置分发结果
+        :param compute: (任务分块列表, guaci) -> (每块的 (结果, 错误信息) 列表, 实际构建的结果数)
         """
         if not params_list:
             return BatchResult(
@@ -72,68 +448,104 @@ class BatchProcessor:
             )
 
         start_time = time.time()
-        results = []
-        errors = []
-        success_count = 0
 
         # 确保列表长度匹配
         n = len(params_list)
         dates = dates or [None] * n
         genders = genders or [None] * n
         titles = titles or [None] * n
+        items = [
+            (params,
+             dates[i] if i < len(dates) else None,
+             genders[i] if i < len(genders) else None,
+             titles[i] if i < len(titles) else None)
+            for i, params in enumerate(params_list)
+        ]
 
-        def process_single(params: List[int], date: str = None, gender: str = None, title: str = None) -> Optional[HexagramResult]:
-            """处理单个卦象"""
-            try:
-                from .najia import Najia
-                najia = Najia()
-                najia.compile(
-                    params=params,
-                    date=date,
-                    gender=gender,
-                    title=title,
-                    guaci=guaci
-                )
-                return najia.result
-            except Exception as e:
-                logger.error(f"Error processing params {params}: {str(e)}")
-                return None
+        if self.dedup:
+            unique, slots = _dedup(items, guaci)
+        else:
+            unique, slots = items, list(range(n))
 
-        # 使用线程池并行处理
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = []
-            for i, params in enumerate(params_list):
-                future = executor.submit(
-                    process_single,
-                    params=params,
-                    date=dates[i] if i < len(dates) else None,
-                    gender=genders[i] if i < len(genders) else None,
-                    title=titles[i] if i < len(titles) else None
-                )
-                futures.append(future)
+        size = n if self.executor == 'sequential' else self._chunk_size(len(unique))
+        if self.locality:
+            plan, bucket_count = plan_chunks(unique, size)
+        else:
+            plan, bucket_count = [list(range(i, min(i + size, len(unique)))) for i in range(0, len(unique), size)], 0
 
-            # 收集结果
-            for i, future in enumerate(futures):
-                try:
-                    result = future.result(timeout=self.timeout)
-                    if result:
-                        results.append(result)
-                        success_count += 1
-                    else:
-                        errors.append(f"Failed to process params {params_list[i]}")
-                except Exception as e:
-                    errors.append(f"Error processing params {params_list[i]}: {str(e)}")
+        chunk_outcomes, computed = compute([[unique[i] for i in chunk] for chunk in plan], guaci)
 
-        processing_time = time.time() - start_time
+        # 按分块计划放回去重后的位置
+        outcomes: List[Outcome] = [(None, None)] * len(unique)
+        for chunk, chunk_outcome in zip(plan, chunk_outcomes):
+            for i, outcome in zip(chunk, chunk_outcome):
+                outcomes[i] = outcome
+                if outcome[1] is not None:
+                    logger.error(outcome[1])
+
+        results = []
+        errors = []
+        used = [False] * len(unique)
+        for slot in slots:
+            result, error = outcomes[slot]
+            if error is None:
+                # 重复的请求得到独立副本，修改一个位置的结果不影响其他位置
+                results.append(_copy_result(result) if used[slot] else result)
+                used[slot] = True
+            else:
+                errors.append(error)
 
         return BatchResult(
             results=results,
-            success_count=success_count,
-            error_count=len(params_list) - success_count,
+            success_count=len(results),
+            error_count=n - len(results),
             errors=errors,
-            processing_time=processing_time
+            processing_time=time.time() - start_time,
+            request_count=n,
+            unique_count=len(unique),
+            computed_count=computed,
+            bucket_count=bucket_count,
         )
 
+    def process_batch(self,
+                     params_list: List[List[int]],
+                     dates: Optional[List[str]] = None,
+                     genders: Optional[List[str]] = None,
+                     titles: Optional[List[str]] = None,
+                     guaci: bool = False) -> BatchResult:
+        """
+        批量处理爻位参数
+        :param params_list: 爻位参数列表的列表
+        :param dates: 日期列表
+        :param genders: 性别列表
+        :param titles: 标题列表
+        :param guaci: 是否包含卦象文本
+        :return: 批量处理结果
+        """
+        if self.executor == 'sequential':
+            return self.process_batch_sequential(params_list, dates, genders, titles, guaci)
+
+        if self.executor == 'processes':
+            return self.process_batch_processes(params_list, dates, genders, titles, guaci)
+
+        return self._run(params_list, dates, genders, titles, guaci, self._compute_threads)
+
+    def _compute_threads(self, chunks: List[List[BatchItem]], guaci: bool) -> Tuple[List[List[Outcome]], int]:
+        """线程池并行计算（按分块提交，各线程共用同一个共享编译器）"""
+        compiler = self._compiler()
+        outcomes = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(_compile_chunk_shared, compiler, chunk, guaci) for chunk in chunks]
+
+            # 收集结果
+            for chunk, future in zip(chunks, futures):
+                try:
+                    outcomes.append(future.result(timeout=self.timeout))
+                except Exception as e:
+                    outcomes.append([(None, f"Error processing params {item[0]}: {str(e)}") for item in chunk])
+
+        return outcomes, compiler.computed
+
     def process_batch_sequential(self,
                                params_list: List[List[int]],
                                dates: Optional[List[str]] = None,
@@ -149,50 +561,118 @@ class BatchProcessor:
         :param guaci: 是否包含卦象文本
         :return: 批量处理结果
         """
-        if not params_list:
-            return BatchResult(
-                results=[],
-                success_count=0,
-                error_count=0,
-                errors=["Empty params list"],
-                processing_time=0.0
-            )
+        def compute(chunks: List[List[BatchItem]], guaci: bool) -> Tuple[List[List[Outcome]], int]:
+            compiler = self._compiler()
+            return [_compile_chunk_shared(compiler, chunk, guaci) for chunk in chunks], compiler.computed
 
-        start_time = time.time()
-        results = []
-        errors = []
-        success_count = 0
+        return self._run(params_list, dates, genders, titles, guaci, compute)
 
-        # 确保列表长度匹配
-        n = len(params_list)
-        dates = dates or [None] * n
-        genders = genders or [None] * n
-        titles = titles or [None] * n
+    def process_batch_processes(self,
+                                params_list: List[List[int]],
+                                dates: Optional[List[str]] = None,
+                                genders: Optional[List[str]] = None,
+                                titles: Optional[List[str]] = None,
+                                guaci: bool = False) -> BatchResult:
+        """
+        进程池批量处理（多核并行，结果保持输入顺序）
+        :param params_list: 爻位参数列表的列表
+        :param dates: 日期列表
+        :param genders: 性别列表
+        :param titles: 标题列表
+        :param guaci: 是否包含卦象文本
+        :return: 批量处理结果
+        """
+        return self._run(params_list, dates, genders, titles, guaci, self._compute_processes)
 
-        for i, params in enumerate(params_list):
+    def _compute_processes(self, chunks: List[List[BatchItem]], guaci: bool) -> Tuple[List[List[Outcome]], int]:
+        """进程池并行计算（每个分块在工作进程内共享编译）"""
+        outcomes: List[List[Outcome]] = []
+        computed = 0
+
+        with ProcessPoolExecutor(max_workers=self.max_workers, initializer=_warm_up) as executor:
+            futures = [executor.submit(_compile_chunk, chunk, guaci, self.dedup) for chunk in chunks]
+
+            # 按提交顺序收集
+            for chunk, future in zip(chunks, futures):
+                try:
+                    chunk_outcomes, chunk_computed = future.result(timeout=self.timeout)
+                except Exception as e:
+                    outcomes.append([(None, f"Error processing params {item[0]}: {str(e)}") for item in chunk])
+                    continue
+
+                outcomes.append(chunk_outcomes)
+                computed += chunk_computed
+
+        return outcomes, computed
+
+    def iter_batch(self,
+                   records: Iterable[Any],
+                   guaci: bool = False,
+                   ordered: bool = True,
+                   max_in_flight: Optional[int] = None) -> Iterator[BatchItemResult]:
+        """
+        流式批量处理：惰性读取任意可迭代输入，只保留有限数量的任务在途，
+        每完成一条即产出结果，内存占用与输入总量无关。
+        :param records: 请求记录（字典或爻位参数序列）的可迭代对象
+        :param guaci: 是否包含卦象文本（记录中的 guaci 键优先）
+        :param ordered: True 按输入顺序产出，False 按完成顺序产出
+        :param max_in_flight: 同时在途（已提交、未取回）的最大记录数，默认 max_workers * max(8, 分块大小)；
+                              小于 max_workers * 分块大小 时缩小分块，使在途记录数不超过上限且工作者尽量都有任务
+        :return: BatchItemResult 生成器
+        """
+        size = max(1, self.chunk_size or (16 if self.executor == 'processes' else 1))
+        cap = max(1, max_in_flight or self.max_workers * max(8, size))
+        if self.executor != 'sequential' and cap < self.max_workers * size:
+            size = max(1, cap // self.max_workers)
+        chunks = _chunked(enumerate(records), size)
+
+        if self.executor == 'sequential':
+            compiler = self._compiler()
+            for chunk in chunks:
+                yield from _compile_records(chunk, guaci, compiler)
+            return
+
+        # 线程间共用一个共享编译器；工作进程中每个分块各自共享
+        compiler = self._compiler() if self.executor == 'threads' else None
+
+        # 在途上限按分块计（分块已按上限缩小，cap >= max_workers 时每个工作者至少一个分块）
+        limit = max(1, cap // size)
+        pool_cls = ProcessPoolExecutor if self.executor == 'processes' else ThreadPoolExecutor
+        pool_kwargs = {'initializer': _warm_up} if self.executor == 'processes' else {}
+        executor = pool_cls(max_workers=self.max_workers, **pool_kwargs)
+
+        # 在途任务按提交顺序排列
+        pending = deque()
+
+        def fill() -> None:
+            while len(pending) < limit:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                pending.append((executor.submit(_compile_records, chunk, guaci, compiler, self.dedup), chunk))
+
+        def collect(future, chunk) -> List[BatchItemResult]:
             try:
-                from .najia import Najia
-                najia = Najia()
-                najia.compile(
-                    params=params,
-                    date=dates[i] if i < len(dates) else None,
-                    gender=genders[i] if i < len(genders) else None,
-                    title=titles[i] if i < len(titles) else None,
-                    guaci=guaci
-                )
-                results.append(najia.result)
-                success_count += 1
+                return future.result(timeout=self.timeout)
             except Exception as e:
-                error_msg = f"Error processing params {params}: {str(e)}"
-                logger.error(error_msg)
-                errors.append(error_msg)
+                future.cancel()
+                return [BatchItemResult(index, error=f"Error processing params {record}: {str(e)}")
+                        for index, record in chunk]
 
-        processing_time = time.time() - start_time
+        try:
+            fill()
+            while pending:
+                if ordered:
+                    future, chunk = pending.popleft()
+                else:
+                    done, _ = wait([f for f, _ in pending], timeout=self.timeout, return_when=FIRST_COMPLETED)
+                    # 超时则取最早提交的任务，由 collect 记录超时错误
+                    entry = next((e for e in pending if e[0] in done), pending[0])
+                    pending.remove(entry)
+                    future, chunk = entry
 
-        return BatchResult(
-            results=results,
-            success_count=success_count,
-            error_count=len(params_list) - success_count,
-            errors=errors,
-            processing_time=processing_time
-        )
\ No newline at end of file
+                items = collect(future, chunk)
+                fill()
+                yield from items
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,193 @@
+"""
+列式批量排盘（需要 numpy）
+
+输入 (N, 6) 的爻位参数数组以及月建地支、日辰干支的序号数组，全部通过查表
+（gather）一次性计算，不逐条调用 Najia.compile。输出为结构化数组，字段均为
+小整数编码，可按下述约定用 const 中的常量及 YUE_LING_NAMES 还原为文字。
+
+编码约定：
+- mark：卦码，第 i 位（最低位为初爻）为 1 表示阳爻
+- palace：卦宫序号，对应 const.GUAS
+- shi / ying：世爻、应爻位置（1~6，与 HexagramResult.shiy 一致）
+- dong：动爻位掩码
+- qin6：六亲编码，对应 const.QING6
+- wuxing：纳甲五行编码，对应 const.XING5
+- yue_ling：月令旺衰编码，对应 YUE_LING_NAMES；无月建时为 NONE
+- yue_po / xun_kong：布尔值
+- liu_shen：六神编码，对应 time_analysis.LIUSHEN_ORDER；无日辰时为 NONE
+"""
+from typing import Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+from . import const
+from . import time_analysis
+from .ganzhi import ganzhi_index
+from .utils import palace
+
+# 缺省编码（无月建或日辰时）
+NONE = 255
+
+# 月令旺衰编码
+YUE_LING_NAMES: Tuple[str, ...] = ('旺', '相', '休', '囚', '死')
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError('numpy is required for columnar compile, install it with: pip install najia[numpy]')
+
+
+def result_dtype():
+    """列式排盘结果的结构化 dtype"""
+    _require_numpy()
+
+    return np.dtype([
+        ('mark', 'u1'),
+        ('palace', 'u1'),
+        ('shi', 'u1'),
+        ('ying', 'u1'),
+        ('dong', 'u1'),
+        ('qin6', 'u1', (6,)),
+        ('wuxing', 'u1', (6,)),
+        ('yue_ling', 'u1', (6,)),
+        ('yue_po', '?', (6,)),
+        ('xun_kong', '?', (6,)),
+        ('liu_shen', 'u1', (6,)),
+    ])
+
+
+def mark_string(code: int) -> str:
+    """卦码编码转为卦符字符串（如 '111000'）"""
+    return ''.join('1' if code >> i & 1 else '0' for i in range(6))
+
+
+_TABLES = None
+
+
+def _tables():
+    """构建（仅一次）按卦码与时间序号索引的查找表"""
+    global _TABLES
+
+    if _TABLES is not None:
+        return _TABLES
+
+    _require_numpy()
+
+    # 64 卦静态表：基于 SHIYING_PRECOMPUTED / NAJIA_PRECOMPUTED / QIN6_MATRIX
+    shiy = np.zeros((64, 2), dtype=np.uint8)
+    gong = np.zeros(64, dtype=np.uint8)
+    zhi = np.zeros((64, 6), dtype=np.uint8)
+    wuxing = np.zeros((64, 6), dtype=np.uint8)
+    qin6 = np.zeros((64, 6), dtype=np.uint8)
+
+    for code in range(64):
+        mark = mark_string(code)
+        shi, ying, _ = const.SHIYING_PRECOMPUTED[mark]
+        gong_idx = palace(mark, shi)
+        element = const.GUA5[gong_idx]
+
+        shiy[code] = (shi, ying)
+        gong[code] = gong_idx
+        for i, gz in enumerate(const.NAJIA_PRECOMPUTED[mark]):
+            z = const.ZHIS_DICT[gz[1]]
+            zhi[code, i] = z
+            wuxing[code, i] = const.ZHI5[z]
+            qin6[code, i] = const.QING6.index(const.QIN6_MATRIX[element][const.ZHI5[z]])
+
+    # 时间规则表：直接由 time_analysis 的规则函数生成
+    yue_ling = np.array([
+        [YUE_LING_NAMES.index(time_analysis.calc_yue_ling(w, m)) for w in const.XING5]
+        for m in const.ZHIS
+    ], dtype=np.uint8)
+    yue_po = np.array([[time_analysis.is_yue_po(z, m) for z in const.ZHIS] for m in const.ZHIS])
+    days = [const.GANS[i % 10] + const.ZHIS[i % 12] for i in range(60)]
+    xun_kong = np.array([[time_analysis.is_xun_kong(z, d) for z in const.ZHIS] for d in days])
+    liu_shen = np.array([
+        [time_analysis.LIUSHEN_ORDER.index(time_analysis.calc_liu_shen(i, days[d])) for i in range(6)]
+        for d in range(60)
+    ], dtype=np.uint8)
+
+    _TABLES = {
+        'shiy': shiy, 'gong': gong, 'zhi': zhi, 'wuxing': wuxing, 'qin6': qin6,
+        'yue_ling': yue_ling, 'yue_po': yue_po, 'xun_kong': xun_kong, 'liu_shen': liu_shen,
+    }
+    return _TABLES
+
+
+def calendar_indices(dates: Sequence[str]):
+    """
+    日期字符串转为 (月建地支序号, 日辰干支序号) 数组，供 compile_columnar 使用
+    :param dates: 日期字符串序列
+    :return: (month_zhi, day_gz) 两个 int8 数组
+    """
+    _require_numpy()
+    import arrow
+
+    from .lunar_utils import resolve_calendar
+
+    month_zhi = np.empty(len(dates), dtype=np.int8)
+    day_gz = np.empty(len(dates), dtype=np.int8)
+
+    for i, date in enumerate(dates):
+        solar = arrow.get(date)
+        info = resolve_calendar(solar.year, solar.month, solar.day, solar.hour)
+        month_zhi[i] = const.ZHIS_DICT[info.month_zhi]
+        day_gz[i] = ganzhi_index(const.GANS_DICT[info.day_gz[0]], const.ZHIS_DICT[info.day_gz[1]])
+
+    return month_zhi, day_gz
+
+
+def compile_columnar(params, month_zhi=None, day_gz=None):
+    """
+    列式批量排盘
+    :param params: (N, 6) 爻位参数数组，取值 1~4
+    :param month_zhi: (N,) 月建地支序号（0=子），负数表示无月建；也可为标量
+    :param day_gz: (N,) 日辰六十甲子序号（0=甲子），负数表示无日辰；也可为标量
+    :return: (N,) 结构化数组，dtype 见 result_dtype()
+    """
+    tables = _tables()
+
+    params = np.asarray(params, dtype=np.int8)
+    if params.ndim != 2 or params.shape[1] != 6:
+        raise ValueError(f'params must have shape (N, 6), got {params.shape}')
+    if params.size and (params.min() < 1 or params.max() > 4):
+        raise ValueError('params values must be in 1~4')
+
+    n = params.shape[0]
+    weights = np.array([1, 2, 4, 8, 16, 32], dtype=np.uint8)
+    mark = ((params & 1).astype(np.uint8) * weights).sum(axis=1).astype(np.uint8)
+    dong = ((params > 2).astype(np.uint8) * weights).sum(axis=1).astype(np.uint8)
+
+    out = np.zeros(n, dtype=result_dtype())
+    out['mark'] = mark
+    out['palace'] = tables['gong'][mark]
+    out['shi'] = tables['shiy'][mark, 0]
+    out['ying'] = tables['shiy'][mark, 1]
+    out['dong'] = dong
+    out['qin6'] = tables['qin6'][mark]
+
+    wuxing = tables['wuxing'][mark]
+    zhi = tables['zhi'][mark]
+    out['wuxing'] = wuxing
+
+    out['yue_ling'] = NONE
+    out['liu_shen'] = NONE
+
+    if month_zhi is not None:
+        month = np.broadcast_to(np.asarray(month_zhi, dtype=np.int16), (n,))
+        valid = month >= 0
+        m = np.where(valid, month, 0)[:, None]
+        out['yue_ling'] = np.where(valid[:, None], tables['yue_ling'][m, wuxing], NONE)
+        out['yue_po'] = valid[:, None] & tables['yue_po'][m, zhi]
+
+    if day_gz is not None:
+        day = np.broadcast_to(np.asarray(day_gz, dtype=np.int16), (n,))
+        valid = day >= 0
+        d = np.where(valid, day, 0)[:, None]
+        out['xun_kong'] = valid[:, None] & tables['xun_kong'][d, zhi]
+        out['liu_shen'] = np.where(valid[:, None], tables['liu_shen'][d, np.arange(6)], NONE)
+
+    return out
@@ -0,0 +1,189 @@
+"""
+紧凑排盘结果
+
+HexagramResult 为每个结果分配多组字符串列表和嵌套字典，常驻大量结果时内存开销大。
+CompactHexagramResult 使用 __slots__，只保存对共享不可变数据的引用（静态卦象表项、
+按小时缓存的日历信息）以及公历时间的整数编码，其余文字在 to_dict()/render() 时才解码，
+输出与 HexagramResult.to_dict() 完全一致。
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from .hexagram_table import StaticHexagram, get_static, get_table
+from .lunar_utils import CalendarInfo, resolve_calendar
+from .result import HexagramResult
+from .time_analysis import time_block
+from .utils import get_god6, get_guaci
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _encode_solar(dt: datetime) -> Tuple[int, int]:
+    """带时区的时间编码为 (UTC 微秒时间戳, UTC 偏移秒数)"""
+    offset = dt.utcoffset()
+    if offset is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+        offset = timedelta(0)
+
+    return (dt - _EPOCH) // _MICROSECOND, int(offset.total_seconds())
+
+
+def _decode_solar(micros: int, offset: int) -> datetime:
+    """_encode_solar 的逆运算"""
+    return (_EPOCH + timedelta(microseconds=micros)).astimezone(timezone(timedelta(seconds=offset)))
+
+
+def _restore(key: Any, solar_us: int, solar_offset: int, cal: CalendarInfo,
+             yue_zhi: Optional[str], ri_chen: Optional[str], guaci: bool) -> 'CompactHexagramResult':
+    """反序列化：重新指向本进程的静态卦象表项"""
+    static = get_table()[key] if isinstance(key, int) else get_static(key)
+    return CompactHexagramResult(static, solar_us, solar_offset, cal, yue_zhi, ri_chen, guaci)
+
+
+class CompactHexagramResult(object):
+    """紧凑排盘结果（只读）"""
+
+    __slots__ = ('static', 'solar_us', 'solar_offset', 'calendar', 'yue_zhi', 'ri_chen', 'guaci')
+
+    def __init__(self, static: StaticHexagram, solar_us: int, solar_offset: int, calendar: CalendarInfo,
+                 yue_zhi: Optional[str] = None, ri_chen: Optional[str] = None, guaci: bool = False):
+        """
+        :param static: 静态卦象（共享）
+        :param solar_us: 公历时间的 UTC 微秒时间戳
+        :param solar_offset: 公历时间的 UTC 偏移秒数
+        :param calendar: 日历信息（共享）
+        :param yue_zhi: 月建地支
+        :param ri_chen: 日辰干支
+        :param guaci: 是否包含卦象文本
+        """
+        self.static = static
+        self.solar_us = solar_us
+        self.solar_offset = solar_offset
+        self.calendar = calendar
+        self.yue_zhi = yue_zhi
+        self.ri_chen = ri_chen
+        self.guaci = guaci
+
+    @classmethod
+    def from_parts(cls, static: StaticHexagram, solar: datetime, calendar: CalendarInfo,
+                   yue_zhi: Optional[str] = None, ri_chen: Optional[str] = None,
+                   guaci: bool = False) -> 'CompactHexagramResult':
+        """由编译过程的中间结果构造"""
+        solar_us, solar_offset = _encode_solar(solar)
+        return cls(static, solar_us, solar_offset, calendar, yue_zhi, ri_chen, guaci)
+
+    @classmethod
+    def from_result(cls, result: HexagramResult) -> 'CompactHexagramResult':
+        """
+        由 HexagramResult 转换
+        :raises ValueError: 结果的农历信息与其公历时间不一致（例如被手工修改过）
+        """
+        solar = datetime.fromisoformat(result.solar)
+        calendar = resolve_calendar(solar.year, solar.month, solar.day, solar.hour)
+        if calendar.to_lunar_dict() != result.lunar:
+            raise ValueError(f'lunar data does not match solar time {result.solar}')
+
+        static = get_static(result.params)
+        if static.mark != result.mark:
+            raise ValueError(f'mark {result.mark} does not match params {result.params}')
+
+        return cls.from_parts(static, solar, calendar, result.yue_zhi, result.ri_chen, result.guaci is not None)
+
+    @property
+    def params(self) -> Tuple[int, ...]:
+        return self.static.params
+
+    @property
+    def mark(self) -> str:
+        return self.static.mark
+
+    @property
+    def name(self) -> str:
+        return self.static.name
+
+    @property
+    def solar(self) -> str:
+        """公历时间 (ISO格式)"""
+        return _decode_solar(self.solar_us, self.solar_offset).isoformat()
+
+    def to_result(self) -> HexagramResult:
+        """展开为完整的 HexagramResult"""
+        from .najia import Najia
+
+        return Najia._build_result(
+            list(self.static.params), self.static, self.solar, self.calendar,
+            self.yue_zhi, self.ri_chen, self.guaci
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（与 HexagramResult.to_dict() 一致）"""
+        static = self.static
+        result = {
+            'params': list(static.params),
+            'mark': static.mark,
+            'name': static.name,
+            'gong': static.gong,
+            'shiy': static.shiy,
+            'qin6': list(static.qin6),
+            'qinx': list(static.qinx),
+            'god6': get_god6(self.calendar.day),
+            'dong': list(static.dong),
+            'solar': self.solar,
+            'lunar': self.calendar.to_lunar_dict(),
+            'hexagram_type': static.hexagram_type,
+        }
+
+        if static.bian is not None:
+            result['bian'] = static.new_bian().to_dict()
+
+        if static.hide is not None:
+            result['hide'] = static.new_hide().to_dict()
+
+        if self.guaci:
+            guaci = get_guaci(static.name)
+            if guaci is not None:
+                result['guaci'] = guaci
+
+        # 时间维度断卦属性
+        yue_ling, yue_po, xun_kong, liu_shen = time_block(static.mark, self.yue_zhi, self.ri_chen)
+        if yue_ling is not None:
+            result['yue_ling'] = yue_ling
+        if yue_po is not None:
+            result['yue_po'] = yue_po
+        if xun_kong is not None:
+            result['xun_kong'] = xun_kong
+        if liu_shen is not None:
+            result['liu_shen'] = liu_shen
+        if self.yue_zhi is not None:
+            result['yue_zhi'] = self.yue_zhi
+        if self.ri_chen is not None:
+            result['ri_chen'] = self.ri_chen
+
+        return result
+
+    def to_json(self) -> str:
+        """紧凑 JSON 字符串（拼接缓存的静态片段，与 serialize.dumps(self.to_dict()) 一致）"""
+        from .serialize import compact_result_json
+        return compact_result_json(self)
+
+    def render(self, verbose: int = 0, template: str = 'standard') -> str:
+        """渲染卦象为字符串"""
+        from .najia import Najia
+
+        najia = Najia(verbose)
+        najia.result = self.to_result()
+        return najia.render(template)
+
+    def __reduce__(self):
+        key = self.static.key if self.static.key is not None else self.static.params
+        return _restore, (key, self.solar_us, self.solar_offset, self.calendar, self.yue_zhi, self.ri_chen, self.guaci)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, CompactHexagramResult):
+            return NotImplemented
+
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        return f'CompactHexagramResult(name={self.name!r}, params={self.params!r}, solar={self.solar!r})'
@@ -5,9 +5,19 @@
 
 import json
 import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterator, Optional, Tuple
+from dataclasses import dataclass, asdict, fields, replace
+
+from .log import setup_logger
+
+logger = setup_logger(__name__)
+
+# 当前上下文（线程 / asyncio 任务）的临时配置覆盖
+_overrides: ContextVar[Optional[Dict[str, Any]]] = ContextVar('najia_config_overrides', default=None)
 
 
 @dataclass
@@ -69,7 +79,9 @@ class ConfigManager:
         """
         self.config_dir = Path(config_dir or self._get_default_config_dir())
         self.config_file = Path(config_file or self.config_dir / "najia_config.json")
-        self._ensure_config_dir()
+        self._lock = threading.Lock()
+        # 内存快照：(文件标识, 配置)，文件标识为 (st_ino, st_mtime_ns, st_size)，文件不存在时为 None
+        self._snapshot: Optional[Tuple[Optional[Tuple[int, int, int]], UserConfig]] = None
 
     @staticmethod
     def _get_default_config_dir() -> Path:
@@ -83,27 +95,61 @@ class ConfigManager:
         return base_dir / 'najia'
 
     def _ensure_config_dir(self) -> None:
-        """确保配置目录存在"""
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+        """确保配置目录存在（写入配置前调用）"""
+        self.config_file.parent.mkdir(parents=True, exist_ok=True)
+
+    def _file_key(self) -> Optional[Tuple[int, int, int]]:
+        """配置文件标识，inode、修改时间或大小变化即视为文件已变更"""
+        try:
+            st = os.stat(self.config_file)
+        except OSError:
+            return None
+
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _read(self) -> UserConfig:
+        """读取并解析配置文件，文件不存在或格式错误时返回默认配置（不写文件）"""
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return UserConfig.from_dict(data)
+        except FileNotFoundError:
+            return UserConfig()
+        except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"配置文件格式错误，使用默认配置: {e}")
+            return UserConfig()
+
+    def snapshot(self) -> UserConfig:
+        """
+        当前配置的内存快照（共享实例，请勿修改）
+        只在配置文件的 inode / 修改时间 / 大小变化时重新读取，每次调用仅一次 stat
+        """
+        key = self._file_key()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot[0] == key:
+            return snapshot[1]
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot[0] != key:
+                snapshot = (key, self._read())
+                self._snapshot = snapshot
+
+        return snapshot[1]
+
+    def reload(self) -> UserConfig:
+        """丢弃快照，强制重新读取配置文件"""
+        with self._lock:
+            self._snapshot = None
+
+        return self.load_config()
 
     def load_config(self) -> UserConfig:
         """
-        加载配置文件
-        :return: 用户配置实例
+        加载配置（使用内存快照）
+        :return: 用户配置实例（副本，可修改）
         """
-        if self.config_file.exists():
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                return UserConfig.from_dict(data)
-            except (json.JSONDecodeError, KeyError) as e:
-                print(f"警告: 配置文件格式错误，使用默认配置: {e}")
-                return UserConfig()
-        else:
-            # 创建默认配置
-            default_config = UserConfig()
-            self.save_config(default_config)
-            return default_config
+        return replace(self.snapshot())
 
     def save_config(self, config: UserConfig) -> None:
         """
@@ -111,8 +157,11 @@ class ConfigManager:
         :param config: 用户配置实例
         """
         try:
+            self._ensure_config_dir()
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 f.write(config.to_json())
+            with self._lock:
+                self._snapshot = None
             print(f"配置已保存到: {self.config_file}")
         except Exception as e:
             print(f"保存配置文件失败: {e}")
@@ -139,25 +188,61 @@ class ConfigManager:
         return default_config
 
 
-# 全局配置管理器实例
-_default_config_manager = ConfigManager()
+# 全局配置管理器实例（首次使用时创建，导入本模块不访问文件系统）
+_default_config_manager: Optional[ConfigManager] = None
 
 
 def get_config_manager() -> ConfigManager:
     """获取全局配置管理器实例"""
+    global _default_config_manager
+
+    if _default_config_manager is None:
+        _default_config_manager = ConfigManager()
+
     return _default_config_manager
 
 
 def get_config() -> UserConfig:
-    """获取全局配置实例"""
-    return _default_config_manager.load_config()
+    """
+    获取全局配置实例（内存快照叠加当前上下文的临时覆盖，不读写文件）
+    :return: 用户配置实例（副本，可修改）
+    """
+    config = get_config_manager().snapshot()
+    overrides = _overrides.get()
+
+    return replace(config, **overrides) if overrides else replace(config)
+
+
+def reload_config() -> UserConfig:
+    """强制重新读取全局配置文件"""
+    return get_config_manager().reload()
+
+
+@contextmanager
+def override_config(**kwargs) -> Iterator[UserConfig]:
+    """
+    临时覆盖配置项，仅对当前线程 / asyncio 任务内的 get_config() 生效，不写文件；可嵌套
+    :param kwargs: 要覆盖的配置项，取值按 UserConfig.from_dict 的规则校验
+    :return: 覆盖后的配置
+    """
+    names = {f.name for f in fields(UserConfig)}
+    unknown = set(kwargs) - names
+    if unknown:
+        raise ValueError(f"unknown config option(s): {', '.join(sorted(unknown))}")
+
+    checked = UserConfig.from_dict(dict(kwargs))
+    token = _overrides.set({**(_overrides.get() or {}), **{k: getattr(checked, k) for k in kwargs}})
+    try:
+        yield get_config()
+    finally:
+        _overrides.reset(token)
 
 
 def update_config(**kwargs) -> UserConfig:
     """更新全局配置"""
-    return _default_config_manager.update_config(**kwargs)
+    return get_config_manager().update_config(**kwargs)
 
 
 def reset_config() -> UserConfig:
     """重置全局配置"""
-    return _default_config_manager.reset_config()
\ No newline at end of file
+    return get_config_manager().reset_config()
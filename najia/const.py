@@ -1,3 +1,4 @@
+import threading
 from typing import Tuple, Dict, List
 
 # 十神
@@ -114,33 +115,64 @@ QIN6_MATRIX: List[List[str]] = [
     ["子孙", "妻财", "官鬼", "父母", "兄弟"],  # 水
 ]
 
-# 预计算所有64卦象的世应爻
-# 结构: {卦符: (世爻, 应爻, 卦宫位置)}
-SHIYING_PRECOMPUTED = {}
+# 预计算表（首次访问时生成，见 __getattr__）：
+# SHIYING_PRECOMPUTED 结构: {卦符: (世爻, 应爻, 卦宫位置)}
+# NAJIA_PRECOMPUTED 结构: {卦符: [6个干支]}
+_PRECOMPUTED_NAMES = ('SHIYING_PRECOMPUTED', 'NAJIA_PRECOMPUTED')
+_building = False
+_build_lock = threading.RLock()
 
-# 首先导入set_shi_yao函数，用于预计算
-from .utils import set_shi_yao
 
-for symbol in GUA64.keys():
-    SHIYING_PRECOMPUTED[symbol] = set_shi_yao(symbol)
+def _build_shiying() -> Dict[str, Tuple[int, int, int]]:
+    """预计算所有64卦象的世应爻"""
+    global _building
 
-# 预计算所有64卦象的纳甲干支
-# 结构: {卦符: [6个干支]}
-NAJIA_PRECOMPUTED = {}
+    # utils 依赖本模块，这里延迟导入；生成期间 set_shi_yao 走原始推算逻辑
+    from .utils import set_shi_yao
 
-for symbol, name in GUA64.items():
-    wai = symbol[3:]  # 外卦
-    nei = symbol[:3]  # 内卦
-    wai_idx, nei_idx = YAOS_DICT[wai], YAOS_DICT[nei]
+    _building = True
+    try:
+        return {symbol: set_shi_yao(symbol) for symbol in GUA64}
+    finally:
+        _building = False
 
-    # 内卦
-    gan_nei = NAJIA[nei_idx][0][0]
-    zhi_nei = NAJIA[nei_idx][0][1:]
-    najia_nei = [f'{gan_nei}{zhi}' for zhi in zhi_nei]
 
-    # 外卦
-    gan_wai = NAJIA[wai_idx][1][0]
-    zhi_wai = NAJIA[wai_idx][1][1:]
-    najia_wai = [f'{gan_wai}{zhi}' for zhi in zhi_wai]
+def _build_najia() -> Dict[str, List[str]]:
+    """预计算所有64卦象的纳甲干支"""
+    result = {}
 
-    NAJIA_PRECOMPUTED[symbol] = najia_nei + najia_wai
+    for symbol in GUA64:
+        wai = symbol[3:]  # 外卦
+        nei = symbol[:3]  # 内卦
+        wai_idx, nei_idx = YAOS_DICT[wai], YAOS_DICT[nei]
+
+        # 内卦
+        gan_nei = NAJIA[nei_idx][0][0]
+        zhi_nei = NAJIA[nei_idx][0][1:]
+        najia_nei = [f'{gan_nei}{zhi}' for zhi in zhi_nei]
+
+        # 外卦
+        gan_wai = NAJIA[wai_idx][1][0]
+        zhi_wai = NAJIA[wai_idx][1][1:]
+        najia_wai = [f'{gan_wai}{zhi}' for zhi in zhi_wai]
+
+        result[symbol] = najia_nei + najia_wai
+
+    return result
+
+
+def __getattr__(name: str):
+    """PEP 562：导入本模块不做任何计算，预计算表在首次访问时生成"""
+    if name not in _PRECOMPUTED_NAMES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    with _build_lock:
+        if name in globals():
+            return globals()[name]
+        if _building:
+            # 生成世应表期间（同一线程内）的访问
+            raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+        table = _build_shiying() if name == 'SHIYING_PRECOMPUTED' else _build_najia()
+        globals()[name] = table
+        return table
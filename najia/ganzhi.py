@@ -0,0 +1,160 @@
+"""
+纯算术干支引擎
+
+日柱、时柱只是儒略日数上的模运算；年柱、月柱只需要节令（十二节）的交接时刻。
+节令时刻预先由 lunar_python 计算并随包附带（data/jieqi.json），运行时只做
+二分查找与取模，不再依赖 lunar_python。所有函数返回六十甲子序号（0=甲子）。
+"""
+import json
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from .const import GANS, ZHIS
+
+# 十二节（每个月建的起点），与表中每年 12 个时刻的顺序一致
+JIE_NAMES: Tuple[str, ...] = ('小寒', '立春', '惊蛰', '清明', '立夏', '芒种',
+                              '小暑', '立秋', '白露', '寒露', '立冬', '大雪')
+
+# 表中时刻的起算点（北京时间，秒）
+_EPOCH = datetime(1900, 1, 1)
+_EPOCH_ORDINAL = _EPOCH.toordinal()
+
+# date.toordinal() 与儒略日数（JDN）之差
+_JDN_OFFSET = 1721425
+
+# 支持的公历日期范围（闭区间）
+MIN_DATE = date(1900, 1, 1)
+MAX_DATE = date(2100, 12, 31)
+
+
+class _JieTable(object):
+    """节令时刻表（首次使用时从 data/jieqi.json 加载）"""
+
+    def __init__(self, start_year: int, seconds: List[int]):
+        self.start_year = start_year
+        self.seconds = seconds
+        self.days = [s // 86400 for s in seconds]
+
+    def li_chun(self, year: int) -> int:
+        """某年立春时刻"""
+        return self.seconds[(year - self.start_year) * 12 + 1]
+
+
+_TABLE: Optional[_JieTable] = None
+
+
+def _table() -> _JieTable:
+    global _TABLE
+
+    if _TABLE is None:
+        path = Path(__file__).parent / 'data' / 'jieqi.json'
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        _TABLE = _JieTable(data['start_year'], data['jie'])
+
+    return _TABLE
+
+
+def build_jie_table(start_year: int, end_year: int) -> List[int]:
+    """
+    用 lunar_python 计算 [start_year, end_year] 每年十二节的交接时刻，
+    用于重新生成 data/jieqi.json。
+    :return: 自 1900-01-01 00:00:00 起的秒数列表
+    """
+    from lunar_python import LunarYear, Solar
+
+    result = []
+    for year in range(start_year, end_year + 1):
+        julian_days = LunarYear.fromYear(year).getJieQiJulianDays()
+        # 下标 2,4,...,24 依次为当年 小寒 ... 大雪
+        for jd in julian_days[2:25:2]:
+            s = Solar.fromJulianDay(jd)
+            t = datetime(s.getYear(), s.getMonth(), s.getDay(), s.getHour(), s.getMinute(), s.getSecond())
+            result.append(int((t - _EPOCH).total_seconds()))
+
+    return result
+
+
+def ganzhi(index: int) -> str:
+    """六十甲子序号转干支字符串"""
+    return GANS[index % 10] + ZHIS[index % 12]
+
+
+def ganzhi_index(gan: int, zhi: int) -> int:
+    """天干、地支序号（奇偶相同）转六十甲子序号"""
+    return (6 * gan - 5 * zhi) % 60
+
+
+def in_range(year: int, month: int, day: int) -> bool:
+    """日期是否在节令表覆盖范围内"""
+    return MIN_DATE <= date(year, month, day) <= MAX_DATE
+
+
+def day_index(year: int, month: int, day: int) -> int:
+    """日柱序号（按公历日，不区分早晚子时）"""
+    jdn = date(year, month, day).toordinal() + _JDN_OFFSET
+    return (jdn - 11) % 60
+
+
+def hour_index(day_idx: int, hour: int) -> int:
+    """
+    时柱序号，23 点起按次日日干起时干（五鼠遁）
+    :param day_idx: 当日日柱序号
+    :param hour: 小时（0~23）
+    """
+    zhi = ((hour + 1) // 2) % 12
+    gan = (day_idx + (1 if hour == 23 else 0)) % 10
+    return ganzhi_index((gan % 5 * 2 + zhi) % 10, zhi)
+
+
+def xun_kong(day_idx: int) -> str:
+    """日柱所在旬的旬空地支"""
+    first = (10 - day_idx // 10 * 2) % 12
+    return ZHIS[first] + ZHIS[first + 1]
+
+
+def month_zhi_index(year: int, month: int, day: int) -> int:
+    """
+    月建地支序号（以节令当日为界，与 lunar_python getMonthZhi 一致）
+    """
+    table = _table()
+    ordinal = date(year, month, day).toordinal() - _EPOCH_ORDINAL
+    k = bisect_right(table.days, ordinal) - 1
+    if k < 0:
+        raise ValueError(f'date out of range: {year}-{month}-{day}')
+
+    return (1 + k) % 12
+
+
+def pillars(year: int, month: int, day: int, hour: int = 0) -> Tuple[int, int, int, int]:
+    """
+    四柱序号（年、月柱以立春/节令交接时刻为准，分秒按 0 计）
+    :return: (年柱, 月柱, 日柱, 时柱) 六十甲子序号
+    """
+    if not in_range(year, month, day):
+        raise ValueError(f'date out of range: {year}-{month}-{day}')
+
+    table = _table()
+    ordinal = date(year, month, day).toordinal() - _EPOCH_ORDINAL
+    t = ordinal * 86400 + hour * 3600
+
+    # 年柱：立春交接前属上一年
+    y = year if t >= table.li_chun(year) else year - 1
+    year_idx = (y - 4) % 60
+
+    # 月柱：表首为 start_year 小寒（乙丑月起算，逐节递增）
+    k = bisect_right(table.seconds, t) - 1
+    month_idx = (_month_base(table.start_year) + k) % 60
+
+    day_idx = day_index(year, month, day)
+    return year_idx, month_idx, day_idx, hour_index(day_idx, hour)
+
+
+def _month_base(start_year: int) -> int:
+    """start_year 小寒所起丑月的月柱序号（五虎遁，属上一干支年）"""
+    year_gan = (start_year - 1 - 4) % 10
+    first_gan = (year_gan % 5 * 2 + 2) % 10   # 寅月天干
+    gan = (first_gan + 11) % 10               # 丑月为第 12 个月
+    return ganzhi_index(gan, 1)
@@ -0,0 +1,230 @@
+"""
+卦辞存储
+
+guaci.json 约 60 KB，原先每次查询都整体 json.load。这里改为：
+- 读取随包附带的偏移索引 data/guaci.idx.json（卦名 -> 值在 guaci.json 中的字节偏移、长度），
+  索引缺失或与数据文件的大小、SHA-256 摘要不符时扫描一遍数据文件在内存中重建
+  （摘要而非修改时间：安装后文件时间会变，同样大小的修改也能发现）；
+- 数据文件以只读 mmap 打开，按需切片解码单个条目；
+- 解码结果放入有界 LRU 缓存。
+
+mmap 只读、按偏移切片，不依赖文件读写位置，可在线程间共享；fork 后子进程按 pid
+重新打开映射，锁在 fork 时重建。
+"""
+import hashlib
+import json
+import mmap
+import os
+import threading
+import weakref
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+# 默认数据文件
+DEFAULT_GUACI_PATH = Path(__file__).parent / 'data' / 'guaci.json'
+
+# 默认索引文件
+DEFAULT_INDEX_PATH = Path(__file__).parent / 'data' / 'guaci.idx.json'
+
+# 解码缓存条目数
+GUACI_CACHE_SIZE = 64
+
+_WHITESPACE = ' \t\r\n'
+
+
+def build_index(path: Union[str, Path] = DEFAULT_GUACI_PATH) -> Dict[str, Tuple[int, int]]:
+    """
+    扫描卦辞数据文件，生成 卦名 -> (字节偏移, 字节长度) 索引
+    :param path: guaci.json 路径
+    :return: 索引字典
+    """
+    text = Path(path).read_bytes().decode('utf-8')
+    decoder = json.JSONDecoder()
+    index = {}
+
+    def skip(pos: int) -> int:
+        while pos < len(text) and text[pos] in _WHITESPACE:
+            pos += 1
+        return pos
+
+    pos = skip(0)
+    if text[pos] != '{':
+        raise ValueError(f'{path}: expected a JSON object')
+    pos = skip(pos + 1)
+
+    # 字符位置 -> 字节偏移（增量累计，避免重复编码前缀）
+    char_pos, byte_pos = 0, 0
+
+    def byte_offset(i: int) -> int:
+        nonlocal char_pos, byte_pos
+        byte_pos += len(text[char_pos:i].encode('utf-8'))
+        char_pos = i
+        return byte_pos
+
+    while text[pos] != '}':
+        name, pos = decoder.raw_decode(text, pos)
+        pos = skip(pos)
+        if text[pos] != ':':
+            raise ValueError(f'{path}: expected ":" at {pos}')
+
+        start = skip(pos + 1)
+        _, end = decoder.raw_decode(text, start)
+        offset = byte_offset(start)
+        index[name] = (offset, byte_offset(end) - offset)
+
+        pos = skip(end)
+        if text[pos] == ',':
+            pos = skip(pos + 1)
+
+    return index
+
+
+def _digest(data) -> str:
+    """数据文件内容的 SHA-256 摘要"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def write_index(path: Union[str, Path] = DEFAULT_GUACI_PATH,
+                index_path: Union[str, Path] = DEFAULT_INDEX_PATH) -> None:
+    """重新生成索引文件（修改 guaci.json 后执行）"""
+    content = Path(path).read_bytes()
+    data = {
+        'size': len(content),
+        'sha256': _digest(content),
+        'entries': {name: list(span) for name, span in build_index(path).items()},
+    }
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        f.write('\n')
+
+
+class GuaciStore(object):
+    """按需读取的卦辞存储"""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_GUACI_PATH,
+                 index_path: Optional[Union[str, Path]] = DEFAULT_INDEX_PATH,
+                 cache_size: int = GUACI_CACHE_SIZE):
+        """
+        :param path: 卦辞数据文件（JSON 对象，卦名 -> 卦辞）
+        :param index_path: 预生成的偏移索引，None 表示总是扫描数据文件
+        :param cache_size: 解码结果缓存条目数
+        """
+        self.path = Path(path)
+        self.index_path = Path(index_path) if index_path is not None else None
+        self._lock = threading.Lock()
+        self._pid = None
+        self._file = None
+        self._map = None
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+        self._get = lru_cache(maxsize=cache_size)(self._load)
+        _stores.add(self)
+
+    def _load_index(self, size: int) -> Dict[str, Tuple[int, int]]:
+        if self.index_path is not None and self.index_path.exists():
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('size') == size and data.get('sha256') == _digest(self._map):
+                return {name: tuple(span) for name, span in data['entries'].items()}
+
+        return build_index(self.path)
+
+    def _open(self) -> None:
+        """打开（或在 fork 后重新打开）映射，调用方持有锁"""
+        self._close()
+
+        f = open(self.path, 'rb')
+        size = os.fstat(f.fileno()).st_size
+        try:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        except (OSError, ValueError):
+            self._map = f.read()
+        self._file = f
+
+        if self._index is None:
+            self._index = self._load_index(size)
+        self._pid = os.getpid()
+
+    def _ensure_open(self) -> None:
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._open()
+
+    def _load(self, name: str) -> Optional[str]:
+        # 切片在锁内进行，与 close 互斥；解码在锁外
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+            span = self._index.get(name)
+            if span is None:
+                return None
+
+            offset, length = span
+            data = self._map[offset:offset + length]
+
+        return json.loads(data.decode('utf-8'))
+
+    def get(self, name: str) -> Optional[str]:
+        """
+        查询卦辞
+        :param name: 卦名，如 '乾为天'
+        :return: 卦辞文本，不存在时返回 None
+        """
+        return self._get(name)
+
+    def names(self) -> List[str]:
+        """已收录的卦名"""
+        self._ensure_open()
+        return list(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        self._ensure_open()
+        return name in self._index
+
+    def cache_info(self):
+        """解码缓存统计"""
+        return self._get.cache_info()
+
+    def close(self) -> None:
+        """关闭映射（之后的查询会重新打开）"""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        """关闭映射，调用方持有锁"""
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        if self._file is not None:
+            self._file.close()
+        self._map = self._file = self._pid = None
+        self._get.cache_clear()
+
+
+_stores: 'weakref.WeakSet[GuaciStore]' = weakref.WeakSet()
+_default_store: Optional[GuaciStore] = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> GuaciStore:
+    """获取进程级默认卦辞存储"""
+    global _default_store
+
+    if _default_store is None:
+        with _default_lock:
+            if _default_store is None:
+                _default_store = GuaciStore()
+
+    return _default_store
+
+
+def _reset_after_fork() -> None:
+    """fork 时其他线程持有的锁在子进程中不会被释放，全部换新"""
+    global _default_lock
+    _default_lock = threading.Lock()
+    for store in list(_stores):
+        store._lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,252 @@
+"""
+静态卦象表
+
+六个爻位参数各取 1~4，共 4^6 = 4096 种组合。卦码、世应、卦宫、纳甲、六亲、
+卦型、伏神与变卦都只由参数决定，与起卦时间无关，因此一次性预计算成表，
+Najia.compile 只需查表再补上时间相关的部分。
+"""
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from . import const
+from .result import HiddenHexagram, TransformedHexagram
+from .utils import GZ5X
+from .utils import get_najia
+from .utils import get_qin6
+from .utils import get_type
+from .utils import palace
+from .utils import set_shi_yao
+
+# 参数组合总数（每爻 2 bit，共 12 bit）
+TABLE_SIZE = 4 ** 6
+
+
+@dataclass(frozen=True)
+class StaticHexagram:
+    """与时间无关的卦象数据（全部为不可变类型，可在多个结果间共享）"""
+    key: Optional[int]               # 打包后的参数编码，非 1~4 参数为 None
+    params: Tuple[int, ...]          # 爻位参数
+    mark: str                        # 卦符
+    name: str                        # 卦名
+    shiy: Tuple[int, int, int]       # (世爻, 应爻, 索引)
+    gong_idx: int                    # 卦宫索引
+    najia: Tuple[str, ...]           # 纳甲干支
+    qin6: Tuple[str, ...]            # 六亲
+    qinx: Tuple[str, ...]            # 纳甲五行
+    dong: Tuple[int, ...]            # 动爻位置
+    hexagram_type: str               # 卦象类型
+    hide: Optional[HiddenHexagram]   # 伏神（原型，勿直接修改）
+    bian: Optional[TransformedHexagram]  # 变卦（原型，勿直接修改）
+
+    @property
+    def gong(self) -> str:
+        """卦宫名"""
+        return const.GUAS[self.gong_idx]
+
+    def new_hide(self) -> Optional[HiddenHexagram]:
+        """返回伏神的独立副本"""
+        if self.hide is None:
+            return None
+
+        return HiddenHexagram(
+            name=self.hide.name,
+            mark=self.hide.mark,
+            qin6=list(self.hide.qin6),
+            qinx=list(self.hide.qinx),
+            seat=list(self.hide.seat)
+        )
+
+    def new_bian(self) -> Optional[TransformedHexagram]:
+        """返回变卦的独立副本"""
+        if self.bian is None:
+            return None
+
+        return TransformedHexagram(
+            name=self.bian.name,
+            mark=self.bian.mark,
+            qin6=list(self.bian.qin6),
+            qinx=list(self.bian.qinx),
+            gong=self.bian.gong,
+            hexagram_type=self.bian.hexagram_type
+        )
+
+
+def pack_params(params: Sequence[int]) -> Optional[int]:
+    """
+    将 6 个爻位参数打包为 0~4095 的整数，每爻 2 bit，初爻在最低位
+    :param params: 爻位参数列表
+    :return: 打包编码，参数不是 6 个 1~4 的整数时返回 None
+    """
+    if len(params) != 6:
+        return None
+
+    key = 0
+    for i, p in enumerate(params):
+        if p not in (1, 2, 3, 4):
+            return None
+        key |= (int(p) - 1) << (2 * i)
+
+    return key
+
+
+def unpack_params(key: int) -> Tuple[int, ...]:
+    """
+    pack_params 的逆运算
+    :param key: 打包编码
+    :return: 爻位参数元组
+    """
+    if not 0 <= key < TABLE_SIZE:
+        raise ValueError(f'params key out of range: {key}')
+
+    return tuple(((key >> (2 * i)) & 0b11) + 1 for i in range(6))
+
+
+def _palace_qin6(gong_idx: int, mark: str) -> Tuple[List[str], List[str]]:
+    """按卦宫五行计算某卦的六亲与纳甲五行"""
+    palace_element_idx = const.XING5_DICT[const.XING5[int(const.GUA5[gong_idx])]]
+    najia_list = get_najia(mark)
+    qin6 = [(get_qin6(palace_element_idx, const.ZHI5[const.ZHIS_DICT[x[1]]])) for x in najia_list]
+    qinx = [GZ5X(x) for x in najia_list]
+
+    return qin6, qinx
+
+
+def hidden(gong_idx: int, qins: List[str]) -> Optional[HiddenHexagram]:
+    """
+    计算伏神卦
+    :param gong_idx: 卦宫索引
+    :param qins: 六亲列表
+    :return: 伏神卦信息或None
+    """
+    if gong_idx is None:
+        raise ValueError('gong_idx parameter is required for calculating hidden hexagram')
+
+    if qins is None:
+        raise ValueError('qins parameter is required for calculating hidden hexagram')
+
+    if len(set(qins)) < 5:
+        mark = const.YAOS[gong_idx] * 2
+        qin6, qinx = _palace_qin6(gong_idx, mark)
+        seat = [qin6.index(x) for x in list(set(qin6).difference(set(qins)))]
+
+        return HiddenHexagram(
+            name=const.GUA64.get(mark),
+            mark=mark,
+            qin6=qin6,
+            qinx=qinx,
+            seat=seat
+        )
+
+    return None
+
+
+def transform(params: List[int], gong_idx: int) -> Optional[TransformedHexagram]:
+    """
+    计算变卦
+    :param params: 爻位参数列表
+    :param gong_idx: 卦宫索引
+    :return: 变卦信息或None
+    """
+    if params is None:
+        raise ValueError('params parameter is required for calculating transformed hexagram')
+
+    if isinstance(params, str):
+        params = [x for x in params]
+
+    if len(params) < 6:
+        raise ValueError('params must have at least 6 elements')
+
+    if 3 in params or 4 in params:
+        mark = ''.join(['1' if v in [1, 4] else '0' for v in params])
+        qin6, qinx = _palace_qin6(gong_idx, mark)
+
+        return TransformedHexagram(
+            name=const.GUA64.get(mark),
+            mark=mark,
+            qin6=qin6,
+            qinx=qinx,
+            gong=const.GUAS[gong_idx],  # Use original palace for correct six relatives calculation
+            hexagram_type=get_type(mark)
+        )
+
+    return None
+
+
+def derive(params: Sequence[int]) -> StaticHexagram:
+    """
+    从参数直接推导静态卦象数据（不查表）
+    :param params: 爻位参数列表
+    :return: 静态卦象数据
+    """
+    # 卦码
+    mark = ''.join([str(int(p) % 2) for p in params])
+
+    # 世应爻、卦宫
+    shiy = set_shi_yao(mark)
+    gong_idx = palace(mark, shiy[0])
+
+    # 纳甲与六亲
+    najia_list = get_najia(mark)
+    qin6, qinx = _palace_qin6(gong_idx, mark)
+
+    hide = hidden(gong_idx, qin6)
+    bian = transform(params=list(params), gong_idx=gong_idx)
+
+    return StaticHexagram(
+        key=pack_params(params),
+        params=tuple(params),
+        mark=mark,
+        name=const.GUA64[mark],
+        shiy=shiy,
+        gong_idx=gong_idx,
+        najia=tuple(najia_list),
+        qin6=tuple(qin6),
+        qinx=tuple(qinx),
+        dong=tuple(i for i, x in enumerate(params) if x > 2),
+        hexagram_type=get_type(mark),
+        hide=hide,
+        bian=bian
+    )
+
+
+_TABLE: Optional[List[StaticHexagram]] = None
+_TABLE_BY_PARAMS: Dict[Tuple[int, ...], StaticHexagram] = {}
+_TABLE_LOCK = threading.Lock()
+
+
+def get_table() -> List[StaticHexagram]:
+    """
+    获取（首次调用时构建）4096 项静态卦象表，下标为 pack_params 编码
+    :return: 静态卦象表
+    """
+    global _TABLE
+
+    if _TABLE is None:
+        with _TABLE_LOCK:
+            if _TABLE is None:
+                table = [derive(unpack_params(key)) for key in range(TABLE_SIZE)]
+                _TABLE_BY_PARAMS.update((entry.params, entry) for entry in table)
+                _TABLE = table
+
+    return _TABLE
+
+
+def get_static(params: Sequence[int]) -> StaticHexagram:
+    """
+    查询静态卦象数据，非标准参数（如 7/8/9）回退到直接推导
+    :param params: 爻位参数列表
+    :return: 静态卦象数据
+    """
+    if _TABLE is None:
+        get_table()
+
+    try:
+        entry = _TABLE_BY_PARAMS.get(tuple(params))
+    except TypeError:
+        entry = None
+
+    if entry is not None:
+        return entry
+
+    return derive(params)
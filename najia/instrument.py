@@ -0,0 +1,230 @@
+"""
+分阶段计时
+
+默认关闭。开启后 Najia.compile / render 记录各阶段耗时并汇总为直方图：
+- parse：日期解析（arrow.get / arrow.now）
+- calendar：四柱、旬空、月建日辰（即原 _daily 与 date_to_yue_ri_chen 的工作，按小时缓存）
+- static：静态卦象查表（卦码、世应、纳甲、六亲、伏神、变卦）
+- time_analysis：月令旺衰、月破、旬空、六神
+- guaci：卦辞查询（guaci=True 时）
+- build：组装 HexagramResult（含伏神、变卦副本）
+- compile：compile 总耗时
+- render：模板渲染
+
+关闭时每个阶段点只有一次 None 判断，开销可忽略。
+
+    from najia import instrument
+
+    with instrument.instrumented() as registry:
+        Najia().compile(params, date=...)
+    print(registry.to_json())
+    print(registry.to_prometheus())
+
+也可注册回调逐条接收 (阶段名, 秒数)，如转发到已有的监控系统：instrument.add_callback(fn)。
+"""
+import json
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# 直方图桶上界（秒）
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0,
+)
+
+Callback = Callable[[str, float], None]
+
+
+class Histogram(object):
+    """累积直方图（线程安全）"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)   # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.count += 1
+            self.sum += value
+            if value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """按桶估算分位数（取所在桶的上界）"""
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets + (self.max,), self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max)
+
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'min': self.min if self.count else 0.0,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p99': self.quantile(0.99),
+            'buckets': {str(bound): n for bound, n in zip(self.buckets + ('+Inf',), self._cumulative())},
+        }
+
+    def _cumulative(self) -> List[int]:
+        out, total = [], 0
+        for n in self.counts:
+            total += n
+            out.append(total)
+        return out
+
+
+class Registry(object):
+    """按阶段汇总的直方图集合"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        histogram = self._histograms.get(stage)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(stage, Histogram(self.buckets))
+        histogram.observe(seconds)
+
+    def stages(self) -> List[str]:
+        return list(self._histograms)
+
+    def histogram(self, stage: str) -> Optional[Histogram]:
+        return self._histograms.get(stage)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms = {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """阶段名 -> 统计信息（秒）"""
+        return {stage: h.to_dict() for stage, h in list(self._histograms.items())}
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, **kwargs)
+
+    def to_prometheus(self, name: str = 'najia_stage_duration_seconds') -> str:
+        """Prometheus 文本格式（histogram 类型，阶段名作为 stage 标签）"""
+        lines = [
+            f'# HELP {name} Duration of najia compile/render stages in seconds.',
+            f'# TYPE {name} histogram',
+        ]
+        for stage, h in list(self._histograms.items()):
+            for bound, n in zip(h.buckets + ('+Inf',), h._cumulative()):
+                le = bound if isinstance(bound, str) else repr(float(bound))
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {n}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {h.sum!r}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {h.count}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class Timer(object):
+    """一次调用内的分段计时器：lap(stage) 记录自上一个阶段点以来的耗时"""
+
+    __slots__ = ('start', 'last')
+
+    def __init__(self):
+        self.start = self.last = perf_counter()
+
+    def lap(self, stage: str) -> None:
+        now = perf_counter()
+        _emit(stage, now - self.last)
+        self.last = now
+
+    def total(self, stage: str) -> None:
+        """记录自计时器创建以来的总耗时"""
+        now = perf_counter()
+        _emit(stage, now - self.start)
+        self.last = now
+
+
+_enabled = False
+_registry = Registry()
+_callbacks: List[Callback] = []
+
+
+def _emit(stage: str, seconds: float) -> None:
+    _registry.observe(stage, seconds)
+    for callback in _callbacks:
+        callback(stage, seconds)
+
+
+def timer() -> Optional[Timer]:
+    """开启时返回新的计时器，关闭时返回 None（调用方以 if timer: 跳过计时）"""
+    return Timer() if _enabled else None
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def get_registry() -> Registry:
+    """全局直方图集合"""
+    return _registry
+
+
+def reset() -> None:
+    """清空已记录的数据"""
+    _registry.reset()
+
+
+def add_callback(callback: Callback) -> None:
+    """注册回调，每个阶段结束时以 (阶段名, 秒数) 调用"""
+    _callbacks.append(callback)
+
+
+def remove_callback(callback: Callback) -> None:
+    _callbacks.remove(callback)
+
+
+@contextmanager
+def instrumented(reset_first: bool = True) -> Iterator[Registry]:
+    """
+    在 with 块内开启计时，退出时恢复原状态
+    :param reset_first: 进入时是否清空已有数据
+    :return: 全局直方图集合
+    """
+    previous = _enabled
+    if reset_first:
+        reset()
+    enable()
+    try:
+        yield _registry
+    finally:
+        if not previous:
+            disable()
@@ -1,4 +1,121 @@
-from typing import Tuple
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Tuple
+
+from . import ganzhi
+from .const import ZHIS
+
+# 日历解析缓存容量（按 年-月-日-时 为键，约 170 天的逐时数据）
+CALENDAR_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True)
+class CalendarInfo:
+    """一次解析得到的全部日历信息（不可变，可在缓存中共享）"""
+    year: str       # 年柱（以立春交接时刻为准）
+    month: str      # 月柱（以节令交接时刻为准）
+    day: str        # 日柱
+    hour: str       # 时柱
+    xkong: str      # 日旬空
+    month_zhi: str  # 月建地支（以节令当日为准）
+    day_gz: str     # 日辰干支
+
+    def to_lunar_dict(self) -> Dict[str, Any]:
+        """转换为 HexagramResult.lunar 所用的字典格式（每次返回新字典）"""
+        return {
+            'xkong': self.xkong,
+            'gz': {
+                'month': self.month,
+                'year': self.year,
+                'day': self.day,
+                'hour': self.hour,
+            }
+        }
+
+
+def _resolve_lunar(year: int, month: int, day: int, hour: int) -> CalendarInfo:
+    """lunar_python 参考实现"""
+    from lunar_python import Solar
+
+    lunar = Solar.fromYmdHms(year, month, day, hour, 0, 0).getLunar()
+    ganzi = lunar.getBaZi()
+
+    return CalendarInfo(
+        year=ganzi[0],
+        month=ganzi[1],
+        day=ganzi[2],
+        hour=ganzi[3],
+        xkong=lunar.getDayXunKong(),
+        month_zhi=lunar.getMonthZhi(),
+        day_gz=lunar.getDayInGanZhi(),
+    )
+
+
+def _resolve_ganzhi(year: int, month: int, day: int, hour: int) -> CalendarInfo:
+    """纯算术实现（节令表覆盖范围内）"""
+    year_idx, month_idx, day_idx, hour_idx = ganzhi.pillars(year, month, day, hour)
+    day_gz = ganzhi.ganzhi(day_idx)
+
+    return CalendarInfo(
+        year=ganzhi.ganzhi(year_idx),
+        month=ganzhi.ganzhi(month_idx),
+        day=day_gz,
+        hour=ganzhi.ganzhi(hour_idx),
+        xkong=ganzhi.xun_kong(day_idx),
+        month_zhi=ZHIS[ganzhi.month_zhi_index(year, month, day)],
+        day_gz=day_gz,
+    )
+
+
+# 日历后端：ganzhi（默认，纯算术查表）或 lunar（lunar_python 参考实现）
+CALENDAR_BACKENDS = ('ganzhi', 'lunar')
+_backend = 'ganzhi'
+
+
+def get_calendar_backend() -> str:
+    """当前日历后端名称"""
+    return _backend
+
+
+def set_calendar_backend(name: str) -> None:
+    """
+    切换日历后端，并清空解析缓存
+    :param name: 'ganzhi' 或 'lunar'
+    """
+    global _backend
+
+    if name not in CALENDAR_BACKENDS:
+        raise ValueError(f'unknown calendar backend: {name!r}, expected one of {CALENDAR_BACKENDS}')
+
+    _backend = name
+    resolve_calendar.cache_clear()
+
+
+@lru_cache(maxsize=CALENDAR_CACHE_SIZE)
+def resolve_calendar(year: int, month: int, day: int, hour: int = 0) -> CalendarInfo:
+    """
+    一次性解析公历时刻的年月日时四柱、旬空、月建与日辰，结果按小时缓存。
+    默认使用纯算术后端，超出节令表范围（1900~2100）时回退到 lunar_python。
+    :param year: 公历年
+    :param month: 公历月
+    :param day: 公历日
+    :param hour: 小时（0~23），分秒按 0 计
+    :return: 日历信息
+    """
+    if _backend == 'ganzhi' and ganzhi.in_range(year, month, day):
+        return _resolve_ganzhi(year, month, day, hour)
+
+    return _resolve_lunar(year, month, day, hour)
+
+
+def calendar_cache_info():
+    """日历解析缓存的命中统计（hits, misses, maxsize, currsize）"""
+    return resolve_calendar.cache_info()
+
+
+def calendar_cache_clear() -> None:
+    """清空日历解析缓存"""
+    resolve_calendar.cache_clear()
 
 
 def date_to_yue_ri_chen(date_str: str) -> Tuple[str, str]:
@@ -8,18 +125,12 @@ def date_to_yue_ri_chen(date_str: str) -> Tuple[str, str]:
         date_to_yue_ri_chen("2026-02-13") -> ("寅", "甲子")
         date_to_yue_ri_chen("2026-02-13 10:30") -> ("寅", "甲子")
     """
-    from lunar_python import Solar
-
     date_part = date_str.split(' ')[0]
     parts = date_part.split('-')
     year, month, day = int(parts[0]), int(parts[1]), int(parts[2])
-    solar = Solar.fromYmd(year, month, day)
-    lunar = solar.getLunar()
-
-    yue_zhi = lunar.getMonthZhi()
-    ri_chen = lunar.getDayInGanZhi()
+    info = resolve_calendar(year, month, day)
 
-    return yue_zhi, ri_chen
+    return info.month_zhi, info.day_gz
 
 
 def lunar_month_day_to_yue_ri_chen(lunar_month: str, lunar_day: str) -> Tuple[str, str]:
@@ -1,37 +1,24 @@
-import json
-import logging
-import os
-from dataclasses import dataclass
-from pathlib import Path
-from typing import List, Tuple, Optional, Dict, Any, Sequence
-
-import arrow
-from jinja2 import Template
-
-from .batch import BatchProcessor, BatchResult
+from typing import List, Tuple, Optional, Dict, Any, TYPE_CHECKING
 
 from .const import GANS
-from . import const
-from .const import GUA5
-from .const import GUA64
-from .const import GUAS
 from .const import SYMBOL
-from .const import XING5
-from .const import YAOS
-from .const import ZHI5
 from .const import ZHIS
 from .utils import get_god6
 from .utils import get_guaci
-from .utils import get_najia
-from .utils import get_qin6
 from .utils import get_type
-from .utils import GZ5X
-from .utils import palace
-from .utils import set_shi_yao
 from .result import HexagramResult, HiddenHexagram, TransformedHexagram
+from .hexagram_table import StaticHexagram, get_static, hidden, transform
+from .compact import CompactHexagramResult
 from .log import setup_logger
-from .lunar_utils import date_to_yue_ri_chen
-from .time_analysis import calc_yue_ling, is_yue_po, is_xun_kong, calc_liu_shen
+from .lunar_utils import CalendarInfo, resolve_calendar
+from .time_analysis import time_block
+from . import instrument
+
+# arrow、jinja2 与批处理模块较重，首次使用时才导入
+if TYPE_CHECKING:
+    import arrow
+
+    from .batch import BatchResult
 
 logger = setup_logger(__name__)
 
@@ -67,45 +54,22 @@ class Najia(object):
         return GANS[cal.tg] + ZHIS[cal.dz]
 
     @staticmethod
-    def _daily(date: arrow.Arrow) -> Dict[str, Any]:
+    def _calendar(date: 'arrow.Arrow') -> CalendarInfo:
+        """
+        解析日期的四柱、旬空、月建与日辰（按小时缓存）
+        :param date: Arrow 日期对象
+        :return: 日历信息
+        """
+        return resolve_calendar(date.year, date.month, date.day, date.hour)
+
+    @staticmethod
+    def _daily(date: 'arrow.Arrow') -> Dict[str, Any]:
         """
         计算日期
         :param date: Arrow 日期对象
         :return: 包含农历信息的字典
         """
-        # lunar = sxtwl.Lunar()
-        # daily = lunar.getDayBySolar(date.year, date.month, date.day)
-        # hour = lunar.getShiGz(daily.Lday2.tg, date.hour)
-
-        from lunar_python import Solar
-
-        solar = Solar.fromYmdHms(date.year, date.month, date.day, date.hour, 0, 0)
-        lunar = solar.getLunar()
-
-        ganzi = lunar.getBaZi()
-
-        result = {
-            # 'xkong': xkong(''.join([GANS[daily.Lday2.tg], ZHIS[daily.Lday2.dz]])),
-            'xkong': lunar.getDayXunKong(),
-            # 'month': daily.Lmonth2,
-            # 'year' : daily.Lyear2,
-            # 'day'  : daily.Lday2,
-            # 'hour' : hour,
-            # 'cn'   : {
-            #     'month': self._gz(daily.Lmonth2),
-            #     'year' : self._gz(daily.Lyear2),
-            #     'day'  : self._gz(daily.Lday2),
-            #     'hour' : self._gz(hour),
-            # },
-            'gz': {
-                'month': ganzi[1],
-                'year': ganzi[0],
-                'day': ganzi[2],
-                'hour': ganzi[3],
-            }
-        }
-        # pprint(result)
-        return result
+        return Najia._calendar(date).to_lunar_dict()
 
     @staticmethod
     def _hidden(gong_idx: int, qins: List[str]) -> Optional[HiddenHexagram]:
@@ -115,34 +79,7 @@ class Najia(object):
         :param qins: 六亲列表
         :return: 伏神卦信息或None
         """
-        if gong_idx is None:
-            raise ValueError('gong_idx parameter is required for calculating hidden hexagram')
-
-        if qins is None:
-            raise ValueError('qins parameter is required for calculating hidden hexagram')
-
-        if len(set(qins)) < 5:
-            mark = YAOS[gong_idx] * 2
-
-            logger.debug(mark)
-
-            # 六亲
-            palace_element_idx = const.XING5_DICT[const.XING5[int(const.GUA5[gong_idx])]]
-            qin6 = [(get_qin6(palace_element_idx, const.ZHI5[const.ZHIS_DICT[x[1]]])) for x in get_najia(mark)]
-
-            # 干支五行
-            qinx = [GZ5X(x) for x in get_najia(mark)]
-            seat = [qin6.index(x) for x in list(set(qin6).difference(set(qins)))]
-
-            return HiddenHexagram(
-                name=GUA64.get(mark),
-                mark=mark,
-                qin6=qin6,
-                qinx=qinx,
-                seat=seat
-            )
-
-        return None
+        return hidden(gong_idx, qins)
 
     @staticmethod
     def _transform(params: List[int], gong_idx: int) -> Optional[TransformedHexagram]:
@@ -152,31 +89,96 @@ class Najia(object):
         :param gong_idx: 卦宫索引
         :return: 变卦信息或None
         """
+        return transform(params, gong_idx)
+
+    def _resolve(self, params: Optional[List[int]], date: Optional[str] = None,
+                 yue_zhi: Optional[str] = None, ri_chen: Optional[str] = None,
+                 timer: Optional[instrument.Timer] = None
+                 ) -> Tuple[StaticHexagram, 'arrow.Arrow', CalendarInfo, Optional[str], Optional[str]]:
+        """
+        解析编译所需的全部输入
+        :param timer: 分阶段计时器（见 instrument.py），None 表示不计时
+        :return: (静态卦象, 公历时间, 日历信息, 月建地支, 日辰干支)
+        """
+        import arrow
+
+        solar = arrow.now() if date is None else arrow.get(date)
+        if timer:
+            timer.lap('parse')
+
+        cal = self._calendar(solar)
+        if timer:
+            timer.lap('calendar')
+
+        # 时间参数处理：date > yue_zhi/ri_chen > 默认不处理
+        actual_yue_zhi = yue_zhi
+        actual_ri_chen = ri_chen
+        if date is not None or (yue_zhi is None and ri_chen is None):
+            # 指定日期或未给出月建日辰时，使用同一次日历解析的结果
+            actual_yue_zhi, actual_ri_chen = cal.month_zhi, cal.day_gz
+
         if params is None:
-            raise ValueError('params parameter is required for calculating transformed hexagram')
+            raise ValueError('params parameter is required for compiling hexagram')
+
+        # 静态部分（卦码、世应、卦宫、纳甲、六亲、伏神、变卦）查表获得
+        static = get_static(params)
+        if timer:
+            timer.lap('static')
 
-        if isinstance(params, str):
-            params = [x for x in params]
+        return static, solar, cal, actual_yue_zhi, actual_ri_chen
 
-        if len(params) < 6:
-            raise ValueError('params must have at least 6 elements')
+    @staticmethod
+    def _build_result(params: List[int], static: StaticHexagram, solar: str, cal: CalendarInfo,
+                      yue_zhi: Optional[str], ri_chen: Optional[str], guaci: bool,
+                      timer: Optional[instrument.Timer] = None) -> HexagramResult:
+        """
+        由静态卦象与日历信息组装结果
+        :param params: 爻位参数列表
+        :param static: 静态卦象
+        :param solar: 公历时间 (ISO格式)
+        :param cal: 日历信息
+        :param yue_zhi: 月建地支
+        :param ri_chen: 日辰干支
+        :param guaci: 是否包含卦象文本
+        :param timer: 分阶段计时器，None 表示不计时
+        :return: 排盘结果
+        """
+        # 时间维度断卦属性计算
+        yue_ling_list, yue_po_list, xun_kong_list, liu_shen_list = time_block(static.mark, yue_zhi, ri_chen)
+        if timer:
+            timer.lap('time_analysis')
 
-        if 3 in params or 4 in params:
-            mark = ''.join(['1' if v in [1, 4] else '0' for v in params])
-            palace_element_idx = const.XING5_DICT[const.XING5[int(const.GUA5[gong_idx])]]
-            qin6 = [(get_qin6(palace_element_idx, const.ZHI5[const.ZHIS_DICT[x[1]]])) for x in get_najia(mark)]
-            qinx = [GZ5X(x) for x in get_najia(mark)]
+        guaci_text = get_guaci(static.name) if guaci else None
+        if timer and guaci:
+            timer.lap('guaci')
 
-            return TransformedHexagram(
-                name=GUA64.get(mark),
-                mark=mark,
-                qin6=qin6,
-                qinx=qinx,
-                gong=GUAS[gong_idx],  # Use original palace for correct six relatives calculation
-                hexagram_type=get_type(mark)
-            )
+        result = HexagramResult(
+            params=params,
+            mark=static.mark,
+            name=static.name,
+            gong=static.gong,
+            shiy=static.shiy,
+            qin6=list(static.qin6),
+            qinx=list(static.qinx),
+            god6=get_god6(cal.day),
+            dong=list(static.dong),
+            solar=solar,
+            lunar=cal.to_lunar_dict(),
+            hexagram_type=static.hexagram_type,
+            guaci=guaci_text,
+            bian=static.new_bian(),
+            hide=static.new_hide(),
+            yue_ling=yue_ling_list,
+            yue_po=yue_po_list,
+            xun_kong=xun_kong_list,
+            liu_shen=liu_shen_list,
+            yue_zhi=yue_zhi,
+            ri_chen=ri_chen
+        )
+        if timer:
+            timer.lap('build')
 
-        return None
+        return result
 
     def compile(self, params: Optional[List[int]] = None, gender: Optional[str] = None,
                 date: Optional[str] = None, title: Optional[str] = None, guaci: bool = False,
@@ -192,136 +194,43 @@ class Najia(object):
         :param ri_chen: 日辰干支（如'甲子'），优先级低于date
         :return: Najia实例
         """
-        title = title if title else ''
-        solar = arrow.now() if date is None else arrow.get(date)
-        lunar = self._daily(solar)
-        gender = gender if bool(gender) else ''
-
-        # 时间参数处理：date > yue_zhi/ri_chen > 默认不处理
-        actual_yue_zhi = yue_zhi
-        actual_ri_chen = ri_chen
-        if date is not None:
-            actual_yue_zhi, actual_ri_chen = date_to_yue_ri_chen(date)
-        elif yue_zhi is None and ri_chen is None:
-            # 使用当前日期的农历信息
-            try:
-                actual_yue_zhi = lunar.get('month_zhi') or lunar.get('gz', {}).get('month', ['',''])[0][-1] if hasattr(lunar, 'get') else None
-                actual_ri_chen = lunar.get('gz', {}).get('day', '')
-            except:
-                pass
-
-        if params is None:
-            raise ValueError('params parameter is required for compiling hexagram')
-            
-        # 卦码
-        mark = ''.join([str(int(p) % 2) for p in params])
-
-        # 世应爻
-        shiy = set_shi_yao(mark)  # 获取世应位置
-
-        # 卦宫
-        gong_idx = palace(mark, shiy[0])  # 计算卦宫
-
-        # 卦名
-        name = GUA64[mark]
-
-        # 纳甲干支
-        najia_list = get_najia(mark)
-
-        # 六亲计算
-        # 使用快速字典查找替代 .index() 调用
-        palace_element_idx = const.XING5_DICT[const.XING5[int(const.GUA5[gong_idx])]]
-        qin6 = [(get_qin6(palace_element_idx, const.ZHI5[const.ZHIS_DICT[x[1]]])) for x in najia_list]
-        qinx = [GZ5X(x) for x in najia_list]
-
-        # 六神
-        god6 = get_god6(lunar['gz']['day'])
-
-        # 动爻位置
-        dong = [i for i, x in enumerate(params) if x > 2]
-
-        # 伏神
-        hide = self._hidden(gong_idx, qin6)
-
-        # 变卦
-        bian = self._transform(params=params, gong_idx=gong_idx)
-
-        # 时间维度断卦属性计算
-        yue_ling_list = None
-        yue_po_list = None
-        xun_kong_list = None
-        
-        if actual_yue_zhi is not None or actual_ri_chen is not None:
-            # 提取每个爻的地支（从纳甲干支中获取）
-            yao_dizhi_list = [najia_list[i][1] if len(najia_list[i]) > 1 else '' for i in range(6)]
-            
-            if actual_yue_zhi is not None:
-                # 计算月令旺衰和月破
-                # 使用 ZHIS_DICT 获取地支索引，然后用 ZHI5 获取五行索引
-                yao_wuxing_idx_list = []
-                for d in yao_dizhi_list:
-                    if d and d in const.ZHIS_DICT:
-                        zhi_idx = const.ZHIS_DICT[d]
-                        wuxing_idx = const.ZHI5[zhi_idx] if zhi_idx < len(const.ZHI5) else 0
-                        yao_wuxing_idx_list.append(wuxing_idx)
-                    else:
-                        yao_wuxing_idx_list.append(None)
-                
-                wuxing_str_list = [const.XING5[w] if w is not None and 0 <= w < len(const.XING5) else '' for w in yao_wuxing_idx_list]
-                
-                valid_dizhi = {'子', '丑', '寅', '卯', '辰', '巳', '午', '未', '申', '酉', '戌', '亥'}
-                if actual_yue_zhi and actual_yue_zhi in valid_dizhi:
-                    yue_ling_list = [calc_yue_ling(w, actual_yue_zhi) if w else '' for w in wuxing_str_list]
-                    yue_po_list = [is_yue_po(d, actual_yue_zhi) if d else False for d in yao_dizhi_list]
-                else:
-                    yue_ling_list = None
-                    yue_po_list = None
-            
-            if actual_ri_chen is not None:
-                # 计算旬空和六神
-                xun_kong_list = [is_xun_kong(d, actual_ri_chen) if d else False for d in yao_dizhi_list]
-                liu_shen_list = [calc_liu_shen(i, actual_ri_chen) if i is not None else None for i in range(6)]
+        timer = instrument.timer()
+        static, solar, cal, actual_yue_zhi, actual_ri_chen = self._resolve(params, date, yue_zhi, ri_chen, timer)
 
         # 创建数据类
-        self.result = HexagramResult(
-            params=params,
-            mark=mark,
-            name=name,
-            gong=GUAS[gong_idx],  # Convert index to palace name
-            shiy=shiy,
-            qin6=qin6,
-            qinx=qinx,
-            god6=god6,
-            dong=dong,
-            solar=solar.isoformat(),
-            lunar=lunar,
-            hexagram_type=get_type(mark),
-            guaci=get_guaci(name) if guaci else None,
-            bian=bian,
-            hide=hide,
-            yue_ling=yue_ling_list,
-            yue_po=yue_po_list,
-            xun_kong=xun_kong_list,
-            liu_shen=liu_shen_list if actual_ri_chen else None,
-            yue_zhi=actual_yue_zhi,
-            ri_chen=actual_ri_chen
+        self.result = self._build_result(
+            params, static, solar.isoformat(), cal, actual_yue_zhi, actual_ri_chen, guaci, timer
         )
+        if timer:
+            timer.total('compile')
 
         return self
 
+    def compile_compact(self, params: Optional[List[int]] = None, date: Optional[str] = None,
+                        guaci: bool = False, yue_zhi: Optional[str] = None,
+                        ri_chen: Optional[str] = None, **kwargs) -> CompactHexagramResult:
+        """
+        编译为紧凑结果（只引用共享的静态卦象与日历数据，适合大量常驻内存）
+        参数含义同 compile，不修改 self.result
+        :return: 紧凑排盘结果
+        """
+        static, solar, cal, actual_yue_zhi, actual_ri_chen = self._resolve(params, date, yue_zhi, ri_chen)
+
+        return CompactHexagramResult.from_parts(static, solar.datetime, cal, actual_yue_zhi, actual_ri_chen, guaci)
+
     def gua_type(self, i: int) -> None:
         return
 
-    def render(self) -> str:
+    def render(self, template: str = 'standard') -> str:
         """
         渲染卦象为字符串
+        :param template: 模板名（内置 standard，或通过 renderer.register_template 注册的模板）
         :return: 渲染后的字符串
         """
         if self.result is None:
             raise ValueError("No result to render. Call compile() first.")
 
-        tpl = Path(__file__).parent / 'data' / 'standard.tpl'
-        tpl = tpl.read_text(encoding='utf-8')
+        timer = instrument.timer()
 
         symbal = SYMBOL[self.verbose]
 
@@ -396,12 +305,14 @@ class Najia(object):
 
         rows['shiy'] = shiy
 
-        # 卦象文本
-        if self.result.guaci:
-            rows['guaci'] = get_guaci(self.result.name)
+        # 卦象文本（compile 时已加载，无需重新读取）
+        from .renderer import get_renderer
 
-        template = Template(tpl)
-        return template.render(**rows)
+        output = get_renderer().render(template, **rows)
+        if timer:
+            timer.total('render')
+
+        return output
 
     def export(self) -> Dict[str, Any]:
         """导出为字典"""
@@ -419,7 +330,8 @@ class Najia(object):
                       genders: List[str] = None,
                       titles: List[str] = None,
                       guaci: bool = False,
-                      max_workers: int = 4) -> BatchResult:
+                      max_workers: int = 4,
+                      executor: str = 'threads') -> 'BatchResult':
         """
         批量处理卦象
         :param params_list: 爻位参数列表的列表
@@ -427,10 +339,13 @@ class Najia(object):
         :param genders: 性别列表
         :param titles: 标题列表
         :param guaci: 是否包含卦象文本
-        :param max_workers: 最大并发工作线程数
+        :param max_workers: 最大并发工作线程（进程）数
+        :param executor: 执行方式 threads / processes / sequential
         :return: 批量处理结果
         """
-        processor = BatchProcessor(max_workers=max_workers)
+        from .batch import BatchProcessor
+
+        processor = BatchProcessor(max_workers=max_workers, executor=executor)
         return processor.process_batch(
             params_list=params_list,
             dates=dates,
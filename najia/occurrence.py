@@ -0,0 +1,231 @@
+"""
+时间条件求解：某卦下一次满足条件的日期
+
+时间维度属性（月令旺衰、月破、旬空、六神）只取决于 (月建地支, 日辰干支)，共 12×60 种状态。
+先对全部状态求一次条件，得到满足集；再按节令区段推进：同一区段内月建不变，日辰逐日加 1（模 60），
+区段内下一个满足日可由预先算好的“距下一个满足日辰的天数”表一步求得，不满足的区段整段跳过。
+每个答案只需常数次查表（加上跳过的区段数），不必逐日扫描。
+
+    from najia.occurrence import OccurrenceSolver, xun_kong_of, yue_po_of
+
+    solver = OccurrenceSolver([2, 2, 1, 2, 4, 2], xun_kong_of('世'))
+    solver.next('2026-01-01', n=5)          # 世爻旬空的后 5 个日期
+
+    # 任意条件：参数为 TimeState
+    solver = OccurrenceSolver(params, lambda s: any(s.yue_po[i] for i in s.positions('妻财')))
+
+日期范围限于节令表（1900~2100）。
+"""
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import ganzhi
+from .const import ZHIS
+from .hexagram_table import StaticHexagram, get_static
+from .result import HexagramResult
+from .time_analysis import _time_block
+from .utils import get_god6
+
+# 爻的选择：'世'、'应'、爻位序号（0~5，初爻至上爻）或六亲名（如 '妻财'，可能对应多个爻）
+Yao = Union[str, int]
+
+DateLike = Union[str, date, datetime]
+
+
+@dataclass(frozen=True)
+class TimeState:
+    """由月建、日辰确定的时间状态（条件函数的参数）"""
+    static: StaticHexagram
+    yue_zhi: str                    # 月建地支
+    ri_chen: str                    # 日辰干支
+    yue_ling: Tuple[str, ...]       # 月令旺衰
+    yue_po: Tuple[bool, ...]        # 月破
+    xun_kong: Tuple[bool, ...]      # 旬空
+    liu_shen: Tuple[str, ...]       # 六神（按日辰）
+    god6: Tuple[str, ...]           # 六神（按日干）
+
+    def positions(self, yao: Yao) -> Tuple[int, ...]:
+        """爻的选择转为爻位序号"""
+        return yao_positions(self.static, yao)
+
+
+Predicate = Callable[[TimeState], bool]
+
+
+def yao_positions(static: StaticHexagram, yao: Yao) -> Tuple[int, ...]:
+    """
+    爻的选择转为爻位序号（0~5）
+    :param static: 静态卦象
+    :param yao: '世'、'应'、爻位序号或六亲名
+    """
+    if isinstance(yao, int):
+        if not 0 <= yao < 6:
+            raise ValueError(f'yao position must be in 0~5, got {yao}')
+        return (yao,)
+    if yao == '世':
+        return (static.shiy[0] - 1,)
+    if yao == '应':
+        return (static.shiy[1] - 1,)
+    if yao in static.qin6:
+        return tuple(i for i, qin in enumerate(static.qin6) if qin == yao)
+
+    raise ValueError(f'unknown yao {yao!r}: expected 世, 应, 0~5 or a liuqin of {static.name}')
+
+
+def xun_kong_of(yao: Yao) -> Predicate:
+    """条件：所选爻（之一）旬空"""
+    return lambda state: any(state.xun_kong[i] for i in state.positions(yao))
+
+
+def yue_po_of(yao: Yao) -> Predicate:
+    """条件：所选爻（之一）月破"""
+    return lambda state: any(state.yue_po[i] for i in state.positions(yao))
+
+
+def yue_ling_of(yao: Yao, *values: str) -> Predicate:
+    """条件：所选爻（之一）的月令旺衰属于 values，如 yue_ling_of('世', '旺', '相')"""
+    return lambda state: any(state.yue_ling[i] in values for i in state.positions(yao))
+
+
+def liu_shen_of(yao: Yao, name: str) -> Predicate:
+    """条件：所选爻（之一）临某六神（按日辰），如 liu_shen_of('世', '青龙')"""
+    return lambda state: any(state.liu_shen[i] == name for i in state.positions(yao))
+
+
+def _to_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).date()
+
+    raise TypeError(f'expected a date, datetime or ISO date string, got {value!r}')
+
+
+class OccurrenceSolver(object):
+    """某卦在时间条件下的日期求解器（构造时对 12×60 种状态求一次条件）"""
+
+    def __init__(self, hexagram: Union[Sequence[int], HexagramResult], predicate: Predicate):
+        """
+        :param hexagram: 爻位参数列表或排盘结果
+        :param predicate: 条件函数，参数为 TimeState
+        """
+        params = hexagram.params if isinstance(hexagram, HexagramResult) else hexagram
+        self.static = get_static(params)
+        self.predicate = predicate
+
+        mark = self.static.mark
+        god6 = {gan: tuple(get_god6(ganzhi.ganzhi(gan))) for gan in range(10)}
+        # 满足集 [月建][日辰]
+        self.satisfied: List[List[bool]] = [
+            [
+                bool(predicate(TimeState(self.static, ZHIS[m], ganzhi.ganzhi(d),
+                                         *_time_block(mark, ZHIS[m], ganzhi.ganzhi(d)), god6[d % 10])))
+                for d in range(60)
+            ]
+            for m in range(12)
+        ]
+        # 距下一个满足日辰的天数 [月建][日辰]，该月建下无满足日辰时为 None
+        self._next_offset: List[List[Optional[int]]] = [self._offsets(row) for row in self.satisfied]
+
+    @staticmethod
+    def _offsets(row: List[bool]) -> List[Optional[int]]:
+        if not any(row):
+            return [None] * 60
+
+        offsets: List[Optional[int]] = [None] * 60
+        nearest = None
+        # 逆序扫两圈，nearest 为当前日辰之后（含）最近的满足日辰
+        for i in range(119, -1, -1):
+            d = i % 60
+            if row[d]:
+                nearest = i
+            if i < 60:
+                offsets[d] = nearest - i
+
+        return offsets
+
+    def is_satisfiable(self) -> bool:
+        """是否存在满足条件的日期"""
+        return any(any(row) for row in self.satisfied)
+
+    def iter_dates(self, start: DateLike, end: Optional[DateLike] = None) -> Iterator[date]:
+        """
+        按时间顺序产出满足条件的日期
+        :param start: 起始日期（含）
+        :param end: 结束日期（含），默认节令表末尾
+        """
+        first = _to_date(start)
+        last = _to_date(end) if end is not None else ganzhi.MAX_DATE
+        if not ganzhi.MIN_DATE <= first <= ganzhi.MAX_DATE:
+            raise ValueError(f'date out of range: {first}')
+        if not self.is_satisfiable():
+            return
+
+        days = ganzhi._table().days
+        epoch = ganzhi._EPOCH_ORDINAL
+        rel = first.toordinal() - epoch
+        end_rel = min(last, ganzhi.MAX_DATE).toordinal() - epoch
+        table_end = ganzhi.MAX_DATE.toordinal() - epoch + 1
+
+        # 表首小寒之前 k 为 -1，月建为子（上一年大雪起）
+        k = bisect_right(days, rel) - 1
+        day_idx = (rel + epoch + ganzhi._JDN_OFFSET - 11) % 60
+
+        while rel <= end_rel:
+            # 当前节令区段 [rel, segment_end)，月建不变
+            segment_end = days[k + 1] if k + 1 < len(days) else table_end
+            offset = self._next_offset[(1 + k) % 12][day_idx]
+
+            if offset is not None and rel + offset < segment_end:
+                rel += offset
+                if rel > end_rel:
+                    return
+                yield date.fromordinal(rel + epoch)
+                rel += 1
+                day_idx = (day_idx + offset + 1) % 60
+                if rel < segment_end:
+                    continue
+            else:
+                day_idx = (day_idx + segment_end - rel) % 60
+                rel = segment_end
+
+            k += 1
+            if rel >= table_end:
+                return
+
+    def next(self, start: DateLike, n: int = 1, end: Optional[DateLike] = None) -> List[date]:
+        """
+        起始日期（含）之后满足条件的前 n 个日期
+        :param start: 起始日期
+        :param n: 个数
+        :param end: 结束日期（含）
+        :return: 日期列表，不足 n 个时返回全部
+        """
+        out = []
+        if n <= 0:
+            return out
+
+        for day in self.iter_dates(start, end):
+            out.append(day)
+            if len(out) >= n:
+                break
+
+        return out
+
+
+def next_occurrences(hexagram: Union[Sequence[int], HexagramResult], predicate: Predicate, start: DateLike,
+                     n: int = 1, end: Optional[DateLike] = None) -> List[date]:
+    """
+    某卦下一次（前 n 次）满足条件的日期
+    :param hexagram: 爻位参数列表或排盘结果
+    :param predicate: 条件函数（参数为 TimeState），如 xun_kong_of('世')
+    :param start: 起始日期（含）
+    :param n: 个数
+    :param end: 结束日期（含）
+    :return: 日期列表
+    """
+    return OccurrenceSolver(hexagram, predicate).next(start, n, end)
@@ -0,0 +1,499 @@
+"""
+反向查询
+
+排盘结果由参数（4096 种）、月建（12 种）和日辰（60 种）决定，全部组合约 295 万种。
+本模块把每个条件表示为一个位集（Python 大整数，每种组合一位），查询由位运算组合而成，
+回答“哪些参数在卯月甲子日世爻为官鬼且月破”一类的问题，不逐个调用 Najia.compile。
+
+位序：第 (月建序号 × 60 + 日辰序号) × 4096 + 参数编码 位（参数编码见 hexagram_table.pack_params）。
+同一 (月建, 日辰) 的 4096 位为一块：只与参数有关的条件各块相同，只与时间有关的条件整块全 1 或全 0，
+爻级条件按 12 个月建、60 个日辰各算一次 4096 位的块再拼接。
+
+    from najia.query import query, ri_chen, yao, yue_zhi
+
+    q = yao('世', qin6='官鬼', yue_po=True) & yue_zhi('卯') & ri_chen('甲子')
+    result = query(q)
+    result.params()                 # 满足条件的参数组合
+    for match in result:            # Match(params, yue_zhi, ri_chen)
+        ...
+
+条件：
+- 卦级：gong、name、hexagram_type、shi_yao（世爻位置）、moving（动爻数）、bian（变卦）、hide（伏神）
+- 时间：yue_zhi、ri_chen
+- 爻级：yao(which, ...)，所选爻中有一爻同时满足全部子条件（六亲、地支、五行、动爻、月破、旬空、月令、六神）
+条件可用 &、|、~ 组合。
+"""
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, FrozenSet, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import ganzhi
+from .const import GUAS, SHEN6, XING5, ZHI5, ZHIS, ZHIS_DICT
+from .hexagram_table import TABLE_SIZE, StaticHexagram, get_table, pack_params
+from .time_analysis import CHONG_TABLE, LIU_SHEN_TABLE, LIUSHEN_ORDER, WANG_SHUAI_TABLE, XUN_KONG_TABLE
+from .utils import get_god6
+
+# 块数（月建 × 日辰）与全空间位数
+BLOCKS = 12 * 60
+SPACE = BLOCKS * TABLE_SIZE
+
+_BLOCK_BYTES = TABLE_SIZE // 8
+_BLOCK_MASK = (1 << TABLE_SIZE) - 1
+_FULL = (1 << SPACE) - 1
+_EMPTY_BLOCK = bytes(_BLOCK_BYTES)
+
+# 字节值 -> 置位的位序号
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256))
+
+_GANZHI = tuple(ganzhi.ganzhi(i) for i in range(60))
+_GANZHI_INDEX = {gz: i for i, gz in enumerate(_GANZHI)}
+
+QIN6 = ('父母', '兄弟', '子孙', '妻财', '官鬼')
+WUXING = tuple(XING5)
+YUE_LING = ('旺', '相', '休', '囚', '死')
+GOD6 = SHEN6
+
+# 地支五行 [地支序号]
+_ZHI_WUXING = tuple(XING5[ZHI5[z]] for z in range(12))
+
+Values = Union[str, Iterable[str]]
+
+
+def _values(value: Values, allowed: Iterable[str], what: str) -> FrozenSet[str]:
+    """条件取值（单个或多个）转为集合并校验"""
+    values = frozenset((value,)) if isinstance(value, str) else frozenset(value)
+    unknown = values.difference(allowed)
+    if unknown or not values:
+        raise ValueError(f'invalid {what}: {sorted(unknown) or value!r}')
+
+    return values
+
+
+def _repeat(bits: int) -> int:
+    """4096 位的参数位集复制到全部块"""
+    return int.from_bytes(bits.to_bytes(_BLOCK_BYTES, 'little') * BLOCKS, 'little')
+
+
+def _join(blocks: Sequence[int]) -> int:
+    """按块拼接为全空间位集"""
+    return int.from_bytes(b''.join(block.to_bytes(_BLOCK_BYTES, 'little') for block in blocks), 'little')
+
+
+def _table_bits(test: Callable[[StaticHexagram], bool]) -> int:
+    """静态卦象表中满足 test 的参数位集"""
+    return int(''.join('1' if test(entry) else '0' for entry in reversed(get_table())), 2)
+
+
+class _Index(object):
+    """按爻位预先建好的参数位集"""
+
+    def __init__(self):
+        table = get_table()
+        # [爻位][地支序号]、[爻位][六亲]
+        self.zhi: List[List[int]] = [[0] * 12 for _ in range(6)]
+        self.qin6: List[dict] = [{qin: 0 for qin in QIN6} for _ in range(6)]
+        self.dong = [0] * 6
+        self.shi = [0] * 6
+        self.ying = [0] * 6
+
+        for entry in table:
+            bit = 1 << entry.key
+            for i in range(6):
+                self.zhi[i][ZHIS_DICT[entry.najia[i][1]]] |= bit
+                self.qin6[i][entry.qin6[i]] |= bit
+            for i in entry.dong:
+                self.dong[i] |= bit
+            self.shi[entry.shiy[0] - 1] |= bit
+            self.ying[entry.shiy[1] - 1] |= bit
+
+        # 六神（按日干，同 HexagramResult.god6）[日干][爻位]
+        self.god6 = [tuple(get_god6(_GANZHI[gan])) for gan in range(10)]
+
+    def zhi_mask(self, i: int, test: Callable[[int], bool]) -> int:
+        """第 i 爻地支满足 test 的参数位集"""
+        bits = 0
+        for z in range(12):
+            if test(z):
+                bits |= self.zhi[i][z]
+
+        return bits
+
+
+_INDEX: Optional[_Index] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def _get_index() -> _Index:
+    global _INDEX
+
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = _Index()
+
+    return _INDEX
+
+
+class Query(ABC):
+    """查询条件（可用 &、|、~ 组合）"""
+
+    @abstractmethod
+    def bits(self) -> int:
+        """全空间位集"""
+
+    def __and__(self, other: 'Query') -> 'Query':
+        return _And(self, other)
+
+    def __or__(self, other: 'Query') -> 'Query':
+        return _Or(self, other)
+
+    def __invert__(self) -> 'Query':
+        return _Not(self)
+
+
+@dataclass(frozen=True)
+class _And(Query):
+    left: Query
+    right: Query
+
+    def bits(self) -> int:
+        return self.left.bits() & self.right.bits()
+
+
+@dataclass(frozen=True)
+class _Or(Query):
+    left: Query
+    right: Query
+
+    def bits(self) -> int:
+        return self.left.bits() | self.right.bits()
+
+
+@dataclass(frozen=True)
+class _Not(Query):
+    query: Query
+
+    def bits(self) -> int:
+        return self.query.bits() ^ _FULL
+
+
+class _Atom(Query):
+    """原子条件（位集按条件缓存）"""
+
+    def bits(self) -> int:
+        return _atom_bits(self)
+
+    @abstractmethod
+    def _compute(self, index: _Index) -> int:
+        """按预建索引计算全空间位集"""
+
+
+@lru_cache(maxsize=64)
+def _atom_bits(atom: _Atom) -> int:
+    return atom._compute(_get_index())
+
+
+@dataclass(frozen=True)
+class _Static(_Atom):
+    """只与参数有关的条件"""
+    field: str
+    values: FrozenSet
+
+    def _compute(self, index: _Index) -> int:
+        if self.field == 'shi_yao':
+            return _repeat(_table_bits(lambda e: e.shiy[0] - 1 in self.values))
+        if self.field == 'moving':
+            return _repeat(_table_bits(lambda e: len(e.dong) in self.values))
+
+        return _repeat(_table_bits(lambda e: getattr(e, self.field) in self.values))
+
+
+@dataclass(frozen=True)
+class _Bian(_Atom):
+    name: Optional[FrozenSet[str]]
+    hexagram_type: Optional[FrozenSet[str]]
+
+    def _compute(self, index: _Index) -> int:
+        def test(entry: StaticHexagram) -> bool:
+            bian = entry.bian
+            return bian is not None and (self.name is None or bian.name in self.name) and (
+                self.hexagram_type is None or bian.hexagram_type in self.hexagram_type)
+
+        return _repeat(_table_bits(test))
+
+
+@dataclass(frozen=True)
+class _Hide(_Atom):
+    qin6: Optional[FrozenSet[str]]
+
+    def _compute(self, index: _Index) -> int:
+        def test(entry: StaticHexagram) -> bool:
+            hide = entry.hide
+            return hide is not None and (self.qin6 is None or any(hide.qin6[s] in self.qin6 for s in hide.seat))
+
+        return _repeat(_table_bits(test))
+
+
+@dataclass(frozen=True)
+class _Time(_Atom):
+    """只与时间有关的条件"""
+    months: FrozenSet[int]
+    days: FrozenSet[int]
+
+    def _compute(self, index: _Index) -> int:
+        return _join([_BLOCK_MASK if m in self.months and d in self.days else 0
+                      for m in range(12) for d in range(60)])
+
+
+@dataclass(frozen=True)
+class _Yao(_Atom):
+    """所选爻中有一爻同时满足全部子条件"""
+    which: Union[str, int, None]
+    qin6: Optional[FrozenSet[str]] = None
+    zhi: Optional[FrozenSet[str]] = None
+    wuxing: Optional[FrozenSet[str]] = None
+    dong: Optional[bool] = None
+    yue_po: Optional[bool] = None
+    xun_kong: Optional[bool] = None
+    yue_ling: Optional[FrozenSet[str]] = None
+    liu_shen: Optional[FrozenSet[str]] = None
+    god6: Optional[FrozenSet[str]] = None
+
+    def _positions(self, index: _Index) -> List[Tuple[int, int]]:
+        """(爻位, 该爻位被选中的参数位集)"""
+        if self.which is None:
+            return [(i, _BLOCK_MASK) for i in range(6)]
+        if self.which == '世':
+            return [(i, index.shi[i]) for i in range(6)]
+        if self.which == '应':
+            return [(i, index.ying[i]) for i in range(6)]
+
+        return [(self.which, _BLOCK_MASK)]
+
+    def _static(self, index: _Index, i: int, bits: int) -> int:
+        if self.qin6 is not None:
+            mask = 0
+            for qin in self.qin6:
+                mask |= index.qin6[i][qin]
+            bits &= mask
+        if self.zhi is not None:
+            bits &= index.zhi_mask(i, lambda z: ZHIS[z] in self.zhi)
+        if self.wuxing is not None:
+            bits &= index.zhi_mask(i, lambda z: _ZHI_WUXING[z] in self.wuxing)
+        if self.dong is not None:
+            bits &= index.dong[i] if self.dong else ~index.dong[i] & _BLOCK_MASK
+
+        return bits
+
+    def _month(self, index: _Index, i: int, m: int) -> int:
+        bits = _BLOCK_MASK
+        if self.yue_po is not None:
+            bits &= index.zhi_mask(i, lambda z: CHONG_TABLE[z][m] == self.yue_po)
+        if self.yue_ling is not None:
+            bits &= index.zhi_mask(i, lambda z: WANG_SHUAI_TABLE[ZHI5[z]][m] in self.yue_ling)
+
+        return bits
+
+    def _day(self, index: _Index, i: int, d: int) -> int:
+        bits = _BLOCK_MASK
+        if self.xun_kong is not None:
+            bits &= index.zhi_mask(i, lambda z: XUN_KONG_TABLE[d][z] == self.xun_kong)
+        if self.liu_shen is not None and LIU_SHEN_TABLE[d % 10][i] not in self.liu_shen:
+            return 0
+        if self.god6 is not None and index.god6[d % 10][i] not in self.god6:
+            return 0
+
+        return bits
+
+    def _compute(self, index: _Index) -> int:
+        blocks = [0] * BLOCKS
+        for i, selected in self._positions(index):
+            bits = self._static(index, i, selected)
+            if not bits:
+                continue
+
+            months = [bits & self._month(index, i, m) for m in range(12)]
+            days = [self._day(index, i, d) for d in range(60)]
+            for m in range(12):
+                if months[m]:
+                    base = m * 60
+                    for d in range(60):
+                        blocks[base + d] |= months[m] & days[d]
+
+        return _join(blocks)
+
+
+def gong(*names: str) -> Query:
+    """条件：卦宫（如 '乾'）"""
+    return _Static('gong', _values(names, GUAS, 'gong'))
+
+
+def name(*names: str) -> Query:
+    """条件：卦名"""
+    return _Static('name', _values(names, {e.name for e in get_table()}, 'hexagram name'))
+
+
+def hexagram_type(*types: str) -> Query:
+    """条件：卦象类型（如 '六冲'）"""
+    return _Static('hexagram_type', _values(types, {e.hexagram_type for e in get_table()}, 'hexagram type'))
+
+
+def shi_yao(*positions: int) -> Query:
+    """条件：世爻位置（0~5，初爻至上爻）"""
+    if not positions or any(p not in range(6) for p in positions):
+        raise ValueError(f'shi positions must be in 0~5, got {positions!r}')
+
+    return _Static('shi_yao', frozenset(positions))
+
+
+def moving(*counts: int) -> Query:
+    """条件：动爻数（0~6）"""
+    if not counts or any(c not in range(7) for c in counts):
+        raise ValueError(f'moving counts must be in 0~6, got {counts!r}')
+
+    return _Static('moving', frozenset(counts))
+
+
+def bian(name: Optional[Values] = None, hexagram_type: Optional[Values] = None) -> Query:
+    """
+    条件：有变卦（可再限定变卦卦名、卦象类型）
+    :param name: 变卦卦名
+    :param hexagram_type: 变卦卦象类型
+    """
+    table = get_table()
+    return _Bian(
+        None if name is None else _values(name, {e.name for e in table}, 'hexagram name'),
+        None if hexagram_type is None else _values(hexagram_type, {e.hexagram_type for e in table}, 'hexagram type'),
+    )
+
+
+def hide(qin6: Optional[Values] = None) -> Query:
+    """
+    条件：有伏神（可再限定伏神六亲）
+    :param qin6: 伏神六亲，如 '妻财'
+    """
+    return _Hide(None if qin6 is None else _values(qin6, QIN6, 'liuqin'))
+
+
+def yue_zhi(*zhis: str) -> Query:
+    """条件：月建地支"""
+    months = _values(zhis, ZHIS, 'yue_zhi')
+    return _Time(frozenset(ZHIS_DICT[z] for z in months), frozenset(range(60)))
+
+
+def ri_chen(*gzs: str) -> Query:
+    """条件：日辰干支"""
+    days = _values(gzs, _GANZHI, 'ri_chen')
+    return _Time(frozenset(range(12)), frozenset(_GANZHI_INDEX[gz] for gz in days))
+
+
+def yao(which: Union[str, int, None] = None, *, qin6: Optional[Values] = None, zhi: Optional[Values] = None,
+        wuxing: Optional[Values] = None, dong: Optional[bool] = None, yue_po: Optional[bool] = None,
+        xun_kong: Optional[bool] = None, yue_ling: Optional[Values] = None, liu_shen: Optional[Values] = None,
+        god6: Optional[Values] = None) -> Query:
+    """
+    爻级条件：所选爻中有一爻同时满足全部子条件
+    :param which: '世'、'应'、爻位序号（0~5），默认任一爻
+    :param qin6: 六亲
+    :param zhi: 纳甲地支
+    :param wuxing: 纳甲五行
+    :param dong: 是否动爻
+    :param yue_po: 是否月破
+    :param xun_kong: 是否旬空
+    :param yue_ling: 月令旺衰
+    :param liu_shen: 六神（按日辰，同 HexagramResult.liu_shen）
+    :param god6: 六神（按日辰的日干，同按日期排盘时的 HexagramResult.god6）
+    """
+    if not (which is None or which in ('世', '应') or (isinstance(which, int) and 0 <= which < 6)):
+        raise ValueError(f'unknown yao {which!r}: expected 世, 应, 0~5 or None')
+
+    return _Yao(
+        which,
+        qin6=None if qin6 is None else _values(qin6, QIN6, 'liuqin'),
+        zhi=None if zhi is None else _values(zhi, ZHIS, 'zhi'),
+        wuxing=None if wuxing is None else _values(wuxing, WUXING, 'wuxing'),
+        dong=None if dong is None else bool(dong),
+        yue_po=None if yue_po is None else bool(yue_po),
+        xun_kong=None if xun_kong is None else bool(xun_kong),
+        yue_ling=None if yue_ling is None else _values(yue_ling, YUE_LING, 'yue_ling'),
+        liu_shen=None if liu_shen is None else _values(liu_shen, LIUSHEN_ORDER, 'liu_shen'),
+        god6=None if god6 is None else _values(god6, GOD6, 'god6'),
+    )
+
+
+@dataclass(frozen=True)
+class Match:
+    """一个满足条件的组合"""
+    params: Tuple[int, ...]
+    yue_zhi: str
+    ri_chen: str
+
+
+class QueryResult(object):
+    """查询结果（全空间位集）"""
+
+    def __init__(self, bits: int):
+        self.bits = bits
+
+    def __len__(self) -> int:
+        return bin(self.bits).count('1')
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def _blocks(self) -> Iterator[Tuple[int, bytes]]:
+        """非空块 (块序号, 512 字节的参数位集)"""
+        data = self.bits.to_bytes(SPACE // 8, 'little')
+        for block in range(BLOCKS):
+            chunk = data[block * _BLOCK_BYTES:(block + 1) * _BLOCK_BYTES]
+            if chunk != _EMPTY_BLOCK:
+                yield block, chunk
+
+    def __iter__(self) -> Iterator[Match]:
+        table = get_table()
+        for block, chunk in self._blocks():
+            month, day = ZHIS[block // 60], _GANZHI[block % 60]
+            for key in _keys(chunk):
+                yield Match(table[key].params, month, day)
+
+    def __contains__(self, item: Tuple[Sequence[int], str, str]) -> bool:
+        """(参数, 月建, 日辰) 是否满足条件"""
+        params, month, day = item
+        key = pack_params(params)
+        if key is None or month not in ZHIS_DICT or day not in _GANZHI_INDEX:
+            return False
+
+        return bool(self.bits >> ((ZHIS_DICT[month] * 60 + _GANZHI_INDEX[day]) * TABLE_SIZE + key) & 1)
+
+    def params(self) -> List[Tuple[int, ...]]:
+        """在任一 (月建, 日辰) 下满足条件的参数组合（按参数编码排序）"""
+        merged = 0
+        for _, chunk in self._blocks():
+            merged |= int.from_bytes(chunk, 'little')
+
+        table = get_table()
+        return [table[key].params for key in _keys(merged.to_bytes(_BLOCK_BYTES, 'little'))]
+
+    def times(self) -> List[Tuple[str, str]]:
+        """至少有一种参数满足条件的 (月建, 日辰)"""
+        return [(ZHIS[block // 60], _GANZHI[block % 60]) for block, _ in self._blocks()]
+
+
+def _keys(chunk: bytes) -> Iterator[int]:
+    """块中置位的参数编码（升序）"""
+    for i, byte in enumerate(chunk):
+        if byte:
+            base = i * 8
+            for bit in _BYTE_BITS[byte]:
+                yield base + bit
+
+
+def query(q: Query) -> QueryResult:
+    """
+    执行查询
+    :param q: 查询条件
+    :return: 查询结果
+    """
+    return QueryResult(q.bits())
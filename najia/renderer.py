@@ -0,0 +1,119 @@
+"""
+模板渲染
+
+每个进程只创建一次 jinja2 Environment，模板编译后缓存在其中，不再每次渲染都读盘、
+编译。支持自定义模板目录、字节码缓存，以及注册额外的输出模板。
+模板名不带扩展名时自动补 '.tpl'，如 'standard' 对应 data/standard.tpl。
+"""
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Union
+
+from jinja2 import ChoiceLoader, DictLoader, Environment, FileSystemBytecodeCache, FileSystemLoader, Template
+
+# 内置模板目录
+DEFAULT_TEMPLATE_DIR = Path(__file__).parent / 'data'
+
+# 默认模板名
+DEFAULT_TEMPLATE = 'standard'
+
+
+class Renderer(object):
+    """模板渲染器"""
+
+    def __init__(self, template_paths: Optional[Iterable[Union[str, Path]]] = None,
+                 bytecode_cache_dir: Optional[Union[str, Path]] = None,
+                 auto_reload: bool = False):
+        """
+        :param template_paths: 额外的模板目录，优先于内置目录查找
+        :param bytecode_cache_dir: 字节码缓存目录，多进程或重启后可跳过模板编译
+        :param auto_reload: 是否检查模板文件修改（开发时使用，会增加一次 stat）
+        """
+        paths = [str(p) for p in (template_paths or [])] + [str(DEFAULT_TEMPLATE_DIR)]
+        self._registered: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.env = Environment(
+            loader=ChoiceLoader([DictLoader(self._registered), FileSystemLoader(paths, encoding='utf-8')]),
+            bytecode_cache=FileSystemBytecodeCache(str(bytecode_cache_dir)) if bytecode_cache_dir else None,
+            auto_reload=auto_reload,
+        )
+
+    @staticmethod
+    def _name(name: str) -> str:
+        return name if '.' in name else f'{name}.tpl'
+
+    def register_template(self, name: str, source: Optional[str] = None,
+                          path: Optional[Union[str, Path]] = None) -> None:
+        """
+        注册（或替换）一个输出模板
+        :param name: 模板名
+        :param source: 模板源码
+        :param path: 模板文件路径（与 source 二选一）
+        """
+        if (source is None) == (path is None):
+            raise ValueError('exactly one of source or path is required')
+
+        if path is not None:
+            source = Path(path).read_text(encoding='utf-8')
+
+        with self._lock:
+            self._registered[self._name(name)] = source
+            # 丢弃已编译的同名模板
+            if self.env.cache is not None:
+                self.env.cache.clear()
+
+    def templates(self):
+        """可用模板名列表"""
+        return sorted(self.env.list_templates())
+
+    def get_template(self, name: str = DEFAULT_TEMPLATE) -> Template:
+        """获取已编译模板（首次使用时加载并编译）"""
+        return self.env.get_template(self._name(name))
+
+    def render(self, template: str = DEFAULT_TEMPLATE, /, **context: Any) -> str:
+        """
+        渲染模板
+        :param template: 模板名
+        :param context: 模板变量
+        :return: 渲染后的字符串
+        """
+        return self.get_template(template).render(**context)
+
+
+_default_renderer: Optional[Renderer] = None
+_default_lock = threading.Lock()
+
+
+def get_renderer() -> Renderer:
+    """获取进程级默认渲染器"""
+    global _default_renderer
+
+    if _default_renderer is None:
+        with _default_lock:
+            if _default_renderer is None:
+                _default_renderer = Renderer()
+
+    return _default_renderer
+
+
+def configure(template_paths: Optional[Iterable[Union[str, Path]]] = None,
+              bytecode_cache_dir: Optional[Union[str, Path]] = None,
+              auto_reload: bool = False) -> Renderer:
+    """
+    重新配置默认渲染器（已注册的模板会保留）
+    :return: 新的默认渲染器
+    """
+    global _default_renderer
+
+    with _default_lock:
+        registered = dict(_default_renderer._registered) if _default_renderer else {}
+        renderer = Renderer(template_paths, bytecode_cache_dir, auto_reload)
+        renderer._registered.update(registered)
+        _default_renderer = renderer
+
+    return renderer
+
+
+def register_template(name: str, source: Optional[str] = None, path: Optional[Union[str, Path]] = None) -> None:
+    """在默认渲染器上注册输出模板"""
+    get_renderer().register_template(name, source=source, path=path)
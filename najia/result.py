@@ -112,7 +112,14 @@ class HexagramResult:
 
         return result
 
-    def to_json(self) -> str:
-        """转换为JSON字符串"""
+    def to_json(self, compact: bool = False) -> str:
+        """
+        转换为JSON字符串
+        :param compact: 紧凑格式（无缩进、无多余空格，见 serialize.py）
+        """
+        if compact:
+            from .serialize import result_json
+            return result_json(self)
+
         import json
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
\ No newline at end of file
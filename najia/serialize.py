@@ -0,0 +1,238 @@
+"""
+紧凑 JSON 序列化
+
+- dumps / dumps_bytes：无缩进、无多余空格、不转义中文；安装了 orjson 时使用 orjson（可选依赖，
+  pip install najia[orjson]），否则使用标准库 json。两者对字符串、整数、布尔值、列表与对象的输出
+  逐字节一致；浮点数的写法不同（如 orjson 为 0.000012，标准库为 1.2e-05），解析后数值相同。
+  排盘结果中没有浮点数，批量结果的 processing_time 是浮点数；
+- compact_result_json：CompactHexagramResult 的序列化。结果中与时间无关的部分（卦码、卦名、
+  世应、六亲、动爻、伏神、变卦、卦辞）只取决于静态卦象，日历、六神、时间维度属性只取决于
+  按小时缓存的日历信息，这些片段序列化一次后缓存复用，每次只拼接字符串；
+- result_json：HexagramResult 的序列化。标准库后端下，与时间无关的字段与静态卦象表一致时复用同一组片段，
+  结果被修改过时整体编码；orjson 后端下整体编码一次更快（逐字段核对结果是否被修改的开销大于省下的编码），
+  直接编码 to_dict()。
+
+排盘结果的输出与 json.dumps(result.to_dict(), ensure_ascii=False, separators=(',', ':')) 完全一致。
+"""
+import json
+from functools import lru_cache
+from typing import Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+from .hexagram_table import StaticHexagram, get_static, get_table
+from .lunar_utils import CalendarInfo
+from .time_analysis import _time_block, time_block
+from .utils import get_god6, get_guaci
+
+# 可选的编码后端
+JSON_BACKENDS = ('orjson', 'json')
+
+_backend = 'orjson' if orjson is not None else 'json'
+
+_SEPARATORS = (',', ':')
+
+
+def get_json_backend() -> str:
+    """当前编码后端"""
+    return _backend
+
+
+def set_json_backend(name: str) -> None:
+    """
+    切换编码后端（同时清空片段缓存）
+    :param name: orjson / json
+    """
+    global _backend
+
+    if name not in JSON_BACKENDS:
+        raise ValueError(f'json backend must be one of {JSON_BACKENDS}, got {name!r}')
+    if name == 'orjson' and orjson is None:
+        raise ImportError('orjson is not installed, install it with: pip install najia[orjson]')
+
+    _backend = name
+    fragment_cache_clear()
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """紧凑 JSON（UTF-8 字节串）"""
+    if _backend == 'orjson':
+        return orjson.dumps(obj)
+
+    return json.dumps(obj, ensure_ascii=False, separators=_SEPARATORS).encode('utf-8')
+
+
+def dumps(obj: Any) -> str:
+    """紧凑 JSON 字符串"""
+    if _backend == 'orjson':
+        return orjson.dumps(obj).decode('utf-8')
+
+    return json.dumps(obj, ensure_ascii=False, separators=_SEPARATORS)
+
+
+def _members(mapping: dict) -> str:
+    """对象成员片段（去掉首尾花括号），空对象返回空串"""
+    return dumps(mapping)[1:-1]
+
+
+@lru_cache(maxsize=8192)
+def _static_fragments(backend: str, key: Any) -> Tuple[str, str, str]:
+    """
+    静态卦象的三段片段：
+    head  '{"params":...,"qinx":[...],"god6":'
+    mid   ',"dong":[...],"solar":'
+    tail  ',"hexagram_type":...[,"bian":...][,"hide":...]'
+    """
+    static = get_table()[key] if isinstance(key, int) else get_static(key)
+
+    head = _members({
+        'params': list(static.params),
+        'mark': static.mark,
+        'name': static.name,
+        'gong': static.gong,
+        'shiy': static.shiy,
+        'qin6': list(static.qin6),
+        'qinx': list(static.qinx),
+    })
+    tail = {'hexagram_type': static.hexagram_type}
+    if static.bian is not None:
+        tail['bian'] = static.bian.to_dict()
+    if static.hide is not None:
+        tail['hide'] = static.hide.to_dict()
+
+    return '{' + head + ',"god6":', ',"dong":' + dumps(list(static.dong)) + ',"solar":', ',' + _members(tail)
+
+
+@lru_cache(maxsize=16)
+def _god6_fragment(backend: str, day: str) -> str:
+    return dumps(get_god6(day))
+
+
+@lru_cache(maxsize=4096)
+def _lunar_fragment(backend: str, cal: CalendarInfo) -> str:
+    return ',"lunar":' + dumps(cal.to_lunar_dict())
+
+
+@lru_cache(maxsize=128)
+def _guaci_fragment(backend: str, name: str) -> str:
+    guaci = get_guaci(name)
+    return '' if guaci is None else ',"guaci":' + dumps(guaci)
+
+
+@lru_cache(maxsize=8192)
+def _time_fragment(backend: str, mark: str, yue_zhi: Any, ri_chen: Any) -> str:
+    return _time_members(*time_block(mark, yue_zhi, ri_chen), yue_zhi, ri_chen)
+
+
+def _time_members(yue_ling: Any, yue_po: Any, xun_kong: Any, liu_shen: Any, yue_zhi: Any, ri_chen: Any) -> str:
+    fields = {}
+    if yue_ling is not None:
+        fields['yue_ling'] = yue_ling
+    if yue_po is not None:
+        fields['yue_po'] = yue_po
+    if xun_kong is not None:
+        fields['xun_kong'] = xun_kong
+    if liu_shen is not None:
+        fields['liu_shen'] = liu_shen
+    if yue_zhi is not None:
+        fields['yue_zhi'] = yue_zhi
+    if ri_chen is not None:
+        fields['ri_chen'] = ri_chen
+
+    return ',' + _members(fields) if fields else ''
+
+
+def _static_key(static: StaticHexagram) -> Any:
+    return static.key if static.key is not None else static.params
+
+
+def compact_result_json(result: Any) -> str:
+    """
+    CompactHexagramResult 序列化为紧凑 JSON（与其 to_dict() 结构一致）
+    :param result: CompactHexagramResult
+    :return: JSON 字符串
+    """
+    backend = _backend
+    static = result.static
+    head, mid, tail = _static_fragments(backend, _static_key(static))
+
+    parts = [
+        head,
+        _god6_fragment(backend, result.calendar.day),
+        mid,
+        dumps(result.solar),
+        _lunar_fragment(backend, result.calendar),
+        tail,
+    ]
+    if result.guaci:
+        parts.append(_guaci_fragment(backend, static.name))
+    parts.append(_time_fragment(backend, static.mark, result.yue_zhi, result.ri_chen))
+    parts.append('}')
+
+    return ''.join(parts)
+
+
+def _same(value: Any, expected: Any) -> bool:
+    """列表字段与静态卦象中的元组比较（None 只与 None 相等）"""
+    if value is None or expected is None:
+        return value is expected
+
+    return tuple(value) == tuple(expected)
+
+
+def _matches_static(result: Any, static: StaticHexagram) -> bool:
+    """结果中与时间无关的字段是否仍与静态卦象一致"""
+    return (
+        _same(result.params, static.params)
+        and result.mark == static.mark
+        and result.name == static.name
+        and result.gong == static.gong
+        and _same(result.shiy, static.shiy)
+        and _same(result.qin6, static.qin6)
+        and _same(result.qinx, static.qinx)
+        and _same(result.dong, static.dong)
+        and result.hexagram_type == static.hexagram_type
+        and result.bian == static.bian
+        and result.hide == static.hide
+    )
+
+
+def result_json(result: Any) -> str:
+    """
+    HexagramResult 序列化为紧凑 JSON（与其 to_dict() 结构一致）
+    :param result: HexagramResult
+    :return: JSON 字符串
+    """
+    if _backend == 'orjson':
+        return dumps(result.to_dict())
+
+    try:
+        static = get_static(result.params)
+    except (TypeError, ValueError, KeyError, IndexError):
+        static = None
+    if static is None or not _matches_static(result, static):
+        return dumps(result.to_dict())
+
+    backend = _backend
+    head, mid, tail = _static_fragments(backend, _static_key(static))
+    parts = [head, dumps(result.god6), mid, dumps(result.solar), ',"lunar":', dumps(result.lunar), tail]
+    if result.guaci is not None:
+        parts.append(',"guaci":' + dumps(result.guaci))
+
+    fields = (result.yue_ling, result.yue_po, result.xun_kong, result.liu_shen)
+    if all(_same(a, b) for a, b in zip(fields, _time_block(static.mark, result.yue_zhi, result.ri_chen))):
+        parts.append(_time_fragment(backend, static.mark, result.yue_zhi, result.ri_chen))
+    else:
+        parts.append(_time_members(*fields, result.yue_zhi, result.ri_chen))
+    parts.append('}')
+
+    return ''.join(parts)
+
+
+def fragment_cache_clear() -> None:
+    """清空片段缓存（修改卦辞数据等之后调用）"""
+    for cached in (_static_fragments, _god6_fragment, _lunar_fragment, _guaci_fragment, _time_fragment):
+        cached.cache_clear()
@@ -0,0 +1,364 @@
+"""
+HTTP 服务（仅依赖标准库）
+
+接口：
+- GET  /health                          健康检查
+- GET  /compile?params=221242&date=...  单次排盘（查询参数同 POST 请求体的字段）
+- POST /compile                         单次排盘，请求体 {"params": [...], "date": ..., "gender": ...,
+                                        "title": ..., "guaci": false, "format": "json" | "text", "verbose": 0}
+- POST /batch                           批量排盘，请求体 {"records": [...], "guaci": false, "format": "json" | "text"}，
+                                        records 中每条与 najia batch 命令的 JSONL 记录相同
+
+JSON 结果与 HexagramResult.to_dict() 一致；format=text 返回渲染后的文本。
+
+使用 HTTP/1.1 长连接，每个连接一个线程；启动时预先构建静态卦表、节令表、卦辞索引与模板，
+workers > 1 时在绑定端口后 fork 出多个工作进程共享同一监听套接字（预热数据随 fork 共享）。
+请求体超过 max_body 字节返回 413，批量记录数超过 max_batch 返回 413。
+
+运行：python -m najia serve --port 8000
+"""
+import json
+import os
+import signal
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from . import __version__
+from .batch import BatchItemResult, _compile_records, _warm_up
+from .log import setup_logger
+from .najia import Najia
+from .serialize import dumps_bytes
+from .utils import parse_params
+
+logger = setup_logger(__name__)
+
+# 请求体大小上限（字节）
+MAX_BODY = 1 << 20
+
+# 单次批量请求的记录数上限
+MAX_BATCH = 1000
+
+FORMATS = ('json', 'text')
+
+
+class RequestError(Exception):
+    """请求错误，携带 HTTP 状态码"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _flag(value: Any) -> bool:
+    """查询参数或 JSON 字段转布尔值"""
+    if isinstance(value, str):
+        return value.lower() in ('1', 'true', 'yes', 'on')
+
+    return bool(value)
+
+
+def _params(value: Any) -> List[int]:
+    """解析并校验爻位参数"""
+    if value is None:
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'params is required')
+
+    try:
+        params = parse_params(value)
+    except (TypeError, ValueError):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f'invalid params: {value!r}')
+
+    if len(params) != 6 or any(p not in (1, 2, 3, 4) for p in params):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f'params must be 6 values in 1~4: {value!r}')
+
+    return params
+
+
+def _format(value: Any) -> str:
+    fmt = value or 'json'
+    if fmt not in FORMATS:
+        raise RequestError(HTTPStatus.BAD_REQUEST, f'format must be one of {FORMATS}')
+
+    return fmt
+
+
+def _render(result, verbose: Any = 0) -> str:
+    try:
+        verbose = min(max(int(verbose or 0), 0), 2)
+    except (TypeError, ValueError):
+        raise RequestError(HTTPStatus.BAD_REQUEST, f'invalid verbose: {verbose!r}')
+
+    najia = Najia(verbose)
+    najia.result = result
+    return najia.render()
+
+
+def handle_compile(body: Dict[str, Any]) -> Tuple[str, Any]:
+    """
+    单次排盘
+    :param body: 请求字段
+    :return: (format, 结果字典或渲染文本)
+    """
+    fmt = _format(body.get('format'))
+    try:
+        result = Najia().compile(
+            params=_params(body.get('params')),
+            date=body.get('date'),
+            gender=body.get('gender'),
+            title=body.get('title'),
+            guaci=_flag(body.get('guaci', False)),
+            yue_zhi=body.get('yue_zhi'),
+            ri_chen=body.get('ri_chen'),
+        ).result
+    except RequestError:
+        raise
+    except Exception as e:
+        raise RequestError(HTTPStatus.BAD_REQUEST, str(e))
+
+    if fmt == 'text':
+        return fmt, _render(result, body.get('verbose'))
+
+    return fmt, result.to_dict()
+
+
+def _batch_record(record: Any) -> Any:
+    """批量记录的爻位参数按 _params 解析校验（与 /compile 相同，接受 "221242" 等形式）"""
+    if isinstance(record, dict):
+        return {**record, 'params': _params(record.get('params'))}
+
+    return _params(record)
+
+
+def handle_batch(body: Dict[str, Any], max_batch: int = MAX_BATCH) -> Tuple[str, Any]:
+    """
+    批量排盘（在当前线程内顺序执行，并发由连接数决定）
+    :param body: 请求字段
+    :param max_batch: 记录数上限
+    :return: (format, 结果字典或渲染文本)
+    """
+    records = body.get('records')
+    if not isinstance(records, list):
+        raise RequestError(HTTPStatus.BAD_REQUEST, 'records must be a list')
+    if len(records) > max_batch:
+        raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'too many records (max {max_batch})')
+
+    fmt = _format(body.get('format'))
+    valid, items = [], []
+    for index, record in enumerate(records):
+        try:
+            valid.append((index, _batch_record(record)))
+        except RequestError as e:
+            params = record.get('params') if isinstance(record, dict) else record
+            items.append(BatchItemResult(index, error=f'Error processing params {params}: {e}'))
+
+    items.extend(_compile_records(valid, _flag(body.get('guaci', False))))
+    items.sort(key=lambda item: item.index)
+    errors = sum(1 for item in items if not item.ok)
+
+    if fmt == 'text':
+        return fmt, '\n'.join(
+            _render(item.result, body.get('verbose')) if item.ok else f'# {item.index}: {item.error}'
+            for item in items
+        )
+
+    return fmt, {
+        'results': [item.to_dict() for item in items],
+        'success_count': len(items) - errors,
+        'error_count': errors,
+    }
+
+
+class NajiaRequestHandler(BaseHTTPRequestHandler):
+    """请求处理器（HTTP/1.1 长连接）"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = f'najia/{__version__}'
+    # 响应头与响应体分两次写出，长连接下需关闭 Nagle 算法以免与客户端延迟确认叠加
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug('%s - %s', self.address_string(), format % args)
+
+    def _send(self, status: HTTPStatus, fmt: str, payload: Any) -> None:
+        if fmt == 'text':
+            data = payload.encode('utf-8')
+            content_type = 'text/plain; charset=utf-8'
+        else:
+            data = dumps_bytes(payload)
+            content_type = 'application/json; charset=utf-8'
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status: HTTPStatus, message: str) -> None:
+        self._send(status, 'json', {'error': message})
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = self.headers.get('Content-Length')
+        if length is None:
+            # 无法确定请求体边界（如分块上传），未读取的请求体不能当作下一个请求解析，响应后关闭连接
+            self.close_connection = True
+            raise RequestError(HTTPStatus.LENGTH_REQUIRED, 'Content-Length is required')
+
+        try:
+            length = int(length)
+        except ValueError:
+            length = -1
+
+        if length < 0:
+            # 负数长度会使 rfile.read 读到连接关闭为止，不读取请求体，响应后关闭连接
+            self.close_connection = True
+            raise RequestError(HTTPStatus.BAD_REQUEST, 'invalid Content-Length')
+
+        if length > self.server.max_body:
+            # 不读取超限的请求体，响应后关闭连接
+            self.close_connection = True
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f'request body too large (max {self.server.max_body})')
+
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError as e:
+            raise RequestError(HTTPStatus.BAD_REQUEST, f'invalid JSON: {e}')
+
+        if not isinstance(body, dict):
+            raise RequestError(HTTPStatus.BAD_REQUEST, 'request body must be a JSON object')
+
+        return body
+
+    def _dispatch(self, path: str, body: Dict[str, Any]) -> None:
+        try:
+            if path == '/compile':
+                fmt, payload = handle_compile(body)
+            elif path == '/batch':
+                fmt, payload = handle_batch(body, self.server.max_batch)
+            else:
+                raise RequestError(HTTPStatus.NOT_FOUND, f'not found: {path}')
+        except RequestError as e:
+            self._error(e.status, str(e))
+            return
+        except Exception as e:
+            logger.exception(e)
+            self._error(HTTPStatus.INTERNAL_SERVER_ERROR, 'internal error')
+            return
+
+        self._send(HTTPStatus.OK, fmt, payload)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == '/health':
+            self._send(HTTPStatus.OK, 'json', {'status': 'ok', 'version': __version__})
+        elif url.path == '/compile':
+            self._dispatch(url.path, dict(parse_qsl(url.query)))
+        else:
+            self._error(HTTPStatus.NOT_FOUND, f'not found: {url.path}')
+
+    def do_POST(self) -> None:
+        url = urlsplit(self.path)
+        try:
+            body = self._read_body()
+        except RequestError as e:
+            self._error(e.status, str(e))
+            return
+
+        self._dispatch(url.path, body)
+
+
+class NajiaHTTPServer(ThreadingHTTPServer):
+    """多线程 HTTP 服务"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, address: Tuple[str, int], max_body: int = MAX_BODY, max_batch: int = MAX_BATCH,
+                 handler=NajiaRequestHandler):
+        """
+        :param address: (host, port)，port 为 0 时自动分配
+        :param max_body: 请求体大小上限（字节）
+        :param max_batch: 单次批量请求的记录数上限
+        """
+        self.max_body = max_body
+        self.max_batch = max_batch
+        super().__init__(address, handler)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+
+def warm_up() -> None:
+    """预先构建静态卦表、节令表、卦辞索引，并编译默认模板"""
+    from .guaci import get_store
+    from .renderer import get_renderer
+
+    _warm_up()
+    get_store().names()
+    get_renderer().get_template()
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8000, max_body: int = MAX_BODY,
+                max_batch: int = MAX_BATCH) -> NajiaHTTPServer:
+    """
+    创建（已预热、已绑定端口的）服务实例，调用 serve_forever() 开始服务
+    """
+    warm_up()
+    return NajiaHTTPServer((host, port), max_body=max_body, max_batch=max_batch)
+
+
+def serve(host: str = '127.0.0.1', port: int = 8000, workers: int = 1, max_body: int = MAX_BODY,
+          max_batch: int = MAX_BATCH, ready: Optional[Any] = None) -> None:
+    """
+    启动服务（阻塞）
+    :param host: 监听地址
+    :param port: 监听端口
+    :param workers: 工作进程数，>1 时 fork 出多个进程共享监听套接字（仅限支持 fork 的平台）
+    :param max_body: 请求体大小上限（字节）
+    :param max_batch: 单次批量请求的记录数上限
+    :param ready: 开始服务前以服务实例调用的回调
+    """
+    server = make_server(host, port, max_body, max_batch)
+    if ready is not None:
+        ready(server)
+
+    if workers <= 1 or not hasattr(os, 'fork'):
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        children.append(pid)
+
+    def stop(*_: Any) -> None:
+        for child in children:
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    try:
+        for child in children:
+            os.waitpid(child, 0)
+    except KeyboardInterrupt:
+        stop()
+        for child in children:
+            os.waitpid(child, 0)
+    finally:
+        server.server_close()
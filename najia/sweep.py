@@ -0,0 +1,236 @@
+"""
+时间扫描
+
+对同一卦在一段时间内逐日（或逐时辰）计算时间维度属性：月令旺衰、月破、旬空、六神（按日辰）
+与六神（按日干，即结果的 god6），回答“哪些日子有利”一类的查询。
+
+与逐个时间点调用 Najia.compile 相比：
+- 静态卦象只查一次；
+- 日历增量推进：日辰序号逐日加 1（模 60），月建只在跨过节令当日时改变（节令表上的指针后移），
+  不解析日期字符串，也不逐点查日历；
+- 各时间点的属性是共享的不可变元组（按 (卦符, 月建, 日辰) 缓存），不复制。
+
+超出节令表范围（1900~2100）的日期逐日回退到 resolve_calendar。
+
+    from najia.sweep import sweep
+
+    result = sweep([2, 2, 1, 2, 4, 2], '2026-01-01', '2026-12-31')
+    for when, po in zip(result.times, result.yue_po):
+        ...
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from . import ganzhi
+from .const import GANS_DICT, ZHIS
+from .hexagram_table import get_static
+from .lunar_utils import resolve_calendar
+from .time_analysis import _time_block
+from .utils import get_god6
+
+DateLike = Union[str, date, datetime]
+
+# 步长：逐日、逐时辰（2 小时）
+STEPS: Dict[str, timedelta] = {
+    'day': timedelta(days=1),
+    'shichen': timedelta(hours=2),
+}
+
+
+@dataclass(frozen=True)
+class SweepPoint:
+    """一个时间点的时间维度属性（元组为共享的缓存数据）"""
+    time: datetime
+    yue_zhi: str                    # 月建地支
+    ri_chen: str                    # 日辰干支
+    yue_ling: Tuple[str, ...]       # 月令旺衰
+    yue_po: Tuple[bool, ...]        # 月破
+    xun_kong: Tuple[bool, ...]      # 旬空
+    liu_shen: Tuple[str, ...]       # 六神（按日辰）
+    god6: Tuple[str, ...]           # 六神（按日干，同 HexagramResult.god6）
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（与 HexagramResult.to_dict() 中的同名字段格式一致）"""
+        return {
+            'time': self.time.isoformat(),
+            'yue_zhi': self.yue_zhi,
+            'ri_chen': self.ri_chen,
+            'yue_ling': list(self.yue_ling),
+            'yue_po': list(self.yue_po),
+            'xun_kong': list(self.xun_kong),
+            'liu_shen': list(self.liu_shen),
+            'god6': list(self.god6),
+        }
+
+
+@dataclass
+class SweepResult:
+    """扫描结果（按列存放，每列与 times 等长）"""
+    params: Tuple[int, ...]
+    mark: str
+    name: str
+    times: List[datetime] = field(default_factory=list)
+    yue_zhi: List[str] = field(default_factory=list)
+    ri_chen: List[str] = field(default_factory=list)
+    yue_ling: List[Tuple[str, ...]] = field(default_factory=list)
+    yue_po: List[Tuple[bool, ...]] = field(default_factory=list)
+    xun_kong: List[Tuple[bool, ...]] = field(default_factory=list)
+    liu_shen: List[Tuple[str, ...]] = field(default_factory=list)
+    god6: List[Tuple[str, ...]] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def append(self, point: SweepPoint) -> None:
+        self.times.append(point.time)
+        self.yue_zhi.append(point.yue_zhi)
+        self.ri_chen.append(point.ri_chen)
+        self.yue_ling.append(point.yue_ling)
+        self.yue_po.append(point.yue_po)
+        self.xun_kong.append(point.xun_kong)
+        self.liu_shen.append(point.liu_shen)
+        self.god6.append(point.god6)
+
+    def point(self, i: int) -> SweepPoint:
+        """第 i 个时间点"""
+        return SweepPoint(self.times[i], self.yue_zhi[i], self.ri_chen[i], self.yue_ling[i], self.yue_po[i],
+                          self.xun_kong[i], self.liu_shen[i], self.god6[i])
+
+    def points(self) -> Iterator[SweepPoint]:
+        for i in range(len(self.times)):
+            yield self.point(i)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典（列式）"""
+        return {
+            'params': list(self.params),
+            'mark': self.mark,
+            'name': self.name,
+            'times': [t.isoformat() for t in self.times],
+            'yue_zhi': self.yue_zhi,
+            'ri_chen': self.ri_chen,
+            'yue_ling': [list(v) for v in self.yue_ling],
+            'yue_po': [list(v) for v in self.yue_po],
+            'xun_kong': [list(v) for v in self.xun_kong],
+            'liu_shen': [list(v) for v in self.liu_shen],
+            'god6': [list(v) for v in self.god6],
+        }
+
+
+def _to_datetime(value: DateLike) -> datetime:
+    """起止时间转为不带时区的 datetime（字符串按 ISO 格式解析，时区信息忽略，取字面时间）"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).replace(tzinfo=None)
+
+    raise TypeError(f'expected a date, datetime or ISO date string, got {value!r}')
+
+
+def _step(step: Union[str, timedelta]) -> timedelta:
+    if isinstance(step, timedelta):
+        delta = step
+    elif step in STEPS:
+        delta = STEPS[step]
+    else:
+        raise ValueError(f'step must be one of {tuple(STEPS)} or a timedelta, got {step!r}')
+
+    if delta <= timedelta(0):
+        raise ValueError(f'step must be positive, got {step!r}')
+
+    return delta
+
+
+# 六神（按日干）[日干序号]，只取决于日干，共 10 种
+_GOD6: Tuple[Tuple[str, ...], ...] = tuple(tuple(get_god6(ganzhi.ganzhi(gan))) for gan in range(10))
+
+
+def _god6(day_gz: str) -> Tuple[str, ...]:
+    return _GOD6[GANS_DICT[day_gz[0]]]
+
+
+class _DayCursor(object):
+    """
+    按日期单调推进的日历游标：日辰序号按相差天数取模，月建在跨过节令当日时后移。
+    只用于节令表范围内的日期。
+    """
+
+    def __init__(self, day: date):
+        self._days = ganzhi._table().days
+        self._ordinal = day.toordinal()
+        self.day_idx = ganzhi.day_index(day.year, day.month, day.day)
+        # 与 ganzhi.month_zhi_index 相同：最后一个不晚于当日的节令
+        self._k = bisect_right(self._days, self._ordinal - ganzhi._EPOCH_ORDINAL) - 1
+
+    def advance(self, day: date) -> None:
+        ordinal = day.toordinal()
+        self.day_idx = (self.day_idx + ordinal - self._ordinal) % 60
+        self._ordinal = ordinal
+
+        rel = ordinal - ganzhi._EPOCH_ORDINAL
+        days = self._days
+        while self._k + 1 < len(days) and days[self._k + 1] <= rel:
+            self._k += 1
+
+    @property
+    def month_zhi(self) -> int:
+        return (1 + self._k) % 12
+
+
+def iter_sweep(params: Sequence[int], start: DateLike, end: DateLike,
+               step: Union[str, timedelta] = 'day') -> Iterator[SweepPoint]:
+    """
+    逐个时间点产出时间维度属性
+    :param params: 爻位参数列表
+    :param start: 起始时间（含）
+    :param end: 结束时间（含）
+    :param step: day（逐日）、shichen（每 2 小时）或 timedelta
+    :return: SweepPoint 生成器
+    """
+    mark = get_static(params).mark
+    delta = _step(step)
+    t = _to_datetime(start)
+    stop = _to_datetime(end)
+
+    cursor: Optional[_DayCursor] = None
+    current: Optional[date] = None
+    point_fields: Tuple[Any, ...] = ()
+
+    while t <= stop:
+        day = t.date()
+        if day != current:
+            if ganzhi.MIN_DATE <= day <= ganzhi.MAX_DATE:
+                if cursor is None:
+                    cursor = _DayCursor(day)
+                else:
+                    cursor.advance(day)
+                yue_zhi = ZHIS[cursor.month_zhi]
+                ri_chen = ganzhi.ganzhi(cursor.day_idx)
+            else:
+                cursor = None
+                cal = resolve_calendar(day.year, day.month, day.day, t.hour)
+                yue_zhi, ri_chen = cal.month_zhi, cal.day_gz
+
+            point_fields = (yue_zhi, ri_chen) + _time_block(mark, yue_zhi, ri_chen) + (_god6(ri_chen),)
+            current = day
+
+        yield SweepPoint(t, *point_fields)
+        t += delta
+
+
+def sweep(params: Sequence[int], start: DateLike, end: DateLike,
+          step: Union[str, timedelta] = 'day') -> SweepResult:
+    """
+    扫描一段时间内的时间维度属性（参数同 iter_sweep）
+    :return: 列式扫描结果
+    """
+    static = get_static(params)
+    result = SweepResult(params=tuple(static.params), mark=static.mark, name=static.name)
+    for point in iter_sweep(params, start, end, step):
+        result.append(point)
+
+    return result
@@ -1,5 +1,7 @@
-from typing import List
-from .const import GANS, ZHIS, ZHI5, XING5
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from . import const
+from .const import GANS, GANS_DICT, ZHIS, ZHIS_DICT, ZHI5, XING5, XING5_DICT
 
 # Derive DIZHI_WUXING from const.ZHI5 + const.XING5
 # ZHI5 values are indices into XING5: ZHI5[idx] gives the element index
@@ -31,9 +33,8 @@ KE_RELATIONS = {
 }
 
 
-def calc_yue_ling(yao_wuxing: str, yue_zhi: str) -> str:
-    """计算月令旺衰：同我为旺，生我为相，我生为休，克我为囚，我克为死"""
-    yue_wuxing = DIZHI_WUXING[yue_zhi]
+def _wang_shuai(yao_wuxing: str, yue_wuxing: str) -> str:
+    """月令旺衰规则：同我为旺，生我为相，我生为休，克我为囚，我克为死"""
     if yue_wuxing == yao_wuxing:
         return '旺'
     if (yue_wuxing, yao_wuxing) in SHENG_CYCLE:
@@ -47,9 +48,39 @@ def calc_yue_ling(yao_wuxing: str, yue_zhi: str) -> str:
     return ''
 
 
+# 以下规则表在导入时由上面的规则一次性生成，按序号直接索引
+# 月令旺衰 [爻五行][月建地支]（5×12）
+WANG_SHUAI_TABLE: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(_wang_shuai(xing, DIZHI_WUXING[zhi]) for zhi in ZHIS) for xing in XING5
+)
+
+# 相冲 [爻地支][月建地支]（12×12）
+CHONG_TABLE: Tuple[Tuple[bool, ...], ...] = tuple(
+    tuple(CHONG_MAP[a] == b for b in ZHIS) for a in ZHIS
+)
+
+# 旬空 [日辰六十甲子序号][爻地支]（60×12），旬首地支前两位为空亡
+XUN_KONG_TABLE: Tuple[Tuple[bool, ...], ...] = tuple(
+    tuple((z - (i % 12 - i % 10)) % 12 >= 10 for z in range(12)) for i in range(60)
+)
+
+# 六神 [日干][爻位]（10×6）
+LIU_SHEN_TABLE: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(LIUSHEN_ORDER[(LIUSHEN_ORDER.index(LIUSHEN_START[gan]) + i) % 6] for i in range(6)) for gan in GANS
+)
+
+
+def calc_yue_ling(yao_wuxing: str, yue_zhi: str) -> str:
+    """计算月令旺衰：同我为旺，生我为相，我生为休，克我为囚，我克为死"""
+    row = ZHIS_DICT[yue_zhi]
+    xing = XING5_DICT.get(yao_wuxing)
+    return '' if xing is None else WANG_SHUAI_TABLE[xing][row]
+
+
 def is_yue_po(yao_dizhi: str, yue_zhi: str) -> bool:
     """若爻的地支与月建地支相冲，返回 True"""
-    return CHONG_MAP.get(yao_dizhi) == yue_zhi
+    a, b = ZHIS_DICT.get(yao_dizhi), ZHIS_DICT.get(yue_zhi)
+    return a is not None and b is not None and CHONG_TABLE[a][b]
 
 
 def get_xun_kong(ri_chen_gan_zhi: str) -> List[str]:
@@ -58,18 +89,14 @@ def get_xun_kong(ri_chen_gan_zhi: str) -> List[str]:
     """
     if len(ri_chen_gan_zhi) not in (2, 3):
         return []
-    gan = ri_chen_gan_zhi[0]
-    zhi = ri_chen_gan_zhi[1:]
-    try:
-        gan_index = GANS.index(gan)
-        zhi_index = ZHIS.index(zhi)
-        start_zhi_index = (zhi_index - gan_index) % 12
-        kong1 = ZHIS[(start_zhi_index - 2) % 12]
-        kong2 = ZHIS[(start_zhi_index - 1) % 12]
-        return [kong1, kong2]
-    except ValueError:
+    gan_index = GANS_DICT.get(ri_chen_gan_zhi[0])
+    zhi_index = ZHIS_DICT.get(ri_chen_gan_zhi[1:])
+    if gan_index is None or zhi_index is None:
         return []
 
+    start_zhi_index = (zhi_index - gan_index) % 12
+    return [ZHIS[(start_zhi_index - 2) % 12], ZHIS[(start_zhi_index - 1) % 12]]
+
 
 def is_xun_kong(yao_dizhi: str, ri_chen_gan_zhi: str) -> bool:
     """若爻的地支属于该日的旬空地支，返回 True"""
@@ -80,8 +107,51 @@ def calc_liu_shen(yao_position: int, ri_chen_gan_zhi: str) -> str:
     """
     根据爻位（0~5，初爻至上爻）和日辰干支，返回六神名称。
     """
-    gan = ri_chen_gan_zhi[0]
-    start = LIUSHEN_START.get(gan, '青龙')
-    start_index = LIUSHEN_ORDER.index(start)
-    liu_shen_index = (start_index + yao_position) % 6
-    return LIUSHEN_ORDER[liu_shen_index]
+    gan = GANS_DICT.get(ri_chen_gan_zhi[0])
+    if gan is None:
+        # 非法日干按甲乙（青龙）起
+        return LIUSHEN_ORDER[yao_position % 6]
+    return LIU_SHEN_TABLE[gan][yao_position % 6]
+
+
+# 干支 -> 六十甲子序号
+_GANZHI_INDEX = {GANS[i % 10] + ZHIS[i % 12]: i for i in range(60)}
+
+TimeBlock = Tuple[Optional[List[str]], Optional[List[bool]], Optional[List[bool]], Optional[List[str]]]
+
+
+@lru_cache(maxsize=65536)
+def _time_block(mark: str, yue_zhi: Optional[str], ri_chen: Optional[str]) -> Tuple[
+        Optional[Tuple[str, ...]], Optional[Tuple[bool, ...]], Optional[Tuple[bool, ...]], Optional[Tuple[str, ...]]]:
+    """time_block 的缓存实现（返回不可变元组，64 卦 × 12 月建 × 60 日辰）"""
+    yue_ling = yue_po = xun_kong = liu_shen = None
+    dizhi = [ZHIS_DICT[gz[1]] for gz in const.NAJIA_PRECOMPUTED[mark]]
+
+    month = ZHIS_DICT.get(yue_zhi) if yue_zhi else None
+    if month is not None:
+        yue_ling = tuple(WANG_SHUAI_TABLE[ZHI5[d]][month] for d in dizhi)
+        yue_po = tuple(CHONG_TABLE[d][month] for d in dizhi)
+
+    if ri_chen is not None:
+        day = _GANZHI_INDEX.get(ri_chen)
+        if day is not None:
+            xun_kong = tuple(XUN_KONG_TABLE[day][d] for d in dizhi)
+        else:
+            # 非标准日辰（如阴阳不配的干支）按规则函数逐爻计算
+            kong = get_xun_kong(ri_chen)
+            xun_kong = tuple(ZHIS[d] in kong for d in dizhi)
+        if ri_chen:
+            liu_shen = tuple(calc_liu_shen(i, ri_chen) for i in range(6))
+
+    return yue_ling, yue_po, xun_kong, liu_shen
+
+
+def time_block(mark: str, yue_zhi: Optional[str], ri_chen: Optional[str]) -> TimeBlock:
+    """
+    计算一卦六爻的时间维度属性（按 (卦符, 月建, 日辰) 缓存，每次返回新列表，调用方可修改）
+    :param mark: 卦符（如'111000'）
+    :param yue_zhi: 月建地支，非法地支时不计算月令与月破
+    :param ri_chen: 日辰干支
+    :return: (月令旺衰, 月破, 旬空, 六神)，不适用的项为 None
+    """
+    return tuple(None if v is None else list(v) for v in _time_block(mark, yue_zhi, ri_chen))
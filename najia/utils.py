@@ -1,8 +1,7 @@
 import logging
 import math
 from functools import lru_cache
-from pathlib import Path
-from typing import Tuple, List, Optional, Dict, Any, Union
+from typing import Tuple, List, Optional, Union
 
 from . import const
 from .log import setup_logger
@@ -290,16 +289,28 @@ def get_qin6(w1: str | int, w2: str | int) -> str:
     return q6
 
 
-def get_guaci(name: str) -> Optional[Dict[str, Any]]:
-    import json
+def get_guaci(name: str) -> Optional[str]:
+    """
+    查询卦辞（按需从索引化的卦辞存储读取，见 guaci.py）
+    :param name: 卦名
+    :return: 卦辞文本，不存在时返回 None
+    """
+    from .guaci import get_store
 
     try:
-        result = Path(__file__).parent / 'data' / 'guaci.json'
-        with open(result, encoding='utf-8') as f:
-            data = json.load(f)
-        result = data.get(name)
-
-        return result
+        return get_store().get(name)
     except Exception as ex:
         logger.exception(ex)
         return None
+
+
+def parse_params(params: Union[str, List[int]]) -> List[int]:
+    """
+    解析爻位参数：支持 '112234' / '1,1,2,2,3,4' 或整数列表，0 视为 4
+    :param params: 爻位参数
+    :return: 整数列表
+    """
+    if isinstance(params, str):
+        params = [int(x) for x in params.replace(',', '')]
+
+    return [int(str(x).replace('0', '4')) for x in params]
@@ -0,0 +1,352 @@
+"""
+性能基准
+
+运行全部基准并与基线比较（超过阈值时退出码为 1）：
+    python tests/benchmark.py
+更新基线（建议多跑几遍取最小值）：
+    python tests/benchmark.py --save --rounds 3
+只运行部分基准：
+    python tests/benchmark.py -k compile -k batch
+
+每项记录单次操作的耗时（秒，多轮取最小值）。不同机器的绝对耗时差异很大，比较时默认
+先除以同一次运行中的校准循环耗时（纯 Python 计算），即比较“相对本机速度”的耗时；
+--absolute 改为直接比较秒数。基线文件同时记录运行环境，便于判断是否可比。
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+# 默认基线文件
+BASELINE_PATH = Path(__file__).parent / 'benchmark_baseline.json'
+
+# 默认回归阈值：比基线慢 50% 以上视为回归
+DEFAULT_THRESHOLD = 0.5
+
+# 每轮最短计时（秒）
+MIN_ROUND_TIME = 0.05
+
+PARAMS = [2, 2, 1, 2, 4, 2]
+DATE = '2019-12-25 00:20'
+
+
+def _records(n: int) -> List[dict]:
+    """批量基准输入：参数与日期轮换"""
+    return [
+        {'params': [1 + (i + k) % 4 for k in range(6)], 'date': f'20{10 + i % 15}-0{1 + i % 9}-1{i % 10} {i % 24:02d}:00'}
+        for i in range(n)
+    ]
+
+
+def measure(fn: Callable[[], object], repeat: int = 5, min_time: float = MIN_ROUND_TIME) -> float:
+    """
+    多轮计时（与 timeit 相同，计时期间关闭垃圾回收），返回单次操作的最小耗时（秒）
+    每轮次数自动确定，使一轮至少持续 min_time 秒，以降低短操作的计时噪声
+    """
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= max(2, min(10, int(min_time / max(elapsed, 1e-9)) + 1))
+
+    return min(timer.repeat(repeat, number)) / number
+
+
+def _calibration() -> Callable[[], object]:
+    def loop():
+        total = 0
+        for i in range(10000):
+            total += i * i % 7
+        return total
+
+    return loop
+
+
+def _compile_nodate():
+    from najia.najia import Najia
+    return lambda: Najia().compile(params=PARAMS)
+
+
+def _compile_date():
+    from najia.najia import Najia
+    return lambda: Najia().compile(params=PARAMS, date=DATE)
+
+
+def _compile_guaci():
+    from najia.najia import Najia
+    return lambda: Najia().compile(params=PARAMS, date=DATE, guaci=True)
+
+
+def _render():
+    from najia.najia import Najia
+    najia = Najia(2).compile(params=PARAMS, date=DATE, guaci=True)
+    return najia.render
+
+
+def _export():
+    from najia.najia import Najia
+    return Najia().compile(params=PARAMS, date=DATE, guaci=True).export
+
+
+def _to_json():
+    from najia.najia import Najia
+    return Najia().compile(params=PARAMS, date=DATE, guaci=True).result.to_json
+
+
+def _to_json_compact():
+    from najia.compact import CompactHexagramResult
+    from najia.najia import Najia
+    result = Najia().compile(params=PARAMS, date=DATE, guaci=True).result
+    return CompactHexagramResult.from_result(result).to_json
+
+
+def _batch(executor: str) -> Callable[[], Callable[[], object]]:
+    def setup():
+        from najia.batch import BatchProcessor
+
+        records = _records(200)
+        processor = BatchProcessor(max_workers=2, executor=executor)
+        return lambda: list(processor.iter_batch(records))
+
+    return setup
+
+
+def _process_batch(executor: str) -> Callable[[], Callable[[], object]]:
+    """
+    process_batch 基准（覆盖去重分发、日历小时桶共享构建与按日历局部性分块）：
+    输入中一半是完全相同的重复请求，另一半与前者同一小时桶、不同分钟
+    """
+    def setup():
+        from najia.batch import BatchProcessor
+
+        records = _records(50)
+        params = [r['params'] for r in records] * 4
+        dates = [r['date'] for r in records] * 2 + [r['date'][:-2] + '30' for r in records] * 2
+        processor = BatchProcessor(max_workers=2, executor=executor)
+        return lambda: processor.process_batch(params, dates)
+
+    return setup
+
+
+def _calendar_cold():
+    from najia.lunar_utils import calendar_cache_clear, resolve_calendar
+
+    def run():
+        calendar_cache_clear()
+        return resolve_calendar(2019, 12, 25, 0)
+
+    return run
+
+
+def _calendar_cached():
+    from najia.lunar_utils import resolve_calendar
+    return lambda: resolve_calendar(2019, 12, 25, 0)
+
+
+def _calendar_lunar():
+    from najia.lunar_utils import _resolve_lunar
+    return lambda: _resolve_lunar(2019, 12, 25, 0)
+
+
+def _guaci():
+    from najia.utils import get_guaci
+    return lambda: get_guaci('地山谦')
+
+
+def _import_time():
+    code = 'import time; t = time.perf_counter(); from najia import Najia; print(time.perf_counter() - t)'
+    env = dict(os.environ, PYTHONPATH=str(ROOT))
+
+    def run():
+        out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True, check=True)
+        return float(out.stdout)
+
+    return run
+
+
+# 基准名 -> 构造被测函数（import_time 单独在子进程中测量）
+BENCHMARKS: Dict[str, Optional[Callable[[], Callable[[], object]]]] = {
+    'calibration': _calibration,
+    'compile_nodate': _compile_nodate,
+    'compile_date': _compile_date,
+    'compile_guaci': _compile_guaci,
+    'render': _render,
+    'export': _export,
+    'to_json': _to_json,
+    'to_json_compact': _to_json_compact,
+    'batch_sequential_200': _batch('sequential'),
+    'batch_threads_200': _batch('threads'),
+    'batch_processes_200': _batch('processes'),
+    'process_batch_sequential_200': _process_batch('sequential'),
+    'process_batch_threads_200': _process_batch('threads'),
+    'process_batch_processes_200': _process_batch('processes'),
+    'calendar_cold': _calendar_cold,
+    'calendar_cached': _calendar_cached,
+    'calendar_lunar': _calendar_lunar,
+    'get_guaci': _guaci,
+    'import_time': None,
+}
+
+
+def _median_import_time(runs: int = 5) -> float:
+    """导入耗时在子进程中测量（首次导入），取中位数"""
+    run = _import_time()
+    values = sorted(run() for _ in range(runs))
+    return values[len(values) // 2]
+
+
+def run_benchmarks(selected: Optional[List[str]] = None, repeat: int = 5, rounds: int = 1) -> Dict[str, float]:
+    """
+    运行基准
+    :param selected: 名称包含任一子串的基准才运行（校准循环总是运行）
+    :param repeat: 每项的计时轮数
+    :param rounds: 整套基准的运行遍数，每项取各遍最小值（分散机器负载波动的影响）
+    :return: 基准名 -> 单次操作耗时（秒）
+    """
+    results = {}
+    for _ in range(max(1, rounds)):
+        for name, setup in BENCHMARKS.items():
+            if selected and name != 'calibration' and not any(s in name for s in selected):
+                continue
+
+            if name == 'import_time':
+                value = _median_import_time(repeat)
+            else:
+                value = measure(setup(), repeat)
+            results[name] = min(value, results.get(name, value))
+
+    return results
+
+
+def environment() -> Dict[str, str]:
+    """运行环境信息"""
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'cpus': str(os.cpu_count()),
+        'date': datetime.now().isoformat(timespec='seconds'),
+    }
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Optional[dict]:
+    if not Path(path).exists():
+        return None
+
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results: Dict[str, float], path: Path = BASELINE_PATH) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'results': results}, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def compare(results: Dict[str, float], baseline: dict, threshold: float = DEFAULT_THRESHOLD,
+            normalize: bool = True) -> List[dict]:
+    """
+    与基线比较
+    :param results: 本次结果
+    :param baseline: 基线（load_baseline 的返回值）
+    :param threshold: 回归阈值，ratio > 1 + threshold 视为回归
+    :param normalize: 是否按校准循环耗时归一化
+    :return: 每项的比较结果 {name, baseline, current, ratio, regression}
+    """
+    base = baseline['results']
+    scale = 1.0
+    if normalize and results.get('calibration') and base.get('calibration'):
+        scale = base['calibration'] / results['calibration']
+
+    rows = []
+    for name, current in results.items():
+        if name == 'calibration' or name not in base:
+            continue
+
+        ratio = current * scale / base[name] if base[name] else 1.0
+        rows.append({
+            'name': name,
+            'baseline': base[name],
+            'current': current,
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+
+    return rows
+
+
+def _format_time(seconds: float) -> str:
+    for unit, factor in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= factor:
+            return f'{seconds / factor:.2f} {unit}'
+
+    return f'{seconds / 1e-9:.0f} ns'
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='najia benchmarks')
+    parser.add_argument('-k', dest='selected', action='append', help='只运行名称包含该子串的基准（可多次指定）')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help='基线文件')
+    parser.add_argument('--save', action='store_true', help='把本次结果写入基线文件')
+    parser.add_argument('--threshold', type=float,
+                        default=float(os.environ.get('NAJIA_BENCH_THRESHOLD', DEFAULT_THRESHOLD)),
+                        help='回归阈值（0.5 表示慢 50%%）')
+    parser.add_argument('--absolute', action='store_true', help='不按校准循环归一化')
+    parser.add_argument('--repeat', type=int, default=5, help='每项的计时轮数')
+    parser.add_argument('--rounds', type=int, default=int(os.environ.get('NAJIA_BENCH_ROUNDS', 1)),
+                        help='整套基准的运行遍数（取最小值）')
+    parser.add_argument('--json', dest='json_out', type=Path, help='把本次结果写入 JSON 文件')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.selected, args.repeat, args.rounds)
+
+    if args.json_out:
+        with open(args.json_out, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'results': results}, f, ensure_ascii=False, indent=2)
+
+    if args.save:
+        baseline = load_baseline(args.baseline)
+        merged = dict(baseline['results']) if baseline and args.selected else {}
+        merged.update(results)
+        save_baseline(merged, args.baseline)
+        for name, value in results.items():
+            print(f'{name:28s} {_format_time(value):>12s}')
+        print(f'baseline saved to {args.baseline}')
+        return 0
+
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        for name, value in results.items():
+            print(f'{name:28s} {_format_time(value):>12s}')
+        print(f'no baseline at {args.baseline}, run with --save to create one')
+        return 0
+
+    rows = compare(results, baseline, args.threshold, not args.absolute)
+    failed = [row for row in rows if row['regression']]
+    for row in rows:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(f"{row['name']:28s} {_format_time(row['baseline']):>12s} -> {_format_time(row['current']):>12s}"
+              f"  x{row['ratio']:.2f} {flag}")
+
+    if failed:
+        print(f"{len(failed)} benchmark(s) regressed more than {args.threshold:.0%}: "
+              f"{', '.join(row['name'] for row in failed)}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
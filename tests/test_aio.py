@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from najia import batch
+from najia.aio import AsyncBatchProcessor, compile_async
+from najia.najia import Najia
+
+
+def test_compile_async():
+    async def main():
+        return await compile_async([2, 2, 1, 2, 4, 2], date='2019-12-25 00:20', guaci=True)
+
+    result = asyncio.run(main())
+    expected = Najia().compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20', guaci=True).result
+
+    assert result.to_dict() == expected.to_dict()
+
+
+def test_aiter_batch_ordered_and_errors():
+    records = [[1, 2, 3, 4, 1, 2], {'params': [1, 1, 1, 1, 1, 1], 'date': '2024-01-01 10:00'}, {'date': 'x'}]
+
+    async def main():
+        async with AsyncBatchProcessor(max_workers=2) as processor:
+            return [item async for item in processor.aiter_batch(records)]
+
+    items = asyncio.run(main())
+
+    assert [item.index for item in items] == [0, 1, 2]
+    assert [item.ok for item in items] == [True, True, False]
+    assert items[1].result.name == '乾为天'
+
+
+def test_aiter_batch_async_source_unordered():
+    async def source():
+        for i in range(20):
+            await asyncio.sleep(0)
+            yield [1 + i % 4, 2, 3, 4, 1, 2]
+
+    async def main():
+        async with AsyncBatchProcessor(max_workers=2, max_concurrency=3) as processor:
+            return [item async for item in processor.aiter_batch(source(), ordered=False)]
+
+    items = asyncio.run(main())
+
+    assert sorted(item.index for item in items) == list(range(20))
+    assert all(item.ok for item in items)
+
+
+def test_concurrency_cap_and_item_timeout(monkeypatch):
+    lock = threading.Lock()
+    running = [0, 0]
+    original = batch._compile_records
+
+    def slow(records, guaci):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.3 if records[0][0] == 1 else 0.01)
+        with lock:
+            running[0] -= 1
+        return original(records, guaci)
+
+    monkeypatch.setattr('najia.aio._compile_records', slow)
+
+    async def main():
+        async with AsyncBatchProcessor(max_workers=4, max_concurrency=2, item_timeout=0.1) as processor:
+            return [item async for item in processor.aiter_batch([[1, 2, 3, 4, 1, 2]] * 6)]
+
+    items = asyncio.run(main())
+
+    assert running[1] <= 2
+    assert [item.ok for item in items] == [True, False, True, True, True, True]
+    assert 'timed out' in items[1].error
+
+
+def test_cancellation():
+    started = threading.Event()
+
+    async def main():
+        processor = AsyncBatchProcessor(max_workers=1, max_concurrency=2)
+
+        async def consume():
+            async for _ in processor.aiter_batch([[1, 2, 3, 4, 1, 2]] * 1000):
+                started.set()
+                await asyncio.sleep(10)
+
+        task = asyncio.ensure_future(consume())
+        while not started.is_set():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await processor.close()
+
+    asyncio.run(asyncio.wait_for(main(), 10))
+
+
+def test_invalid_executor():
+    with pytest.raises(ValueError):
+        AsyncBatchProcessor(executor='sequential')
+
+
+def test_processor_reused_across_event_loops():
+    processor = AsyncBatchProcessor(max_workers=2, max_concurrency=1)
+
+    async def main():
+        # 名额争用时信号量才绑定事件循环
+        calls = [processor.compile([2, 2, 1, 2, 4, 2], date='2019-12-25 00:20') for _ in range(3)]
+        return [r.name for r in await asyncio.gather(*calls)]
+
+    try:
+        assert asyncio.run(main()) == ['地山谦'] * 3
+        assert asyncio.run(main()) == ['地山谦'] * 3
+    finally:
+        asyncio.run(processor.close())
+
+
+def test_release_after_loop_closed(monkeypatch, caplog):
+    finished = threading.Event()
+    original = batch._compile_records
+
+    def slow(records, guaci):
+        time.sleep(0.3)
+        try:
+            return original(records, guaci)
+        finally:
+            finished.set()
+
+    monkeypatch.setattr('najia.aio._compile_records', slow)
+    processor = AsyncBatchProcessor(max_workers=1, item_timeout=0.05)
+
+    async def main():
+        return [item async for item in processor.aiter_batch([[1, 2, 3, 4, 1, 2]])]
+
+    items = asyncio.run(main())
+    assert 'timed out' in items[0].error
+
+    # 事件循环已关闭后任务才结束，归还名额时不应报错
+    assert finished.wait(5)
+    time.sleep(0.05)
+    asyncio.run(processor.close())
+    assert not [r for r in caplog.records if r.levelname in ('ERROR', 'CRITICAL')]
+
+
+def test_submit_failure_releases_slot():
+    from concurrent.futures import ThreadPoolExecutor
+
+    pool = ThreadPoolExecutor(max_workers=1)
+    pool.shutdown()
+    processor = AsyncBatchProcessor(executor=pool, max_concurrency=1)
+
+    async def main():
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(processor.compile([2, 2, 1, 2, 4, 2]), timeout=2)
+
+    asyncio.run(main())
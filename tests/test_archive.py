@@ -0,0 +1,88 @@
+import dataclasses
+import random
+
+import pytest
+
+from najia.archive import HEADER, RECORD, ArchiveReader, ArchiveWriter, pack, unpack
+from najia.najia import Najia
+
+
+def _results(n, seed=3):
+    rng = random.Random(seed)
+    results = []
+    for i in range(n):
+        params = [rng.randint(1, 4) for _ in range(6)]
+        date = None if i % 10 == 0 else (
+            f'{rng.randint(1850, 2150)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} '
+            f'{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}'
+        )
+        kwargs = {'yue_zhi': '寅', 'ri_chen': '甲子'} if i % 13 == 0 else {}
+        results.append(Najia().compile(params=params, date=date, guaci=i % 3 == 0, **kwargs).result)
+
+    return results
+
+
+def test_pack_roundtrip():
+    for result in _results(300):
+        data = pack(result)
+        assert len(data) == RECORD.size
+        assert unpack(data).to_dict() == result.to_dict()
+
+
+def test_pack_rejects_invalid_params():
+    compact = Najia().compile_compact(params=[1, 2, 3, 4, 1, 2])
+    compact.static = dataclasses.replace(compact.static, key=None)
+    with pytest.raises(ValueError):
+        pack(compact)
+
+
+def test_archive_random_access_and_scan(tmp_path):
+    path = tmp_path / 'casts.njar'
+    results = _results(500)
+
+    with ArchiveWriter(path) as writer:
+        assert writer.write_many(results) == 500
+
+    assert path.stat().st_size == HEADER.size + 500 * RECORD.size
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 500
+        for index in (0, 1, 250, 499, -1):
+            assert reader[index].to_dict() == results[index].to_dict()
+        with pytest.raises(IndexError):
+            reader[500]
+
+        assert [r.to_dict() for r in reader] == [r.to_dict() for r in results]
+        assert [c.to_dict() for c in reader.iter_compact(100, 110)] == [r.to_dict() for r in results[100:110]]
+
+
+def test_archive_append_drops_partial_record(tmp_path):
+    path = tmp_path / 'casts.njar'
+    results = _results(20)
+
+    with ArchiveWriter(path) as writer:
+        writer.write_many(results[:10])
+    with open(path, 'ab') as f:
+        f.write(pack(results[10])[:7])
+
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 10
+
+    with ArchiveWriter(path, append=True) as writer:
+        writer.write_many(results[10:])
+
+    with ArchiveReader(path) as reader:
+        assert [r.to_dict() for r in reader] == [r.to_dict() for r in results]
+
+
+def test_empty_archive_and_bad_header(tmp_path):
+    path = tmp_path / 'empty.njar'
+    ArchiveWriter(path).close()
+    with ArchiveReader(path) as reader:
+        assert len(reader) == 0
+        assert list(reader) == []
+
+    bad = tmp_path / 'bad.njar'
+    bad.write_bytes(b'{"not": "an archive"}')
+    with pytest.raises(ValueError):
+        ArchiveReader(bad)
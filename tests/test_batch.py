@@ -0,0 +1,248 @@
+import threading
+import time
+
+import pytest
+
+from najia import batch as batch_module
+from najia.batch import BatchProcessor, plan_chunks
+
+PARAMS = [[2, 2, 1, 2, 4, 2], [1, 1, 1, 1, 1, 1], [1, 2, 3, 4, 1, 2], [2, 2, 2, 1, 2, 1], [4, 3, 4, 3, 4, 3]]
+DATES = ['2019-12-25 00:20', '2023-01-01 12:00', '2024-02-04 16:00', '2024-02-04 17:00', '2026-02-13']
+
+
+def test_executor_option():
+    with pytest.raises(ValueError):
+        BatchProcessor(executor='fibers')
+
+
+@pytest.mark.parametrize('executor', ['threads', 'processes', 'sequential'])
+def test_executors_keep_input_order(executor):
+    processor = BatchProcessor(max_workers=2, executor=executor, chunk_size=2)
+    batch = processor.process_batch(PARAMS, dates=DATES)
+    expected = BatchProcessor(executor='sequential').process_batch(PARAMS, dates=DATES)
+
+    assert batch.success_count == len(PARAMS)
+    assert batch.error_count == 0
+    assert [r.to_dict() for r in batch.results] == [r.to_dict() for r in expected.results]
+
+
+def test_processes_report_errors():
+    processor = BatchProcessor(max_workers=2, executor='processes')
+    batch = processor.process_batch([[1, 1, 1, 1, 1, 1], [1, 2]], dates=DATES[:2])
+
+    assert batch.success_count == 1
+    assert batch.error_count == 1
+    assert len(batch.errors) == 1
+
+
+@pytest.mark.parametrize('executor', ['threads', 'processes', 'sequential'])
+def test_iter_batch_ordered(executor):
+    records = ({'params': p, 'date': d} for p, d in zip(PARAMS, DATES))
+    processor = BatchProcessor(max_workers=2, executor=executor, chunk_size=2)
+    items = list(processor.iter_batch(records, max_in_flight=2))
+    expected = BatchProcessor(executor='sequential').process_batch(PARAMS, dates=DATES)
+
+    assert [item.index for item in items] == list(range(len(PARAMS)))
+    assert [item.result.to_dict() for item in items] == [r.to_dict() for r in expected.results]
+
+
+def test_iter_batch_unordered_with_errors():
+    records = [[1, 1, 1, 1, 1, 1], {'date': '2020-01-01'}, [1, 2], {'params': [2, 2, 2, 2, 2, 2], 'guaci': True}]
+    items = list(BatchProcessor(max_workers=2).iter_batch(iter(records), ordered=False))
+
+    assert sorted(item.index for item in items) == [0, 1, 2, 3]
+    by_index = {item.index: item for item in items}
+    assert by_index[0].ok and by_index[3].ok
+    assert by_index[3].result.guaci is not None
+    assert not by_index[1].ok and not by_index[2].ok
+    assert by_index[2].to_dict() == {'index': 2, 'error': by_index[2].error}
+
+
+def test_iter_batch_is_lazy():
+    consumed = []
+
+    def records():
+        for i in range(1000):
+            consumed.append(i)
+            yield [1, 2, 1, 2, 1, 2]
+
+    stream = BatchProcessor(max_workers=2).iter_batch(records(), max_in_flight=4)
+    next(stream)
+    stream.close()
+
+    assert len(consumed) < 20
+
+
+@pytest.mark.parametrize('executor', ['threads', 'processes', 'sequential'])
+def test_dedup_fans_out_shared_results(executor):
+    params = [PARAMS[0], PARAMS[1], PARAMS[0], PARAMS[0], PARAMS[1], [1, 2], [1, 2]]
+    dates = ['2019-12-25 00:20', '2023-01-01 12:00', '2019-12-25 00:20', '2019-12-25 00:45',
+             '2023-01-01 12:30', '2023-01-01', '2023-01-01']
+
+    batch = BatchProcessor(max_workers=2, executor=executor, chunk_size=8).process_batch(params, dates=dates)
+    expected = BatchProcessor(executor='sequential', dedup=False).process_batch(params, dates=dates)
+
+    assert [r.to_dict() for r in batch.results] == [r.to_dict() for r in expected.results]
+    assert batch.errors == expected.errors and batch.error_count == 2
+    assert batch.results[0] is not batch.results[2]
+    batch.results[0].qin6[0] = 'x'
+    batch.results[0].lunar['gz']['day'] = 'x'
+    assert batch.results[2].to_dict() == expected.results[2].to_dict()
+    assert batch.results[3].to_dict()['qin6'] == expected.results[3].qin6
+    assert batch.results[3].solar.startswith('2019-12-25T00:45')
+    assert (batch.request_count, batch.unique_count, batch.computed_count) == (7, 5, 2)
+    assert expected.computed_count == 5
+    assert batch.to_dict()['dedup'] == {'requests': 7, 'unique': 5, 'computed': 2, 'buckets': 3}
+
+
+def test_iter_batch_dedup_matches_plain():
+    records = [{'params': PARAMS[i % 2], 'date': f'2024-03-01 10:{i:02d}'} for i in range(20)]
+    shared = [item.result.to_dict() for item in BatchProcessor(executor='sequential').iter_batch(records)]
+    plain = [item.result.to_dict() for item in BatchProcessor(executor='sequential', dedup=False).iter_batch(records)]
+
+    assert shared == plain
+    assert len({r['solar'] for r in shared}) == 20
+
+
+def test_plan_chunks_groups_by_calendar_hour():
+    dates = ['2024-03-02 10:05', '2024-03-01 09:00', None, '2024-03-02 10:40', 'next tuesday',
+             '2024-03-01T09:30:00+08:00', '2024-03-02 11:00', '2024-03-01']
+    items = [([1, 1, 1, 1, 1, 1], date, None, None) for date in dates]
+
+    chunks, buckets = plan_chunks(items, size=3)
+    assert buckets == 6
+    assert sorted(i for chunk in chunks for i in chunk) == list(range(len(items)))
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    # 同一小时桶的任务在同一分块内且相邻
+    flat = [i for chunk in chunks for i in chunk]
+    assert abs(flat.index(0) - flat.index(3)) == 1
+    assert abs(flat.index(1) - flat.index(5)) == 1
+    assert any({0, 3} <= set(chunk) for chunk in chunks)
+
+    # 超过分块大小的桶才拆开
+    chunks, buckets = plan_chunks(items[:1] * 7, size=3)
+    assert buckets == 1 and [len(chunk) for chunk in chunks] == [3, 3, 1]
+
+
+@pytest.mark.parametrize('executor', ['threads', 'processes'])
+def test_locality_plan_keeps_input_order(executor):
+    params = [PARAMS[i % len(PARAMS)] for i in range(40)]
+    dates = [DATES[(i * 7) % len(DATES)] for i in range(40)]
+
+    batch = BatchProcessor(max_workers=2, executor=executor, chunk_size=4).process_batch(params, dates=dates)
+    plain = BatchProcessor(executor='sequential', dedup=False, locality=False).process_batch(params, dates=dates)
+
+    assert [r.to_dict() for r in batch.results] == [r.to_dict() for r in plain.results]
+    assert batch.bucket_count == len(DATES)
+
+
+def test_iter_batch_keeps_every_worker_busy(monkeypatch):
+    compile_records = batch_module._compile_records
+    lock = threading.Lock()
+    running = [0, 0]  # 当前在途分块数、最大在途分块数
+
+    def tracked(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            running[1] = max(running)
+        time.sleep(0.02)
+        try:
+            return compile_records(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(batch_module, '_compile_records', tracked)
+    processor = BatchProcessor(max_workers=4, executor='threads', chunk_size=16)
+    records = [[1, 2, 3, 4, 1, 2]] * (16 * 12)
+
+    items = list(processor.iter_batch(records))
+    assert len(items) == len(records) and all(item.ok for item in items)
+    # 默认 max_in_flight = 4 * 16 条 = 4 个分块，4 个工作者同时工作
+    assert running[1] == 4
+
+
+@pytest.mark.parametrize('max_in_flight, busy', [(1, 1), (10, 4), (40, 4)])
+def test_iter_batch_honours_max_in_flight(monkeypatch, max_in_flight, busy):
+    compile_records = batch_module._compile_records
+    lock = threading.Lock()
+    running = [0, 0, 0]  # 当前在途记录数、最大在途记录数、最大在途分块数
+    chunks = [0]
+
+    def tracked(chunk, *args, **kwargs):
+        with lock:
+            running[0] += len(chunk)
+            chunks[0] += 1
+            running[1] = max(running[1], running[0])
+            running[2] = max(running[2], chunks[0])
+        time.sleep(0.02)
+        try:
+            return compile_records(chunk, *args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= len(chunk)
+                chunks[0] -= 1
+
+    monkeypatch.setattr(batch_module, '_compile_records', tracked)
+    processor = BatchProcessor(max_workers=4, executor='threads', chunk_size=16)
+    records = [[1, 2, 3, 4, 1, 2]] * 64
+
+    items = list(processor.iter_batch(records, max_in_flight=max_in_flight))
+    assert [item.index for item in items] == list(range(len(records))) and all(item.ok for item in items)
+    assert running[1] <= max_in_flight
+    assert running[2] == busy
+
+
+def test_shared_compiler_counts_each_bucket_once():
+    from concurrent.futures import ThreadPoolExecutor
+
+    compiler = batch_module._SharedCompiler()
+    dates = [f'2024-03-01 10:{i:02d}' for i in range(60)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda d: compiler.compile(PARAMS[0], d), dates * 4))
+
+    assert compiler.computed == 1
+    assert len({id(r) for r in results}) == len(results)
+
+
+def test_shared_compiler_builds_outside_lock(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    from najia.najia import Najia
+
+    build = Najia._build_result
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def slow_build(*args):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return build(*args)
+
+    monkeypatch.setattr(Najia, '_build_result', staticmethod(slow_build))
+    compiler = batch_module._SharedCompiler()
+    # 4 个不同的桶并行构建，每个桶被 4 个线程同时请求也只构建一次
+    dates = [f'2024-03-01 {h:02d}:00' for h in (1, 5, 9, 13)]
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        results = list(pool.map(lambda d: compiler.compile(PARAMS[0], d), dates * 4))
+
+    assert peak[0] > 1
+    assert compiler.computed == 4
+    assert [r.solar for r in results] == [r.solar for r in (compiler.compile(PARAMS[0], d) for d in dates * 4)]
+
+
+def test_shared_compiler_build_error_propagates(monkeypatch):
+    from najia.najia import Najia
+
+    def broken(*args):
+        raise RuntimeError('boom')
+
+    monkeypatch.setattr(Najia, '_build_result', staticmethod(broken))
+    compiler = batch_module._SharedCompiler()
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            compiler.compile(PARAMS[0], '2024-03-01 10:00')
+    assert compiler.computed == 0 and not compiler._pending
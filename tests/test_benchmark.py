@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from tests import benchmark
+
+# 基准测试耗时且依赖机器负载，默认跳过；NAJIA_BENCHMARK=1 时运行并与基线比较，
+# 阈值与遍数分别由 NAJIA_BENCH_THRESHOLD、NAJIA_BENCH_ROUNDS 设置
+RUN_BENCHMARKS = os.environ.get('NAJIA_BENCHMARK') == '1'
+
+
+def test_baseline_covers_all_benchmarks():
+    baseline = benchmark.load_baseline()
+
+    assert baseline is not None
+    assert set(baseline['results']) == set(benchmark.BENCHMARKS)
+
+
+def test_compare_flags_regressions():
+    baseline = {'results': {'calibration': 1.0, 'fast': 1.0, 'slow': 1.0}}
+    # 本机整体慢一倍：归一化后 fast 无回归，slow 慢三倍
+    results = {'calibration': 2.0, 'fast': 2.0, 'slow': 6.0, 'new': 1.0}
+
+    rows = {row['name']: row for row in benchmark.compare(results, baseline, threshold=0.5)}
+
+    assert set(rows) == {'fast', 'slow'}
+    assert rows['fast']['ratio'] == pytest.approx(1.0)
+    assert not rows['fast']['regression']
+    assert rows['slow']['regression']
+
+    rows = {row['name']: row for row in benchmark.compare(results, baseline, threshold=0.5, normalize=False)}
+    assert rows['fast']['regression']
+
+
+def test_save_and_load_baseline(tmp_path):
+    path = tmp_path / 'baseline.json'
+    benchmark.save_baseline({'calibration': 1.0, 'x': 2.0}, path)
+
+    baseline = benchmark.load_baseline(path)
+    assert baseline['results'] == {'calibration': 1.0, 'x': 2.0}
+    assert 'python' in baseline['environment']
+
+
+@pytest.mark.skipif(not RUN_BENCHMARKS, reason='set NAJIA_BENCHMARK=1 to run benchmarks')
+def test_no_regression():
+    threshold = float(os.environ.get('NAJIA_BENCH_THRESHOLD', benchmark.DEFAULT_THRESHOLD))
+    rounds = int(os.environ.get('NAJIA_BENCH_ROUNDS', 1))
+    rows = benchmark.compare(benchmark.run_benchmarks(rounds=rounds), benchmark.load_baseline(), threshold)
+
+    assert [row['name'] for row in rows if row['regression']] == []
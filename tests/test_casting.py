@@ -0,0 +1,60 @@
+from collections import Counter
+
+import pytest
+
+from najia.batch import BatchProcessor
+from najia.casting import METHODS, WEIGHTS, Caster, _TABLES, cast
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_translation_table_is_exact(method):
+    counts = Counter(_TABLES[method])
+    assert {p: n // 16 for p, n in counts.items()} == WEIGHTS[method]
+    assert sum(WEIGHTS[method].values()) == 16
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_distribution(method):
+    data = Caster(method, seed=11).cast_bytes(100000)
+    assert len(data) == 600000
+    counts = Counter(data)
+    assert set(counts) <= {1, 2, 3, 4}
+    for p, weight in WEIGHTS[method].items():
+        assert counts[p] / len(data) == pytest.approx(weight / 16, abs=0.005)
+
+
+def test_seed_is_deterministic():
+    assert Caster('coin', seed=7).cast_bytes(1000) == Caster('coin', seed=7).cast_bytes(1000)
+    assert Caster('coin', seed=7).cast_bytes(1000) != Caster('coin', seed=8).cast_bytes(1000)
+    assert cast('yarrow', seed=3) == Caster('yarrow', seed=3).cast()
+
+    data = Caster('uniform', seed=5).cast_bytes(3)
+    assert list(Caster('uniform', seed=5).iter_casts(3)) == [list(data[i:i + 6]) for i in range(0, 18, 6)]
+
+
+def test_iter_casts_feeds_batch():
+    casts = list(Caster('coin', seed=1).iter_casts(200))
+    assert len(casts) == 200 and all(len(p) == 6 for p in casts)
+
+    result = BatchProcessor(executor='sequential').process_batch(casts)
+    assert result.success_count == 200
+    assert [r.params for r in result.results] == casts
+
+
+def test_cast_array_feeds_columnar():
+    np = pytest.importorskip('numpy')
+    from najia.columnar import compile_columnar
+
+    array = Caster('yarrow', seed=2).cast_array(1000)
+    assert array.shape == (1000, 6) and array.dtype == np.int8
+    assert array.tolist() == list(Caster('yarrow', seed=2).iter_casts(1000))
+    assert len(compile_columnar(array, month_zhi=2, day_gz=0)) == 1000
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        Caster('dice')
+    with pytest.raises(ValueError):
+        Caster().cast_bytes(-1)
+    assert Caster().cast_bytes(0) == b''
+    assert list(Caster().iter_casts(0)) == []
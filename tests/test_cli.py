@@ -0,0 +1,77 @@
+import json
+
+from click.testing import CliRunner
+
+from najia.__main__ import main
+
+
+def test_single_cast():
+    result = CliRunner().invoke(main, ['-p', '221242', '-d', '2019-12-25 00:20'])
+
+    assert result.exit_code == 0
+    assert '地山谦' in result.output
+
+
+def test_batch_json():
+    lines = '\n'.join([
+        json.dumps({'params': [2, 2, 1, 2, 4, 2], 'date': '2019-12-25 00:20'}),
+        '',
+        '"111111"',
+        'not json',
+    ])
+    result = CliRunner().invoke(main, ['batch', '--executor', 'threads', '-w', '2'], input=lines)
+
+    assert result.exit_code == 0
+    out = [json.loads(x) for x in result.stdout.splitlines()]
+    assert [x['index'] for x in out] == [0, 1, 2]
+    assert out[0]['result']['name'] == '地山谦'
+    assert out[1]['result']['name'] == '乾为天'
+    assert 'error' in out[2]
+
+
+def test_batch_text(tmp_path):
+    src = tmp_path / 'in.jsonl'
+    dst = tmp_path / 'out.txt'
+    src.write_text('[2, 2, 1, 2, 4, 2]\n', encoding='utf-8')
+
+    result = CliRunner().invoke(main, ['batch', '-i', str(src), '-o', str(dst), '-f', 'text', '-e', 'sequential'])
+
+    assert result.exit_code == 0
+    assert '地山谦' in dst.read_text(encoding='utf-8')
+
+
+def test_serve(monkeypatch):
+    calls = []
+    monkeypatch.setattr('najia.server.serve', lambda **kwargs: calls.append(kwargs))
+
+    result = CliRunner().invoke(main, ['serve', '--port', '0', '-w', '2', '--max-batch', '10'])
+
+    assert result.exit_code == 0
+    assert calls[0]['port'] == 0
+    assert calls[0]['workers'] == 2
+    assert calls[0]['max_batch'] == 10
+
+
+def test_cast():
+    result = CliRunner().invoke(main, ['cast', '-n', '5', '-m', 'yarrow', '-s', '1', '-d', '2024-01-01 10:00'])
+
+    assert result.exit_code == 0
+    records = [json.loads(x) for x in result.stdout.splitlines()]
+    assert len(records) == 5
+    assert all(len(r['params']) == 6 and set(r['params']) <= {1, 2, 3, 4} for r in records)
+    assert all(r['date'] == '2024-01-01 10:00' for r in records)
+
+    again = CliRunner().invoke(main, ['cast', '-n', '5', '-m', 'yarrow', '-s', '1', '-d', '2024-01-01 10:00'])
+    assert again.stdout == result.stdout
+
+    piped = CliRunner().invoke(main, ['batch', '-e', 'sequential'], input=result.stdout)
+    assert piped.exit_code == 0
+    assert len(piped.stdout.splitlines()) == 5
+
+
+def test_single_cast_seeded():
+    first = CliRunner().invoke(main, ['-s', '3', '-m', 'coin', '-d', '2019-12-25 00:20'])
+    second = CliRunner().invoke(main, ['-s', '3', '-m', 'coin', '-d', '2019-12-25 00:20'])
+
+    assert first.exit_code == 0
+    assert first.output == second.output
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from najia import const
+from najia.columnar import NONE, YUE_LING_NAMES, calendar_indices, compile_columnar, mark_string
+from najia.najia import Najia
+from najia.time_analysis import LIUSHEN_ORDER
+
+
+def test_columnar_matches_compile():
+    rng = random.Random(3)
+    params = [[rng.randint(1, 4) for _ in range(6)] for _ in range(300)]
+    month = [rng.randrange(12) for _ in params]
+    day = [rng.randrange(60) for _ in params]
+
+    out = compile_columnar(np.array(params, dtype=np.int8), np.array(month), np.array(day))
+
+    for row, p, m, d in zip(out, params, month, day):
+        r = Najia().compile(params=p, yue_zhi=const.ZHIS[m], ri_chen=const.GANS[d % 10] + const.ZHIS[d % 12]).result
+
+        assert mark_string(row['mark']) == r.mark
+        assert const.GUAS[row['palace']] == r.gong
+        assert (row['shi'], row['ying']) == r.shiy[:2]
+        assert [i for i in range(6) if row['dong'] >> i & 1] == r.dong
+        assert [const.QING6[c] for c in row['qin6']] == r.qin6
+        assert [const.XING5[c] for c in row['wuxing']] == [x[-1] for x in r.qinx]
+        assert [YUE_LING_NAMES[c] for c in row['yue_ling']] == r.yue_ling
+        assert list(row['yue_po']) == r.yue_po
+        assert list(row['xun_kong']) == r.xun_kong
+        assert [LIUSHEN_ORDER[c] for c in row['liu_shen']] == r.liu_shen
+
+
+def test_columnar_without_time():
+    out = compile_columnar([[1, 1, 1, 1, 1, 1], [2, 2, 2, 2, 2, 2]], month_zhi=[-1, 2])
+
+    assert list(out['yue_ling'][0]) == [NONE] * 6
+    assert NONE not in out['yue_ling'][1]
+    assert list(out['liu_shen'][1]) == [NONE] * 6
+    assert not out['xun_kong'].any()
+
+
+def test_columnar_validation():
+    with pytest.raises(ValueError):
+        compile_columnar([[1, 2, 3]])
+
+    with pytest.raises(ValueError):
+        compile_columnar([[7, 8, 9, 7, 8, 9]])
+
+
+def test_calendar_indices():
+    month, day = calendar_indices(['2026-02-13', '2019-12-25 00:20'])
+
+    assert const.ZHIS[month[0]] == '寅'
+    assert const.GANS[day[0] % 10] + const.ZHIS[day[0] % 12] == '戊午'
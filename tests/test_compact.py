@@ -0,0 +1,68 @@
+import pickle
+import random
+import tracemalloc
+
+import pytest
+
+from najia.compact import CompactHexagramResult
+from najia.najia import Najia
+
+DATES = [None, '2019-12-25 00:20', '2024-02-04 16:00', '2026-02-03 23:30', '1850-06-01 10:00']
+
+
+def test_compact_to_dict_matches_compile():
+    rng = random.Random(8)
+    for i in range(300):
+        params = [rng.randint(1, 4) for _ in range(6)]
+        date = DATES[i % len(DATES)] or '2023-01-01 12:00'
+        kwargs = {'date': date, 'guaci': i % 7 == 0}
+
+        full = Najia().compile(params=params, **kwargs).result
+        compact = Najia().compile_compact(params=params, **kwargs)
+
+        assert compact.to_dict() == full.to_dict()
+        assert CompactHexagramResult.from_result(full) == compact
+
+
+def test_compact_without_date_and_manual_time():
+    compact = Najia().compile_compact(params=[1, 2, 3, 4, 1, 2], yue_zhi='寅', ri_chen='甲子')
+    data = compact.to_dict()
+
+    assert data['yue_zhi'] == '寅'
+    assert data['ri_chen'] == '甲子'
+    assert compact.to_result().to_dict() == data
+
+
+def test_compact_render_and_pickle():
+    full = Najia(2).compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20')
+    compact = Najia().compile_compact(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20')
+
+    assert compact.render(2) == full.render()
+
+    restored = pickle.loads(pickle.dumps(compact))
+    assert restored == compact
+    assert restored.static is compact.static
+
+
+def test_compact_rejects_inconsistent_result():
+    full = Najia().compile(params=[1, 1, 1, 1, 1, 1], date='2019-12-25 00:20').result
+    full.lunar['xkong'] = '子丑'
+
+    with pytest.raises(ValueError):
+        CompactHexagramResult.from_result(full)
+
+
+def test_compact_is_smaller():
+    def measure(factory):
+        tracemalloc.start()
+        items = [factory(i) for i in range(500)]
+        size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        assert len(items) == 500
+        return size
+
+    params = [[(i >> (2 * k) & 3) + 1 for k in range(6)] for i in range(500)]
+    full = measure(lambda i: Najia().compile(params=params[i], date='2023-01-01 12:00').result)
+    compact = measure(lambda i: Najia().compile_compact(params=params[i], date='2023-01-01 12:00'))
+
+    assert compact * 5 < full
@@ -0,0 +1,96 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from najia import config
+from najia.config import ConfigManager, UserConfig, override_config
+
+
+def test_load_missing_config_has_no_side_effects(tmp_path, capsys):
+    manager = ConfigManager(tmp_path / 'najia')
+
+    assert manager.load_config() == UserConfig()
+    assert not (tmp_path / 'najia').exists()
+    assert capsys.readouterr().out == ''
+
+
+def test_snapshot_reloads_on_change(tmp_path, monkeypatch):
+    path = tmp_path / 'najia_config.json'
+    path.write_text(json.dumps({'max_workers': 8}), encoding='utf-8')
+    manager = ConfigManager(tmp_path)
+
+    reads = []
+    original = manager._read
+    monkeypatch.setattr(manager, '_read', lambda: reads.append(1) or original())
+
+    assert manager.load_config().max_workers == 8
+    assert manager.load_config().max_workers == 8
+    assert manager.snapshot() is manager.snapshot()
+    assert len(reads) == 1
+
+    # 返回副本，修改不影响快照
+    manager.load_config().max_workers = 1
+    assert manager.load_config().max_workers == 8
+
+    # 文件变化（大小或修改时间）后重新读取
+    path.write_text(json.dumps({'max_workers': 16}), encoding='utf-8')
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert manager.load_config().max_workers == 16
+    assert len(reads) == 2
+
+    # 替换文件（inode 变化）后重新读取
+    other = tmp_path / 'other.json'
+    other.write_text(json.dumps({'max_workers': 2}), encoding='utf-8')
+    other.replace(path)
+    assert manager.load_config().max_workers == 2
+
+    assert manager.reload().max_workers == 2
+    assert len(reads) == 4
+
+
+def test_invalid_config_file_uses_defaults(tmp_path):
+    (tmp_path / 'najia_config.json').write_text('{broken', encoding='utf-8')
+
+    assert ConfigManager(tmp_path).load_config() == UserConfig()
+
+
+def test_override_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_default_config_manager', ConfigManager(tmp_path))
+
+    assert config.get_config().verbose_level == 2
+
+    with override_config(verbose_level=0, timeout=1000) as overridden:
+        assert overridden.verbose_level == 0
+        # 取值按 from_dict 规则校验
+        assert overridden.timeout == 30
+
+        with override_config(guaci_enabled=True):
+            current = config.get_config()
+            assert (current.verbose_level, current.guaci_enabled) == (0, True)
+
+        assert config.get_config().guaci_enabled is False
+
+    assert config.get_config().verbose_level == 2
+    assert list(tmp_path.iterdir()) == []
+
+    with pytest.raises(ValueError):
+        with override_config(unknown=1):
+            pass
+
+
+def test_override_config_is_task_local(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, '_default_config_manager', ConfigManager(tmp_path))
+
+    async def worker(level):
+        with override_config(verbose_level=level):
+            await asyncio.sleep(0)
+            return config.get_config().verbose_level
+
+    async def main():
+        return await asyncio.gather(worker(0), worker(1))
+
+    assert asyncio.run(main()) == [0, 1]
+    assert config.get_config().verbose_level == 2
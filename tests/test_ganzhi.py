@@ -0,0 +1,67 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from najia import ganzhi
+from najia.lunar_utils import (
+    _resolve_ganzhi, _resolve_lunar, get_calendar_backend, resolve_calendar, set_calendar_backend
+)
+
+
+def test_ganzhi_helpers():
+    assert ganzhi.ganzhi(0) == '甲子'
+    assert ganzhi.ganzhi(59) == '癸亥'
+    assert ganzhi.ganzhi_index(0, 0) == 0
+    assert ganzhi.ganzhi_index(9, 11) == 59
+    assert ganzhi.xun_kong(0) == '戌亥'
+    assert ganzhi.xun_kong(50) == '子丑'
+    assert ganzhi.ganzhi(ganzhi.day_index(2026, 2, 13)) == '戊午'
+
+
+def test_bundled_table_matches_lunar_python():
+    table = ganzhi._table()
+    for year in (1899, 1900, 1984, 2024, 2101):
+        offset = (year - table.start_year) * 12
+        assert table.seconds[offset:offset + 12] == ganzhi.build_jie_table(year, year)
+
+
+def test_pillars_out_of_range():
+    with pytest.raises(ValueError):
+        ganzhi.pillars(1899, 12, 31)
+
+    with pytest.raises(ValueError):
+        ganzhi.pillars(2101, 1, 1)
+
+
+def test_differential_against_lunar_python():
+    rng = random.Random(20240204)
+    cases = [(1900, 1, 1, 0), (1900, 1, 6, 3), (2100, 12, 31, 23)]
+
+    # 节令交接日的每个小时
+    table = ganzhi._table()
+    for seconds in rng.sample(table.seconds[12:-12], 12):
+        t = datetime(1900, 1, 1) + timedelta(seconds=seconds)
+        cases.extend((t.year, t.month, t.day, h) for h in range(24))
+
+    for _ in range(200):
+        d = ganzhi.MIN_DATE + timedelta(days=rng.randrange((ganzhi.MAX_DATE - ganzhi.MIN_DATE).days + 1))
+        cases.append((d.year, d.month, d.day, rng.randrange(24)))
+
+    for args in cases:
+        assert _resolve_ganzhi(*args) == _resolve_lunar(*args), args
+
+
+def test_calendar_backend_switch():
+    assert get_calendar_backend() == 'ganzhi'
+
+    try:
+        set_calendar_backend('lunar')
+        reference = resolve_calendar(2024, 2, 4, 16)
+    finally:
+        set_calendar_backend('ganzhi')
+
+    assert resolve_calendar(2024, 2, 4, 16) == reference
+
+    with pytest.raises(ValueError):
+        set_calendar_backend('sxtwl')
@@ -1,3 +1,7 @@
+import os
+
+import pytest
+
 from najia.utils import get_guaci
 
 
@@ -16,3 +20,94 @@ def test_gui_hun_shi_yao():
 
     # 期望 应 在 0-based 索引 2（shiy[1] 为 1-based）
     assert gua.result.shiy[1] - 1 == 2
+
+
+def test_guaci_store_matches_json():
+    import json
+
+    from najia.guaci import DEFAULT_GUACI_PATH, GuaciStore, build_index, get_store
+
+    with open(DEFAULT_GUACI_PATH, encoding='utf-8') as f:
+        data = json.load(f)
+
+    store = get_store()
+    assert sorted(store.names()) == sorted(data)
+    assert all(store.get(name) == text for name, text in data.items())
+    assert store.get('不存在') is None
+    assert get_guaci('不存在') is None
+
+    # 预生成索引与扫描结果一致
+    assert GuaciStore(index_path=None).names() == list(build_index())
+    assert get_store()._index == build_index()
+
+
+def test_guaci_store_cache_and_stale_index(tmp_path):
+    from najia.guaci import GuaciStore, write_index
+
+    path = tmp_path / 'guaci.json'
+    index_path = tmp_path / 'guaci.idx.json'
+    path.write_text('{"甲": "一\\n二", "乙" : "三"}', encoding='utf-8')
+    write_index(path, index_path)
+
+    store = GuaciStore(path, index_path, cache_size=1)
+    assert store.get('甲') == '一\n二'
+    assert store.get('甲') == '一\n二'
+    assert store.cache_info().hits == 1
+    assert store.get('乙') == '三'
+    assert store.cache_info().currsize == 1
+    store.close()
+
+    # 数据文件变化后旧索引大小不符，回退为扫描
+    path.write_text('{"丙": "四"}', encoding='utf-8')
+    store = GuaciStore(path, index_path)
+    assert store.get('丙') == '四'
+    assert '甲' not in store
+
+    # 大小不变的修改由内容摘要发现
+    write_index(path, index_path)
+    path.write_text('{"丁": "四"}', encoding='utf-8')
+    store = GuaciStore(path, index_path)
+    assert store.get('丁') == '四'
+    assert '丙' not in store
+
+
+def test_guaci_store_close_while_reading():
+    import threading
+
+    from najia.guaci import GuaciStore
+
+    store = GuaciStore(cache_size=0)
+    names = store.names()
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        try:
+            while not stop.is_set():
+                for name in names:
+                    assert store.get(name)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(500):
+        store.close()
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires os.fork')
+def test_guaci_store_after_fork():
+    import multiprocessing
+
+    from najia.guaci import get_store
+
+    assert get_guaci('乾为天')
+    ctx = multiprocessing.get_context('fork')
+    with ctx.Pool(1) as pool:
+        assert pool.map(get_guaci, ['乾为天', '坤为地']) == [get_store().get('乾为天'), get_store().get('坤为地')]
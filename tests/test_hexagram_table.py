@@ -0,0 +1,47 @@
+import pytest
+
+from najia.hexagram_table import (
+    TABLE_SIZE, derive, get_static, get_table, pack_params, unpack_params
+)
+from najia.najia import Najia
+
+
+def test_pack_roundtrip():
+    assert pack_params([1, 1, 1, 1, 1, 1]) == 0
+    assert pack_params([4, 4, 4, 4, 4, 4]) == TABLE_SIZE - 1
+    assert pack_params([7, 8, 9, 7, 8, 9]) is None
+    assert pack_params([1, 2, 3]) is None
+
+    for key in (0, 1, 1234, TABLE_SIZE - 1):
+        assert pack_params(unpack_params(key)) == key
+
+    with pytest.raises(ValueError):
+        unpack_params(TABLE_SIZE)
+
+
+def test_table_matches_derive():
+    table = get_table()
+    assert len(table) == TABLE_SIZE
+
+    for key, entry in enumerate(table):
+        assert entry.key == key
+        assert entry == derive(unpack_params(key))
+
+
+def test_get_static_fallback():
+    entry = get_static([7, 8, 9, 7, 8, 9])
+    assert entry.key is None
+    assert entry.mark == '101101'
+    assert entry.bian is None
+
+
+def test_compile_uses_fresh_copies():
+    a = Najia().compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20').result
+    b = Najia().compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20').result
+
+    a.qin6[0] = 'x'
+    a.bian.qin6[0] = 'x'
+
+    assert b.qin6[0] != 'x'
+    assert b.bian.qin6[0] != 'x'
+    assert get_static([2, 2, 1, 2, 4, 2]).bian.qin6[0] != 'x'
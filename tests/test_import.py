@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+# 导入耗时预算（秒），慢速环境可通过环境变量放宽
+IMPORT_BUDGET = float(os.environ.get('NAJIA_IMPORT_BUDGET', '0.5'))
+
+# 导入时不应加载的重量级模块
+HEAVY_MODULES = ('arrow', 'jinja2', 'lunar_python', 'najia.batch', 'najia.config', 'najia.renderer')
+
+ROOT = Path(__file__).parent.parent
+
+
+def _run(code: str, home: Path) -> dict:
+    env = dict(os.environ, HOME=str(home), APPDATA=str(home), PYTHONPATH=str(ROOT))
+    out = subprocess.run([sys.executable, '-c', code], env=env, cwd=str(home),
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def test_import_is_lazy_and_fast(tmp_path):
+    result = _run(
+        'import json, sys, time\n'
+        't = time.perf_counter()\n'
+        'from najia import Najia\n'
+        'elapsed = time.perf_counter() - t\n'
+        f'print(json.dumps({{"elapsed": elapsed, "loaded": [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n',
+        tmp_path
+    )
+
+    assert result['loaded'] == []
+    assert result['elapsed'] < IMPORT_BUDGET
+
+
+def test_import_has_no_filesystem_side_effects(tmp_path):
+    result = _run(
+        'import json, sys\n'
+        'import najia, najia.config, najia.const\n'
+        'print(json.dumps({"submodules": sorted(m for m in sys.modules if m.startswith("najia."))}))\n',
+        tmp_path
+    )
+
+    assert result['submodules'] == ['najia.config', 'najia.const', 'najia.log']
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_lazy_attributes():
+    import najia
+
+    assert najia.Najia is najia.najia.Najia
+    assert najia.calc_yue_ling is najia.time_analysis.calc_yue_ling
+    assert len(najia.const.SHIYING_PRECOMPUTED) == 64
+    assert 'Najia' in dir(najia)
+
+    with pytest.raises(AttributeError):
+        najia.missing
@@ -0,0 +1,78 @@
+import json
+import threading
+
+from najia import instrument
+from najia.najia import Najia
+
+STAGES = {'parse', 'calendar', 'static', 'time_analysis', 'guaci', 'build', 'compile', 'render'}
+
+
+def test_disabled_by_default():
+    instrument.reset()
+    assert not instrument.is_enabled()
+    assert instrument.timer() is None
+
+    Najia().compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20').render()
+    assert instrument.get_registry().stages() == []
+
+
+def test_compile_and_render_stages():
+    with instrument.instrumented() as registry:
+        for _ in range(3):
+            Najia().compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20', guaci=True).render()
+
+    assert not instrument.is_enabled()
+    assert set(registry.stages()) == STAGES
+
+    data = registry.to_dict()
+    assert all(data[stage]['count'] == 3 for stage in STAGES)
+    assert data['compile']['sum'] >= sum(data[s]['sum'] for s in STAGES - {'compile', 'render'})
+    assert data['compile']['buckets']['+Inf'] == 3
+    assert json.loads(registry.to_json()) == json.loads(json.dumps(data))
+
+
+def test_prometheus_format():
+    with instrument.instrumented() as registry:
+        Najia().compile(params=[1, 1, 1, 1, 1, 1], date='2024-01-01 10:00')
+
+    text = registry.to_prometheus()
+
+    assert '# TYPE najia_stage_duration_seconds histogram' in text
+    assert 'najia_stage_duration_seconds_bucket{stage="parse",le="+Inf"} 1' in text
+    assert 'najia_stage_duration_seconds_count{stage="compile"} 1' in text
+    assert 'guaci' not in text
+
+
+def test_callback_and_threads():
+    seen = []
+    lock = threading.Lock()
+
+    def callback(stage, seconds):
+        with lock:
+            seen.append((stage, seconds))
+
+    instrument.add_callback(callback)
+    try:
+        with instrument.instrumented() as registry:
+            threads = [threading.Thread(target=lambda: Najia().compile(params=[1, 2, 3, 4, 1, 2], date='2020-01-01'))
+                       for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+    finally:
+        instrument.remove_callback(callback)
+
+    assert registry.histogram('compile').count == 4
+    assert sum(1 for stage, _ in seen if stage == 'compile') == 4
+    assert all(seconds >= 0 for _, seconds in seen)
+
+
+def test_histogram_quantile():
+    histogram = instrument.Histogram(buckets=(1.0, 2.0, 3.0))
+    for value in (0.5, 1.5, 1.5, 2.5):
+        histogram.observe(value)
+
+    assert histogram.quantile(0.5) == 2.0
+    assert histogram.quantile(1.0) == 2.5
+    assert histogram.to_dict()['buckets'] == {'1.0': 1, '2.0': 3, '3.0': 4, '+Inf': 4}
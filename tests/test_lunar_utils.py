@@ -0,0 +1,35 @@
+from lunar_python import Solar
+
+from najia.lunar_utils import (
+    calendar_cache_clear, calendar_cache_info, date_to_yue_ri_chen, resolve_calendar
+)
+
+
+def test_date_to_yue_ri_chen():
+    assert date_to_yue_ri_chen('2026-02-13') == ('寅', '戊午')
+    assert date_to_yue_ri_chen('2026-02-13 10:30') == ('寅', '戊午')
+
+
+def test_resolve_calendar_matches_lunar_python():
+    for args in [(2019, 12, 25, 0), (2024, 2, 4, 16), (2024, 2, 4, 17), (2026, 2, 3, 23)]:
+        lunar = Solar.fromYmdHms(*args, 0, 0).getLunar()
+        info = resolve_calendar(*args)
+
+        assert [info.year, info.month, info.day, info.hour] == lunar.getBaZi()
+        assert info.xkong == lunar.getDayXunKong()
+        assert info.month_zhi == Solar.fromYmd(*args[:3]).getLunar().getMonthZhi()
+        assert info.day_gz == Solar.fromYmd(*args[:3]).getLunar().getDayInGanZhi()
+
+
+def test_resolve_calendar_cache():
+    calendar_cache_clear()
+    first = resolve_calendar(2023, 1, 1, 12)
+    assert resolve_calendar(2023, 1, 1, 12) is first
+
+    info = calendar_cache_info()
+    assert info.hits == 1
+    assert info.misses == 1
+
+    lunar = first.to_lunar_dict()
+    lunar['gz']['day'] = 'x'
+    assert first.to_lunar_dict()['gz']['day'] != 'x'
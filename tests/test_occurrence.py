@@ -0,0 +1,82 @@
+from datetime import date
+
+import pytest
+
+from najia.hexagram_table import get_static
+from najia.najia import Najia
+from najia.occurrence import (
+    OccurrenceSolver, TimeState, liu_shen_of, next_occurrences, xun_kong_of, yao_positions, yue_ling_of, yue_po_of,
+)
+from najia.sweep import iter_sweep
+
+PARAMS = [2, 2, 1, 2, 4, 2]
+
+
+def _brute_force(predicate, start, end):
+    static = get_static(PARAMS)
+    return [
+        p.time.date() for p in iter_sweep(PARAMS, start, end)
+        if predicate(TimeState(static, p.yue_zhi, p.ri_chen, p.yue_ling, p.yue_po, p.xun_kong, p.liu_shen, p.god6))
+    ]
+
+
+@pytest.mark.parametrize('predicate', [
+    xun_kong_of('世'),
+    yue_po_of('兄弟'),                     # 多个爻
+    yue_ling_of(0, '旺', '相'),
+    liu_shen_of('应', '青龙'),
+    lambda s: s.ri_chen == '甲子' and s.yue_zhi == '午',     # 稀疏：整段跳过大部分节令区段
+])
+@pytest.mark.parametrize('start, end', [
+    ('1900-01-01', '1901-06-30'),          # 表首小寒之前（子月）
+    ('2024-01-15', '2025-03-10'),
+    ('2099-10-01', '2100-12-31'),
+])
+def test_solver_matches_sweep(predicate, start, end):
+    solver = OccurrenceSolver(PARAMS, predicate)
+    assert list(solver.iter_dates(start, end)) == _brute_force(predicate, start, end)
+
+
+def test_next_occurrences():
+    days = next_occurrences(PARAMS, xun_kong_of('世'), '2026-01-01', n=5)
+    assert len(days) == 5
+    assert days == sorted(days) and days[0] >= date(2026, 1, 1)
+    assert days == _brute_force(xun_kong_of('世'), '2026-01-01', days[-1])
+
+    solver = OccurrenceSolver(PARAMS, xun_kong_of('世'))
+    assert solver.next(days[0]) == days[:1]
+    assert solver.next('2026-01-01', n=0) == []
+    assert solver.next('2100-12-31', n=5) == _brute_force(xun_kong_of('世'), '2100-12-31', '2100-12-31')
+
+
+def test_solver_accepts_result():
+    result = Najia().compile(params=PARAMS, date='2026-01-01 10:00').result
+    solver = OccurrenceSolver(result, yue_po_of('世'))
+    assert solver.static.name == result.name
+    assert solver.next('2026-01-01', n=3) == OccurrenceSolver(PARAMS, yue_po_of('世')).next('2026-01-01', n=3)
+
+
+def test_unsatisfiable_predicate():
+    solver = OccurrenceSolver(PARAMS, lambda s: s.yue_zhi == '子' and s.yue_po[0] and not s.yue_po[0])
+    assert not solver.is_satisfiable()
+    assert solver.next('2026-01-01', n=3) == []
+
+
+def test_yao_positions():
+    static = get_static(PARAMS)
+    assert yao_positions(static, '世') == (static.shiy[0] - 1,)
+    assert yao_positions(static, 5) == (5,)
+    assert yao_positions(static, static.qin6[2]) == tuple(i for i, q in enumerate(static.qin6) if q == static.qin6[2])
+
+    with pytest.raises(ValueError):
+        yao_positions(static, 6)
+    with pytest.raises(ValueError):
+        OccurrenceSolver(PARAMS, xun_kong_of('用神'))
+
+
+def test_start_out_of_range():
+    solver = OccurrenceSolver(PARAMS, xun_kong_of('世'))
+    with pytest.raises(ValueError):
+        solver.next('1899-12-31')
+    with pytest.raises(ValueError):
+        solver.next('2101-01-01')
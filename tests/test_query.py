@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from najia import ganzhi
+from najia.const import ZHIS
+from najia.hexagram_table import unpack_params
+from najia.najia import Najia
+from najia.query import (
+    SPACE, Match, bian, gong, hexagram_type, hide, moving, query, ri_chen, shi_yao, yao, yue_zhi,
+)
+from najia.utils import get_god6
+
+
+def _sample(n, seed=5):
+    rng = random.Random(seed)
+    for _ in range(n):
+        params = unpack_params(rng.randrange(4096))
+        month, day = ZHIS[rng.randrange(12)], ganzhi.ganzhi(rng.randrange(60))
+        yield params, month, day, Najia().compile(params=list(params), yue_zhi=month, ri_chen=day).result
+
+
+def _shi(result):
+    return result.shiy[0] - 1
+
+
+@pytest.mark.parametrize('q, expected', [
+    (yao('世', qin6='官鬼', yue_po=True),
+     lambda r, god6: r.qin6[_shi(r)] == '官鬼' and r.yue_po[_shi(r)]),
+    (yao(xun_kong=True, dong=True),
+     lambda r, god6: any(r.xun_kong[i] for i in r.dong)),
+    (yao('应', yue_ling=('旺', '相'), liu_shen='青龙'),
+     lambda r, god6: r.yue_ling[r.shiy[1] - 1] in ('旺', '相') and r.liu_shen[r.shiy[1] - 1] == '青龙'),
+    (yao(3, wuxing='金', god6='白虎', xun_kong=False),
+     lambda r, god6: r.qinx[3][-1] == '金' and god6[3] == '白虎' and not r.xun_kong[3]),
+    (gong('乾', '坤') & ~yao(yue_po=True),
+     lambda r, god6: r.gong in ('乾', '坤') and not any(r.yue_po)),
+    (hexagram_type('六冲') | hide('妻财'),
+     lambda r, god6: r.hexagram_type == '六冲' or (
+         r.hide is not None and any(r.hide.qin6[s] == '妻财' for s in r.hide.seat))),
+    (bian(hexagram_type='六合') & moving(1, 2),
+     lambda r, god6: r.bian is not None and r.bian.hexagram_type == '六合' and len(r.dong) in (1, 2)),
+    (shi_yao(2) & yue_zhi('寅', '卯'),
+     lambda r, god6: _shi(r) == 2 and r.yue_zhi in ('寅', '卯')),
+])
+def test_query_matches_compile(q, expected):
+    result = query(q)
+    for params, month, day, compiled in _sample(200):
+        assert ((params, month, day) in result) == expected(compiled, get_god6(day)), (params, month, day)
+
+
+def test_query_result_views():
+    q = yao('世', qin6='官鬼', yue_po=True) & yue_zhi('卯') & ri_chen('甲子')
+    result = query(q)
+
+    assert result.times() == [('卯', '甲子')]
+    matches = list(result)
+    assert len(matches) == len(result) > 0
+    assert all(isinstance(m, Match) and m.yue_zhi == '卯' and m.ri_chen == '甲子' for m in matches)
+    assert result.params() == [m.params for m in matches]
+
+    for params in result.params():
+        compiled = Najia().compile(params=list(params), yue_zhi='卯', ri_chen='甲子').result
+        shi = _shi(compiled)
+        assert compiled.qin6[shi] == '官鬼' and compiled.yue_po[shi]
+
+
+def test_query_combinators():
+    a, b = yao('世', xun_kong=True), gong('震')
+    assert len(query(a)) + len(query(~a)) == SPACE
+    assert len(query(a | b)) == len(query(a)) + len(query(b)) - len(query(a & b))
+    assert not query(yue_zhi('子') & yue_zhi('午'))
+    assert len(query(ri_chen('甲子'))) == 12 * 4096
+
+
+def test_query_validation():
+    with pytest.raises(ValueError):
+        yao('用神')
+    with pytest.raises(ValueError):
+        yao(qin6='妻子')
+    with pytest.raises(ValueError):
+        yue_zhi('寅', '虎')
+    with pytest.raises(ValueError):
+        ri_chen('甲丑')
+    with pytest.raises(ValueError):
+        gong()
+    with pytest.raises(ValueError):
+        moving(7)
@@ -0,0 +1,45 @@
+import pytest
+from jinja2 import TemplateNotFound
+
+from najia.najia import Najia
+from najia.renderer import Renderer, get_renderer, register_template
+
+
+def test_template_is_compiled_once():
+    gua = Najia(2).compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20', guaci=True)
+    output = gua.render()
+
+    assert '地山谦' in output
+    assert gua.render() == output
+    assert get_renderer().get_template() is get_renderer().get_template('standard')
+    assert 'standard.tpl' in get_renderer().templates()
+
+
+def test_register_template():
+    register_template('brief', source='{{ name }}|{{ main.type }}')
+    gua = Najia().compile(params=[1, 1, 1, 1, 1, 1], date='2019-12-25 00:20')
+
+    assert gua.render('brief') == '乾为天|六冲'
+
+    register_template('brief', source='{{ name }}')
+    assert gua.render('brief') == '乾为天'
+
+
+def test_template_paths_and_bytecode_cache(tmp_path):
+    templates = tmp_path / 'tpl'
+    templates.mkdir()
+    (templates / 'custom.tpl').write_text('custom:{{ name }}', encoding='utf-8')
+    cache = tmp_path / 'cache'
+    cache.mkdir()
+
+    renderer = Renderer(template_paths=[templates], bytecode_cache_dir=cache)
+
+    assert renderer.render('custom', name='乾为天') == 'custom:乾为天'
+    assert 'standard.tpl' in renderer.templates()
+    assert any(cache.iterdir())
+
+    with pytest.raises(TemplateNotFound):
+        renderer.get_template('missing')
+
+    with pytest.raises(ValueError):
+        renderer.register_template('x')
@@ -0,0 +1,88 @@
+import itertools
+import json
+import random
+
+import pytest
+
+from najia import serialize
+from najia.batch import BatchProcessor
+from najia.najia import Najia
+
+BACKENDS = [name for name in serialize.JSON_BACKENDS if name != 'orjson' or serialize.orjson is not None]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = serialize.get_json_backend()
+    serialize.set_json_backend(request.param)
+    yield request.param
+    serialize.set_json_backend(previous)
+
+
+def _reference(data):
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+
+
+def test_dumps_is_compact(backend):
+    data = {'name': '地山谦', 'shiy': (5, 2), 'dong': [4], 'hide': None}
+    assert serialize.dumps(data) == _reference(data)
+    assert serialize.dumps_bytes(data) == _reference(data).encode('utf-8')
+
+
+def test_compact_result_json_matches_to_dict_for_all_params(backend):
+    params_list = list(itertools.product((1, 2, 3, 4), repeat=6))
+    for i, params in enumerate(params_list):
+        kwargs = {'yue_zhi': '寅', 'ri_chen': '甲子'} if i % 2 else {'date': '2019-12-25 00:20'}
+        compact = Najia().compile_compact(params=list(params), guaci=i % 5 == 0, **kwargs)
+        assert compact.to_json() == _reference(compact.to_dict())
+
+
+def test_result_to_json_compact(backend):
+    rng = random.Random(17)
+    for i in range(50):
+        params = [rng.randint(1, 4) for _ in range(6)]
+        result = Najia().compile(params=params, date=f'2024-0{1 + i % 9}-1{i % 10} {i % 24:02d}:00', guaci=True).result
+        text = result.to_json(compact=True)
+        assert text == _reference(result.to_dict())
+        assert json.loads(text) == json.loads(result.to_json())
+        assert '\n' not in text
+
+
+def test_batch_to_json_compact(backend):
+    batch = BatchProcessor(executor='sequential').process_batch([[2, 2, 1, 2, 4, 2], [1, 2, 3, 4, 1, 2]])
+    assert json.loads(batch.to_json(compact=True)) == json.loads(batch.to_json())
+
+
+def test_set_json_backend_rejects_unknown():
+    with pytest.raises(ValueError):
+        serialize.set_json_backend('ujson')
+
+
+def test_result_to_json_compact_uses_fragments_only_when_unmodified(backend):
+    kwargs = [{'date': '2019-12-25 00:20'}, {'yue_zhi': '寅', 'ri_chen': '甲子'}, {}]
+    for params, extra in zip(([2, 2, 1, 2, 4, 2], [7, 8, 9, 6, 7, 8], [1, 2, 3, 4, 1, 2]), kwargs):
+        result = Najia().compile(params=params, guaci=True, **extra).result
+        assert result.to_json(compact=True) == _reference(result.to_dict())
+
+    result = Najia().compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20').result
+    result.qin6[0] = '妻财'
+    result.yue_po = [True] * 6
+    result.name = '改'
+    assert result.to_json(compact=True) == _reference(result.to_dict())
+    assert '"改"' in result.to_json(compact=True)
+
+
+def test_float_fields_parse_equal_across_backends():
+    batch = BatchProcessor(executor='sequential').process_batch([[2, 2, 1, 2, 4, 2]])
+    batch.processing_time = 0.000012
+    texts = []
+    for name in BACKENDS:
+        previous = serialize.get_json_backend()
+        serialize.set_json_backend(name)
+        try:
+            texts.append(batch.to_json(compact=True))
+        finally:
+            serialize.set_json_backend(previous)
+
+    assert all(json.loads(text) == json.loads(texts[0]) for text in texts)
+    assert json.loads(texts[0])['processing_time'] == 0.000012
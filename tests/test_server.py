@@ -0,0 +1,143 @@
+import http.client
+import json
+import socket
+import threading
+
+import pytest
+
+from najia.najia import Najia
+from najia.server import NajiaHTTPServer, warm_up
+
+
+@pytest.fixture(scope='module')
+def server():
+    warm_up()
+    server = NajiaHTTPServer(('127.0.0.1', 0), max_body=4096, max_batch=5)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _request(conn, method, path, body=None):
+    data = None if body is None else json.dumps(body).encode('utf-8')
+    conn.request(method, path, body=data, headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    payload = response.read().decode('utf-8')
+    if response.getheader('Content-Type', '').startswith('application/json'):
+        payload = json.loads(payload)
+    return response.status, payload
+
+
+def test_compile_keep_alive(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    result = Najia().compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20', guaci=True).result
+    expected = json.loads(json.dumps(result.to_dict(), ensure_ascii=False))
+
+    status, payload = _request(conn, 'POST', '/compile',
+                               {'params': [2, 2, 1, 2, 4, 2], 'date': '2019-12-25 00:20', 'guaci': True})
+    assert status == 200
+    assert payload == expected
+
+    # 同一连接上继续请求
+    sock = conn.sock
+    status, payload = _request(conn, 'GET', '/compile?params=221242&date=2019-12-25%2000:20&guaci=1')
+    assert status == 200
+    assert payload == expected
+
+    status, text = _request(conn, 'POST', '/compile',
+                            {'params': '221242', 'date': '2019-12-25 00:20', 'format': 'text', 'verbose': 2})
+    assert status == 200
+    assert text == Najia(2).compile(params=[2, 2, 1, 2, 4, 2], date='2019-12-25 00:20').render()
+
+    status, payload = _request(conn, 'GET', '/health')
+    assert (status, payload['status']) == (200, 'ok')
+    assert conn.sock is sock
+    conn.close()
+
+
+def test_batch(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    records = [[1, 2, 3, 4, 1, 2], {'params': [1, 1, 1, 1, 1, 1], 'date': '2024-01-01 10:00'}, {'date': 'x'}]
+
+    status, payload = _request(conn, 'POST', '/batch', {'records': records})
+    assert status == 200
+    assert (payload['success_count'], payload['error_count']) == (2, 1)
+    assert [r['index'] for r in payload['results']] == [0, 1, 2]
+    assert payload['results'][1]['result']['name'] == '乾为天'
+    assert 'error' in payload['results'][2]
+
+    status, text = _request(conn, 'POST', '/batch', {'records': records[1:], 'format': 'text'})
+    assert status == 200
+    assert '乾为天' in text and '# 1:' in text
+
+    status, payload = _request(conn, 'POST', '/batch', {'records': [[1, 1, 1, 1, 1, 1]] * 6})
+    assert status == 413
+    conn.close()
+
+
+def test_batch_string_params(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    records = ['221242', {'params': '221242', 'date': '2019-12-25 00:20'}, [2, 2, 1, 2, 4, 2], '789789', 'abc']
+
+    status, payload = _request(conn, 'POST', '/batch', {'records': records})
+    assert status == 200
+    assert (payload['success_count'], payload['error_count']) == (3, 2)
+    assert [r['index'] for r in payload['results']] == [0, 1, 2, 3, 4]
+    assert payload['results'][0]['result']['params'] == [2, 2, 1, 2, 4, 2]
+    assert payload['results'][1]['result']['name'] == Najia().compile(params=[2, 2, 1, 2, 4, 2]).result.name
+    # 与 /compile 一致：7/8/9 参数被拒绝
+    assert 'params must be 6 values in 1~4' in payload['results'][3]['error']
+    assert 'invalid params' in payload['results'][4]['error']
+    assert _request(conn, 'POST', '/compile', {'params': '789789'})[0] == 400
+    conn.close()
+
+
+def test_errors(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+
+    assert _request(conn, 'POST', '/compile', {'params': [1, 2, 5]})[0] == 400
+    assert _request(conn, 'POST', '/compile', {})[0] == 400
+    assert _request(conn, 'POST', '/compile', {'params': '111111', 'format': 'xml'})[0] == 400
+    assert _request(conn, 'POST', '/compile', [1, 2])[0] == 400
+    assert _request(conn, 'GET', '/missing')[0] == 404
+
+    conn.request('POST', '/compile', body=b'{broken', headers={'Content-Type': 'application/json'})
+    response = conn.getresponse()
+    response.read()
+    assert response.status == 400
+
+    status, payload = _request(conn, 'POST', '/compile', {'params': '111111', 'title': 'x' * 5000})
+    assert status == 413
+    conn.close()
+
+
+def test_negative_content_length(server):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=5)
+    conn.putrequest('POST', '/compile')
+    conn.putheader('Content-Type', 'application/json')
+    conn.putheader('Content-Length', '-1')
+    conn.endheaders()
+
+    response = conn.getresponse()
+    assert response.status == 400
+    assert json.loads(response.read())['error'] == 'invalid Content-Length'
+    conn.close()
+
+
+@pytest.mark.parametrize('length_header', [b'', b'Content-Length: abc\r\n', b'Transfer-Encoding: chunked\r\n'])
+def test_unreadable_body_closes_connection(server, length_header):
+    # 请求体中夹带一个完整请求：连接保持时它会被当作下一个请求解析
+    smuggled = b'GET /health HTTP/1.1\r\nHost: x\r\n\r\n'
+    with socket.create_connection(server.server_address[:2], timeout=5) as sock:
+        sock.sendall(b'POST /compile HTTP/1.1\r\nHost: x\r\n' + length_header + b'\r\n' + smuggled)
+        data = b''
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            data += chunk
+
+    assert data.count(b'HTTP/1.1 ') == 1
+    assert data.startswith(b'HTTP/1.1 411' if not length_header.startswith(b'Content-Length') else b'HTTP/1.1 400')
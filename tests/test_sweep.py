@@ -0,0 +1,56 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from najia.najia import Najia
+from najia.sweep import iter_sweep, sweep
+
+PARAMS = [2, 2, 1, 2, 4, 2]
+FIELDS = ('yue_zhi', 'ri_chen', 'yue_ling', 'yue_po', 'xun_kong', 'liu_shen', 'god6')
+
+
+def _assert_matches_compile(points):
+    for point in points:
+        result = Najia().compile(params=PARAMS, date=point.time.isoformat(sep=' ')).result
+        data = point.to_dict()
+        for name in FIELDS:
+            assert data[name] == getattr(result, name), (point.time, name)
+
+
+@pytest.mark.parametrize('start, end', [
+    ('2024-01-01', '2024-03-31'),          # 跨小寒、立春、惊蛰
+    ('1899-12-20', '1900-01-20'),          # 节令表范围之外回退
+    ('2100-12-25', '2101-01-08'),
+])
+def test_sweep_matches_compile(start, end):
+    result = sweep(PARAMS, start, end)
+    assert len(result) == (date.fromisoformat(end) - date.fromisoformat(start)).days + 1
+    _assert_matches_compile(result.points())
+
+
+def test_sweep_shichen_steps():
+    points = list(iter_sweep(PARAMS, '2024-02-03 23:00', datetime(2024, 2, 5, 1), step='shichen'))
+    assert len(points) == 14
+    assert points[1].time == datetime(2024, 2, 4, 1)
+    _assert_matches_compile(points)
+
+
+def test_sweep_shares_cached_blocks():
+    points = list(iter_sweep(PARAMS, '2024-01-01', '2024-01-02', step='shichen'))
+    assert len(points) == 13
+    assert points[0].yue_ling is points[11].yue_ling
+    assert points[0].god6 is points[11].god6
+
+
+def test_sweep_to_dict_and_step_validation():
+    data = sweep(PARAMS, '2024-01-01', '2024-01-03').to_dict()
+    assert data['name'] == '地山谦'
+    assert data['times'] == ['2024-01-01T00:00:00', '2024-01-02T00:00:00', '2024-01-03T00:00:00']
+    assert len(data['yue_ling']) == 3 and len(data['yue_ling'][0]) == 6
+
+    assert sweep(PARAMS, '2024-01-03', '2024-01-01').times == []
+    assert len(sweep(PARAMS, '2024-01-01', '2024-01-02', step=timedelta(hours=6))) == 5
+    with pytest.raises(ValueError):
+        sweep(PARAMS, '2024-01-01', '2024-01-02', step='week')
+    with pytest.raises(ValueError):
+        sweep(PARAMS, '2024-01-01', '2024-01-02', step=timedelta(0))
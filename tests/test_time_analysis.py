@@ -1,6 +1,8 @@
 import pytest
+from najia.const import ZHIS
 from najia.time_analysis import (
-    calc_yue_ling, is_yue_po, get_xun_kong, is_xun_kong, calc_liu_shen
+    calc_yue_ling, is_yue_po, get_xun_kong, is_xun_kong, calc_liu_shen, time_block,
+    XUN_KONG_TABLE, _GANZHI_INDEX,
 )
 
 
@@ -43,3 +45,28 @@ def test_calc_liu_shen():
     assert calc_liu_shen(5, '甲子') == '玄武'
     assert calc_liu_shen(0, '乙丑') == '青龙'
     assert calc_liu_shen(0, '丙寅') == '朱雀'
+
+
+def test_xun_kong_table_matches_rule():
+    for gz, i in _GANZHI_INDEX.items():
+        assert [z for z, kong in zip(ZHIS, XUN_KONG_TABLE[i]) if kong] == sorted(get_xun_kong(gz), key=ZHIS.index)
+
+
+def test_time_block_returns_fresh_lists():
+    first = time_block('110100', '寅', '戊午')
+    first[0][0] = 'x'
+    first[3].clear()
+
+    second = time_block('110100', '寅', '戊午')
+    assert second[0][0] != 'x'
+    assert len(second[3]) == 6
+    assert second[0] is not first[0]
+
+
+def test_time_block_nonstandard_ri_chen():
+    # 阴阳不配的干支不在六十甲子中，按规则函数计算
+    yue_ling, yue_po, xun_kong, liu_shen = time_block('110100', None, '甲丑')
+    assert yue_ling is None and yue_po is None
+    assert len(xun_kong) == 6
+    assert liu_shen == [calc_liu_shen(i, '甲丑') for i in range(6)]
+    assert time_block('110100', '寅', '')[3] is None